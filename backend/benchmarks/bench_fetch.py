@@ -0,0 +1,283 @@
+"""
+抓取阶段基准测试
+使用本地合成RSS源服务器驱动 RSSFetcher.fetch_all_feeds，不访问外网
+
+每个规模在独立的子进程中运行，分别统计冷启动（全部下载解析）和热启动
+（条件请求命中 304）两轮的吞吐、延迟、CPU 时间和峰值内存。
+
+用法（在 backend 目录下）:
+    python benchmarks/bench_fetch.py                          # 20/200/2000 个源
+    python benchmarks/bench_fetch.py --scales 20 200 --engine asyncio
+    python benchmarks/bench_fetch.py --save-baseline          # 保存为基线
+    python benchmarks/bench_fetch.py --compare                # 与基线比较，出现退化时返回非零退出码
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+# 与基线比较的指标：(指标, 数值越大越好)
+COMPARED_METRICS = [
+    ('feeds_per_sec', True),
+    ('p95_latency_ms', False),
+    ('cpu_ms_per_feed', False),
+]
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """计算百分位数（最近邻插值）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_worker(args) -> Dict:
+    """在当前进程中运行一个规模的测试（由父进程以 --worker 方式调用）"""
+    sys.path.insert(0, BACKEND_DIR)
+    from config import SYSTEM_CONFIG
+    SYSTEM_CONFIG['fetch_concurrency'] = args.concurrency
+    SYSTEM_CONFIG['fetch_per_host_limit'] = args.concurrency
+    from src.rss_fetcher import RSSFetcher
+
+    logging.basicConfig(level=logging.ERROR)
+    query = urlencode({
+        'entries': args.entries,
+        'summary_bytes': args.summary_bytes,
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'error_rate': args.error_rate,
+        'format': args.format,
+        'stable': 0 if args.unstable else 1,
+    })
+    feeds = {
+        f"bench{i:05d}": {
+            'name': f"Bench {i}",
+            'url': f"http://127.0.0.1:{args.port}/feeds/bench{i:05d}.xml?{query}",
+            'category': 'blog',
+            'priority': 1 + i % 3,
+        }
+        for i in range(args.feeds)
+    }
+
+    data_dir = tempfile.mkdtemp(prefix='bench_fetch_')
+    fetcher = RSSFetcher(feeds, data_dir=data_dir)
+    fetcher.response_cache = None  # 测量网络路径，不复用响应缓存
+
+    passes = {}
+    for pass_name in ('cold', 'warm'):
+        attempts_before = {feed_id: _health_attempts(fetcher, feed_id) for feed_id in feeds}
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        articles = fetcher.fetch_all_feeds(
+            max_articles_per_source=args.max_articles,
+            hours_back=72,
+            retry_delay=0,
+            engine=args.engine,
+            respect_schedule=False,
+            deadline_seconds=0,  # 不限制总时长
+        )
+        wall = time.perf_counter() - wall_before
+        cpu = time.process_time() - cpu_before
+
+        latencies = []
+        for feed_id in feeds:
+            health = fetcher.feed_state.get(feed_id).get('health', {})
+            if _health_attempts(fetcher, feed_id) > attempts_before[feed_id] and health.get('latencies_ms'):
+                latencies.append(health['latencies_ms'][-1])
+        stats = fetcher.last_run_stats
+        passes[pass_name] = {
+            'wall_seconds': round(wall, 3),
+            'feeds_per_sec': round(len(feeds) / wall, 2) if wall else None,
+            'articles': len(articles),
+            'p50_latency_ms': _percentile(latencies, 50),
+            'p95_latency_ms': _percentile(latencies, 95),
+            'cpu_ms_per_feed': round(cpu * 1000 / len(feeds), 3),
+            'http_requests': stats.get('http_requests', 0),
+            'not_modified': stats.get('not_modified', 0),
+            'kb_on_wire': round(stats.get('bytes_on_wire', 0) / 1024, 1),
+            'failed_feeds': len(feeds) - len(latencies),
+        }
+
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+    return {'feeds': len(feeds), 'peak_rss_mb': round(peak_rss_mb, 1), 'passes': passes}
+
+
+def _health_attempts(fetcher, feed_id: str) -> int:
+    health = fetcher.feed_state.get(feed_id).get('health', {})
+    return health.get('successes', 0) + health.get('failures', 0)
+
+
+def start_feed_server() -> Tuple[subprocess.Popen, int]:
+    """在子进程中启动合成源服务器，避免其 CPU 和内存计入测试结果"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "feed_server.py"), "--port", "0"],
+        stdout=subprocess.PIPE, text=True
+    )
+    port = int(process.stdout.readline().strip())
+    return process, port
+
+
+def run_scale(args, feeds: int, port: int) -> Dict:
+    """在独立子进程中运行一个规模，保证峰值内存和 CPU 时间互不影响"""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--worker",
+        "--feeds", str(feeds), "--port", str(port),
+        "--engine", args.engine, "--concurrency", str(args.concurrency),
+        "--entries", str(args.entries), "--summary-bytes", str(args.summary_bytes),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--format", args.format,
+        "--max-articles", str(args.max_articles),
+    ]
+    if args.unstable:
+        command.append("--unstable")
+    output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def print_results(results: Dict[str, Dict]) -> None:
+    """以表格形式打印结果"""
+    header = (f"{'源数':>6} {'轮次':<5} {'耗时(s)':>8} {'源/秒':>8} {'文章':>6} {'p50(ms)':>8} "
+              f"{'p95(ms)':>8} {'CPU(ms)/源':>10} {'请求':>6} {'304':>5} {'传输(KB)':>9} {'失败':>4} {'峰值RSS(MB)':>11}")
+    print(header)
+    print('-' * len(header))
+    for scale, result in results.items():
+        for pass_name, p in result['passes'].items():
+            print(f"{scale:>6} {pass_name:<5} {p['wall_seconds']:>8.2f} {p['feeds_per_sec']:>8.1f} "
+                  f"{p['articles']:>6} {p['p50_latency_ms'] or 0:>8} {p['p95_latency_ms'] or 0:>8} "
+                  f"{p['cpu_ms_per_feed']:>10.2f} {p['http_requests']:>6} {p['not_modified']:>5} "
+                  f"{p['kb_on_wire']:>9.1f} {p['failed_feeds']:>4} {result['peak_rss_mb']:>11.1f}")
+
+
+def baseline_path(engine: str) -> str:
+    return os.path.join(BASELINE_DIR, f"fetch_{engine}.json")
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    与基线比较
+
+    Returns:
+        退化描述列表（为空表示没有退化）
+    """
+    regressions = []
+    for scale, result in results.items():
+        base = baseline.get('results', {}).get(scale)
+        if not base:
+            continue
+        checks = [(f"{pass_name}.{metric}", result['passes'][pass_name].get(metric),
+                   base['passes'].get(pass_name, {}).get(metric), higher_is_better)
+                  for pass_name in result['passes'] for metric, higher_is_better in COMPARED_METRICS]
+        checks.append(('peak_rss_mb', result['peak_rss_mb'], base.get('peak_rss_mb'), False))
+        for name, current, previous, higher_is_better in checks:
+            if not current or not previous:
+                continue
+            change = (current - previous) / previous
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{scale} 个源 {name}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='RSS 抓取阶段基准测试（离线）')
+    parser.add_argument('--scales', type=int, nargs='+', default=[20, 200, 2000], help='源数量')
+    parser.add_argument('--engine', choices=['thread', 'asyncio'], default='thread', help='抓取引擎')
+    parser.add_argument('--concurrency', type=int, default=5, help='抓取并发数（fetch_concurrency）')
+    parser.add_argument('--entries', type=int, default=30, help='每个源的条目数')
+    parser.add_argument('--summary-bytes', type=int, default=600, help='每个条目摘要的字节数')
+    parser.add_argument('--latency-ms', type=int, default=50, help='服务器固定延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=int, default=50, help='服务器随机延迟上限（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 503 的概率')
+    parser.add_argument('--format', choices=['rss', 'atom'], default='rss', help='源格式')
+    parser.add_argument('--unstable', action='store_true', help='每次请求都有新文章（不返回 304）')
+    parser.add_argument('--max-articles', type=int, default=5, help='每个源最大文章数')
+    parser.add_argument('--save-baseline', action='store_true', help='将结果保存为基线')
+    parser.add_argument('--compare', action='store_true', help='与基线比较')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='判定退化的相对变化阈值')
+    parser.add_argument('--output', help='将结果写入 JSON 文件')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--feeds', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return 0
+
+    server, port = start_feed_server()
+    results = {}
+    try:
+        for feeds in args.scales:
+            print(f"运行 {feeds} 个源（{args.engine}）...", flush=True)
+            results[str(feeds)] = run_scale(args, feeds, port)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print()
+    print_results(results)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {k: v for k, v in vars(args).items()
+                   if k not in ('worker', 'feeds', 'port', 'save_baseline', 'compare', 'output')},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    exit_code = 0
+    if args.compare:
+        path = baseline_path(args.engine)
+        if not os.path.exists(path):
+            print(f"\n未找到基线 {path}，请先使用 --save-baseline 保存")
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_with_baseline(results, baseline, args.tolerance)
+            if regressions:
+                print(f"\n与基线（{baseline.get('created_at')}）相比出现退化:")
+                for line in regressions:
+                    print(f"  - {line}")
+                exit_code = 1
+            else:
+                print(f"\n与基线（{baseline.get('created_at')}）相比无明显退化（阈值 {args.tolerance:.0%}）")
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.engine), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存到 {baseline_path(args.engine)}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
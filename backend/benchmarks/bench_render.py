@@ -0,0 +1,284 @@
+"""
+简报渲染基准测试
+比较原先的字符串拼接 + markdown 库转换 HTML 与简报模型 + 输出器（模型构建一次，Markdown 和 HTML 共用），
+校验两者生成的 Markdown 完全一致、HTML 正文与 markdown 库的转换结果一致，并给出各输出格式在同一模型上的耗时
+
+用法（在 backend 目录下）:
+    python benchmarks/bench_render.py                    # 10000 篇文章
+    python benchmarks/bench_render.py --articles 2000
+"""
+
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import markdown
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.digest_generator import DigestGenerator  # noqa: E402
+from src.digest_renderer import HTML_DOCUMENT_HEAD, HTML_DOCUMENT_TAIL  # noqa: E402
+
+WORDS = ('model', 'agents', 'inference', 'benchmark', 'dataset', 'startup', 'chip', 'reasoning',
+         'safety', 'training', 'robotics', 'scaling', '模型', '推理', '芯片', '开源', '发布')
+
+
+class LegacyDigestGenerator:
+    """原先 DigestGenerator 的 Markdown 生成实现（逐段字符串拼接，HTML 由 markdown 库转换）"""
+
+    def __init__(self, title: str):
+        self.title = title
+
+    def generate_markdown(self, articles: List[Dict], 
+                          analysis: Optional[Dict] = None,
+                          categories: Optional[Dict[str, List[Dict]]] = None) -> str:
+        """
+        生成Markdown格式的简报
+        
+        Args:
+            articles: 文章列表
+            analysis: LLM分析结果
+            categories: 分类后的文章
+            
+        Returns:
+            Markdown格式的简报内容
+        """
+        today = datetime.now().strftime("%Y年%m月%d日")
+        weekday = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][datetime.now().weekday()]
+        
+        md_content = f"""# {self.title}
+
+**{today} {weekday}** | 共收录 {len(articles)} 篇文章
+
+---
+
+"""
+        
+        # 添加综合分析
+        if analysis:
+            md_content += """## 📊 今日概览
+
+"""
+            if analysis.get('overview'):
+                md_content += f"{analysis['overview']}\n\n"
+            
+            if analysis.get('highlights'):
+                md_content += "### 🔥 今日要点\n\n"
+                for i, highlight in enumerate(analysis['highlights'], 1):
+                    md_content += f"{i}. {highlight}\n"
+                md_content += "\n"
+            
+            if analysis.get('trends'):
+                md_content += "### 📈 趋势观察\n\n"
+                for trend in analysis['trends']:
+                    md_content += f"- {trend}\n"
+                md_content += "\n"
+            
+            if analysis.get('recommendation'):
+                md_content += f"### ⭐ 今日推荐\n\n{analysis['recommendation']}\n\n"
+            
+            md_content += "---\n\n"
+        
+        # 按分类展示文章
+        if categories:
+            md_content += "## 📰 详细内容\n\n"
+            
+            category_icons = {
+                "大语言模型": "🤖",
+                "AI应用与产品": "🚀",
+                "研究与论文": "📚",
+                "行业动态": "🏢",
+                "其他": "📌"
+            }
+            
+            for category, cat_articles in categories.items():
+                if cat_articles:
+                    icon = category_icons.get(category, "📌")
+                    md_content += f"### {icon} {category}\n\n"
+                    
+                    for article in cat_articles[:10]:  # 每个分类最多10篇
+                        md_content += self._format_article(article)
+                    
+                    md_content += "\n"
+        else:
+            # 如果没有分类，按来源展示
+            md_content += "## 📰 最新文章\n\n"
+            
+            # 按来源分组
+            by_source = {}
+            for article in articles:
+                source = article.get('source_name', '其他')
+                if source not in by_source:
+                    by_source[source] = []
+                by_source[source].append(article)
+            
+            for source, source_articles in by_source.items():
+                md_content += f"### 📍 {source}\n\n"
+                for article in source_articles[:5]:
+                    md_content += self._format_article(article)
+                md_content += "\n"
+        
+        # 添加页脚
+        md_content += """---
+
+## 📌 关于本简报
+
+本简报由 AI Daily Digest 自动生成，汇集了以下信息源的最新内容：
+
+- **公司博客**: OpenAI, Google AI, Anthropic
+- **学术研究**: Berkeley AI Research, MIT AI News, arXiv
+- **技术博客**: Simon Willison, Lilian Weng, The Batch
+- **社区讨论**: Hacker News, Reddit ML
+
+如有问题或建议，请回复此邮件。
+
+---
+*生成时间: {timestamp}*
+""".format(timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        
+        return md_content
+    
+    def _format_article(self, article: Dict) -> str:
+        """格式化单篇文章"""
+        title = article.get('title', '无标题')
+        link = article.get('link', '#')
+        summary = article.get('chinese_summary', article.get('summary', ''))
+        source = article.get('source_name', '')
+        
+        # 解析发布时间
+        pub_date = article.get('published', '')
+        if pub_date:
+            try:
+                dt = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
+                pub_date = dt.strftime("%m-%d %H:%M")
+            except:
+                pub_date = pub_date[:10] if len(pub_date) > 10 else pub_date
+        
+        formatted = f"**[{title}]({link})**\n"
+        if pub_date:
+            formatted += f"*{source} | {pub_date}*\n\n"
+        else:
+            formatted += f"*{source}*\n\n"
+        
+        if summary:
+            # 限制摘要长度
+            if len(summary) > 300:
+                summary = summary[:300] + "..."
+            formatted += f"> {summary}\n\n"
+        
+        # 合并的同题报道
+        alternates = article.get('alternate_sources') or []
+        if alternates:
+            links = ", ".join(f"[{alt.get('source_name', '')}]({alt.get('link', '#')})" for alt in alternates)
+            formatted += f"*另见: {links}*\n\n"
+        
+        return formatted
+
+    def generate_html(self, markdown_content: str) -> str:
+        return markdown.markdown(markdown_content, extensions=['tables', 'fenced_code', 'toc'])
+
+
+def make_digest(count: int, rng: random.Random):
+    """生成合成简报数据：每个分类 10 篇文章（原实现每类最多展示 10 篇），约三成带中文摘要和另见来源"""
+    now = datetime.now(timezone.utc)
+    articles = []
+    for i in range(count):
+        article = {
+            'id': str(i),
+            'title': ' '.join(rng.choice(WORDS) for _ in range(8)).capitalize(),
+            'link': f"https://example.com/articles/{i}",
+            'summary': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))),
+            'source_name': f"Source {i % 37}",
+            'published': (now - timedelta(minutes=rng.randint(0, 2880))).isoformat(),
+        }
+        if rng.random() < 0.3:
+            article['chinese_summary'] = ''.join(rng.choice(WORDS) for _ in range(40))
+        if rng.random() < 0.2:
+            article['alternate_sources'] = [{'source_name': f"Alt {i}", 'link': f"https://alt.example.com/{i}"}]
+        articles.append(article)
+    categories = {f"分类{index}": articles[index * 10:(index + 1) * 10] for index in range((count + 9) // 10)}
+    analysis = {
+        'overview': ' '.join(rng.choice(WORDS) for _ in range(40)),
+        'highlights': ['要点一', '要点二', '要点三'],
+        'trends': ['趋势一', '趋势二'],
+        'recommendation': '今日推荐文章',
+    }
+    return articles, analysis, categories
+
+
+def best_of(func, repeat: int):
+    """多次运行取最短耗时"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def normalize_html(text: str) -> str:
+    """去掉标签之间的空白和 toc 扩展添加的标题 id，便于比较结构"""
+    text = re.sub(r' id="[^"]*"', '', text)
+    return re.sub(r'>\s+<', '><', text).strip()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='简报渲染基准测试')
+    parser.add_argument('--articles', type=int, default=10000, help='文章数量')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    args = parser.parse_args(argv)
+
+    articles, analysis, categories = make_digest(args.articles, random.Random(args.seed))
+    title = "AI 每日简报"
+    legacy = LegacyDigestGenerator(title)
+    generator = DigestGenerator(output_dir=os.path.join(BACKEND_DIR, 'output'), title=title)
+
+    def run_legacy():
+        content = legacy.generate_markdown(articles, analysis, categories)
+        return content, legacy.generate_html(content)
+
+    def run_emitters():
+        md_out, html_out = io.StringIO(), io.StringIO()
+        generator.render(articles, analysis, categories, md_out=md_out, html_out=html_out)
+        return md_out.getvalue(), html_out.getvalue()
+
+    _, legacy_md_seconds = best_of(lambda: legacy.generate_markdown(articles, analysis, categories), args.repeat)
+    (legacy_md, legacy_html), legacy_seconds = best_of(run_legacy, args.repeat)
+    (new_md, new_document), new_seconds = best_of(run_emitters, args.repeat)
+    # 去掉邮件文档外壳，只比较正文
+    shell_head = HTML_DOCUMENT_HEAD.format(title=title)
+    new_html = new_document[len(shell_head):len(new_document) - len(HTML_DOCUMENT_TAIL)]
+
+    strip_timestamp = lambda text: re.sub(r'生成时间: [^<*]*', '', text)
+    md_equal = strip_timestamp(legacy_md) == strip_timestamp(new_md)
+    html_equal = normalize_html(strip_timestamp(legacy_html)) == normalize_html(strip_timestamp(new_html))
+
+    print(f"{args.articles} 篇文章（{len(categories)} 个分类），Markdown {len(new_md) / 1024:.0f} KB，"
+          f"HTML 正文 {len(new_html) / 1024:.0f} KB")
+    print(f"  原实现（拼接 Markdown）:         {legacy_md_seconds * 1000:9.1f} 毫秒")
+    print(f"  原实现（拼接 + markdown 转 HTML）: {legacy_seconds * 1000:9.1f} 毫秒")
+    print(f"  简报模型 + 输出器（Markdown + HTML）: {new_seconds * 1000:9.1f} 毫秒")
+    print(f"  加速比:                          {legacy_seconds / new_seconds:9.1f}x")
+
+    # 模型只构建一次，增加输出格式只需再遍历一次模型
+    digest, build_seconds = best_of(lambda: generator.build(articles, analysis, categories), args.repeat)
+    print(f"  构建简报模型:                    {build_seconds * 1000:9.1f} 毫秒")
+    for name in ('markdown', 'html', 'json', 'text', 'atom'):
+        _, seconds = best_of(lambda: generator.emit(digest, name), args.repeat)
+        print(f"    输出 {name:<8}                  {seconds * 1000:9.1f} 毫秒")
+    print(f"  Markdown 与原实现一致: {'是' if md_equal else '否'}")
+    print(f"  HTML 与 markdown 库转换结果一致: {'是' if html_equal else '否'}")
+    return 0 if md_equal and html_equal else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
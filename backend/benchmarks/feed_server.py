@@ -0,0 +1,178 @@
+"""
+合成RSS源服务器
+在本地生成可配置的 RSS/Atom 源，用于离线测试抓取性能
+
+每个源的参数通过查询字符串指定，例如:
+    /feeds/42.xml?entries=50&summary_bytes=800&latency_ms=80&jitter_ms=40&error_rate=0.02&format=atom&stable=1
+
+    entries        条目数量
+    summary_bytes  每个条目摘要的字节数（控制源大小）
+    latency_ms     响应前的固定延迟（毫秒）
+    jitter_ms      额外的随机延迟上限（毫秒）
+    error_rate     返回 503 的概率
+    format         rss 或 atom
+    stable         1 表示内容不变（支持 ETag/Last-Modified，条件请求返回 304），0 表示每次请求都有新文章
+
+单独运行时在标准输出打印监听端口:
+    python benchmarks/feed_server.py --port 0
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+DEFAULT_PARAMS = {
+    'entries': 30,
+    'summary_bytes': 600,
+    'latency_ms': 50,
+    'jitter_ms': 50,
+    'error_rate': 0.0,
+    'format': 'rss',
+    'stable': 1,
+}
+
+# 固定的内容生成起点，保证同一个源在 stable=1 时每次返回相同内容
+_EPOCH = int(time.time()) // 3600 * 3600
+_WORDS = ('model', 'agent', 'inference', 'benchmark', 'dataset', 'startup', 'funding', 'chip',
+          'reasoning', 'open-source', 'release', 'research', 'safety', 'training', 'robotics')
+
+
+def parse_params(query: str) -> Dict:
+    """解析查询字符串，缺省值取自 DEFAULT_PARAMS"""
+    params = dict(DEFAULT_PARAMS)
+    for key, values in parse_qs(query).items():
+        if key not in params:
+            continue
+        params[key] = type(DEFAULT_PARAMS[key])(values[-1])
+    return params
+
+
+def build_feed(feed_id: str, params: Dict, generation: int = 0) -> bytes:
+    """
+    生成源内容
+
+    Args:
+        feed_id: 源ID（决定标题和链接）
+        params: 源参数
+        generation: 内容版本号，非 stable 源每次请求递增，使最新条目不断变化
+
+    Returns:
+        XML 字节
+    """
+    rng = random.Random(f"{feed_id}:{generation}")
+    newest = _EPOCH + generation * 60
+    items = []
+    for i in range(params['entries']):
+        seq = generation + params['entries'] - i
+        title = f"{feed_id} {' '.join(rng.choice(_WORDS) for _ in range(6))} #{seq}"
+        link = f"https://synthetic.example.com/{feed_id}/{seq}"
+        summary = ' '.join(rng.choice(_WORDS) for _ in range(params['summary_bytes'] // 8))
+        published = newest - i * 1800
+        if params['format'] == 'atom':
+            items.append(
+                f"<entry><title>{escape(title)}</title><link rel=\"alternate\" href=\"{link}\"/>"
+                f"<id>{link}</id><updated>{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(published))}</updated>"
+                f"<summary>{escape(summary)}</summary></entry>"
+            )
+        else:
+            items.append(
+                f"<item><title>{escape(title)}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{formatdate(published, usegmt=True)}</pubDate>"
+                f"<description>{escape(summary)}</description></item>"
+            )
+    if params['format'] == 'atom':
+        return (
+            "<?xml version=\"1.0\" encoding=\"utf-8\"?>"
+            "<feed xmlns=\"http://www.w3.org/2005/Atom\">"
+            f"<title>{feed_id}</title>{''.join(items)}</feed>"
+        ).encode('utf-8')
+    return (
+        "<?xml version=\"1.0\" encoding=\"utf-8\"?><rss version=\"2.0\"><channel>"
+        f"<title>{feed_id}</title>{''.join(items)}</channel></rss>"
+    ).encode('utf-8')
+
+
+class SyntheticFeedHandler(BaseHTTPRequestHandler):
+    """合成源请求处理器"""
+
+    protocol_version = 'HTTP/1.1'
+    _generations: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_params(url.query)
+        feed_id = url.path.rsplit('/', 1)[-1].split('.', 1)[0] or 'feed'
+
+        with self._lock:
+            generation = self._generations.get(feed_id, 0)
+            if not params['stable']:
+                self._generations[feed_id] = generation + 1
+        rng = random.Random(f"{feed_id}:{generation}:{time.time_ns()}")
+
+        delay = params['latency_ms'] + rng.uniform(0, params['jitter_ms'])
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if rng.random() < params['error_rate']:
+            self._send(503, b'synthetic error', 'text/plain')
+            return
+
+        body = build_feed(feed_id, params, generation)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        last_modified = formatdate(_EPOCH + generation * 60, usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', None, {'ETag': etag, 'Last-Modified': last_modified})
+            return
+        content_type = 'application/atom+xml' if params['format'] == 'atom' else 'application/rss+xml'
+        self._send(200, body, content_type, {'ETag': etag, 'Last-Modified': last_modified})
+
+    def _send(self, status: int, body: bytes, content_type, headers: Dict = None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """在后台线程启动服务器，返回服务器对象（端口见 server.server_port）"""
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer((host, port), SyntheticFeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合成RSS源服务器')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=0, help='监听端口（0 表示随机端口）')
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port)
+    print(server.server_port, flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
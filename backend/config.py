@@ -156,6 +156,47 @@ SYSTEM_CONFIG = {
     "data_dir": "data",                  # 数据存储目录
     "output_dir": "output",              # 输出目录
     "log_dir": "logs",                   # 日志目录
+    "seen_article_ttl_days": 7,          # 已抓取文章ID的保留天数（data/articles.db）
+    "adaptive_polling": {                # 自适应轮询：按各源的历史发布频率决定本轮是否抓取
+        "enabled": True,
+        "min_probability": 0.3,          # 预计有新文章的概率达到该值才抓取
+        "max_staleness_hours": 12,       # 距上次成功抓取超过该时长则必定抓取
+        "history_size": 50,              # 每个源保留的发布时间记录数
+    },
+    "circuit_breaker": {                 # 源熔断：连续失败的源在冷却期内不再抓取（报告见 data/feed_health.json）
+        "enabled": True,
+        "failure_threshold": 3,          # 连续失败多少次（每次运行计一次）后熔断
+        "cooldown_hours": 6,             # 熔断冷却时长，冷却后试探一次
+        "max_cooldown_hours": 72,        # 试探失败时冷却时长翻倍，直到该上限
+    },
+    "response_cache": {                  # RSS原始响应缓存（data/http_cache），支持 --replay <运行ID> 离线回放
+        "enabled": True,
+        "ttl_minutes": 30,               # 有效期内重跑直接复用缓存，不访问网络
+        "retention_days": 7,             # 运行记录与响应体保留天数
+    },
+    "near_duplicate": {                  # 跨来源近似重复检测（MinHash + LSH，索引保存在 data/story_index.db）
+        "enabled": True,
+        "threshold": 0.5,                # 标题+摘要词集合的相似度阈值
+        "num_perm": 64,                  # MinHash 签名长度
+        "bands": 16,                     # LSH 分段数
+        "ttl_days": 7,                   # 索引保留天数
+        "drop_previously_seen": True,    # 丢弃与往期已收录文章重复的新文章
+    },
+    "story_clustering": {                # 同一事件的报道聚为故事，只把代表文章交给LLM（需要 numpy）
+        "enabled": True,
+        "threshold": 0.3,                # 与代表文章的 TF-IDF 余弦相似度阈值
+        "max_features": 4096,            # 参与相似度计算的最大词数
+    },
+    "incremental": {                     # 日内增量模式：保存当天状态，只对新到达的文章调用 LLM（--incremental）
+        "enabled": False,
+        "state_dir": "daily_state",      # 相对于 data_dir 的状态目录（每天一个 JSON 文件）
+        "keep_days": 7,                  # 状态文件保留天数
+    },
+    "outputs": {                         # 简报输出格式（Markdown 简报和 HTML 邮件之外）
+        "formats": ["text", "atom"],     # 额外保存到输出目录的格式：text（纯文本）、atom（订阅源 feed.xml）、html、json
+        "feed_url": "",                  # 订阅源的公开地址（Atom self 链接；更新网页数据时 feed.xml 与 data.json 放在同一目录）
+        "site_url": "",                  # 网站地址（Atom alternate 链接）
+    },
     "hours_back": 48,                    # 默认抓取最近48小时的文章（提升抓取成功率）
     "hours_back_by_category": {          # 根据类别调整时间窗口
         "business": 48,                  # 商业新闻：48小时
@@ -166,6 +207,16 @@ SYSTEM_CONFIG = {
     },
     "retry_attempts": 3,                # 重试次数
     "retry_delay": 2,                    # 重试延迟（秒）
+    "fetch_engine": "thread",            # 抓取引擎："thread"（线程池）或 "asyncio"
+    "fetch_concurrency": 5,              # 同时抓取的源数量上限
+    "fetch_per_host_limit": 2,           # 同一主机（如 arxiv.org）同时进行的请求上限（asyncio 引擎）
+    "request_timeout": 15,               # 单次请求超时（秒）
+    "fetch_deadline_seconds": 120,       # 抓取阶段总时限（秒），到时放弃未完成的源；None 表示不限制
+    "http_keep_alive": True,             # 复用长连接（连接池大小与 fetch_concurrency 一致）
+    "http_compression": True,            # 请求 gzip/deflate/br 压缩传输
+    "max_feed_bytes": 5 * 1024 * 1024,   # 单个源最多读取的字节数（流式解析，超过后停止）
+    "stream_old_entry_tolerance": 3,     # 连续遇到多少篇超出时间窗口的文章后停止解析该源
+    "conditional_get": True,             # 使用 ETag/Last-Modified 条件请求，未更新的源返回304时跳过解析
     "user_agent": "ThinkDeep.ai/1.0 (AI Digest Bot)"
 }
 
@@ -174,4 +225,77 @@ LLM_CONFIG = {
     "enabled": True,
     "model": "gpt-4.1-mini",
     "max_tokens": 1000,
+    "backend": {                         # LLM 后端："gemini"（需要 GEMINI_API_KEY）或 "local"（离线模拟，用于压测）
+        "type": "gemini",
+        "request_timeout_seconds": 120,  # HTTP 层超时（被放弃的调用最多占用线程这么久）
+        "local": {
+            "latency_ms": 300,           # 每次调用的固定延迟
+            "tokens_per_second": 150,    # 输出吞吐量
+            "error_rate": 0.0,           # 注入错误的概率
+            "rate_limit_rate": 0.0,      # 注入限流（429）的概率
+            "seed": 0,
+        },
+    },
+    "fallback_models": ["gemini-1.5-flash-8b"],  # 主模型失败或超时后依次尝试的模型，全部失败时使用截断的原文摘要
+    "model_skip_after_failures": 2,      # 某个模型连续失败这么多次后，本次运行不再调用它（直接使用链中的下一个模型）
+    "call_timeouts": {                   # 单次调用的截止时间（秒），超时后改用备用模型
+        "summary": 30,
+        "batch_summary": 90,
+        "digest": 90,
+        "digest_update": 60,
+    },
+    "hedge": {                           # 对冲请求：超过近期延迟分位数仍未返回时再发一个相同请求，取先返回的结果
+        "enabled": False,
+        "quantile": 0.95,
+        "min_samples": 20,               # 样本不足时使用 initial_delay_seconds
+        "initial_delay_seconds": 15,
+    },
+    "max_summaries": None,               # 每次最多生成中文摘要的文章数（None 表示所有展示的文章）
+    "summary_concurrency": 4,            # 并发生成摘要的线程数
+    "max_retries": 4,                    # 遇到限流（429）时的最大重试次数（指数退避）
+    "summary_batch_size": 8,             # 每次请求合并摘要的文章数（1 表示逐篇请求）
+    "summary_batch_token_budget": 6000,  # 批量摘要请求的输入 token 预算
+    "digest_input_token_budget": 4000,   # 综合分析提示词的输入 token 预算（按排名填充文章）
+    "digest_max_items": 40,              # 综合分析最多纳入的文章数
+    "rate_limit": {                      # 所有 LLM 调用共享的令牌桶限流
+        "requests_per_minute": 15,
+        "tokens_per_minute": 1000000,
+    },
+    "metrics": {                         # LLM 调用指标（data/metrics/llm_<运行ID>.json 和 llm_metrics.prom）
+        "enabled": True,
+        "dir": "metrics",                # 相对于 data_dir 的输出目录
+    },
+    "cache": {                           # LLM 响应缓存（按模型+提示词版本+内容哈希，保存在 data/llm_cache.db）
+        "enabled": True,
+        "max_entries": 5000,             # 最多保留条数（超出时淘汰最久未使用的）
+        "max_age_days": 30,              # 保留天数
+    },
 }
+
+# ==================== 文章分类配置 ====================
+# 规则按优先级排列：文章归入第一个命中的分类，都没有命中时归入"其他"
+# keywords 按字段匹配（不区分大小写的子串匹配），字段可选 title / summary / source_name / source_id
+CATEGORY_TAXONOMY = [
+    {
+        "name": "商业前沿",
+        "source_categories": ["business"],
+        "keywords": {"source_name": ["techcrunch", "venturebeat", "information"]},
+    },
+    {
+        "name": "技术硬核",
+        "source_categories": ["research"],
+        "keywords": {"source_id": ["arxiv"], "source_name": ["hugging face"]},
+    },
+    {
+        "name": "AI应用与产品",
+        "keywords": {
+            "title": ["launch", "release", "product", "app", "tool", "api"],
+            "summary": ["launch", "release", "product", "app", "tool", "api"],
+        },
+    },
+    {
+        "name": "行业动态",
+        "source_categories": ["company"],
+        "keywords": {"title": ["openai", "google", "microsoft", "anthropic", "meta"]},
+    },
+]
@@ -15,10 +15,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import RSS_FEEDS, EMAIL_CONFIG, SYSTEM_CONFIG, LLM_CONFIG
 from src.rss_fetcher import RSSFetcher
+from src.dedup import NearDuplicateDetector
+from src.story_clustering import StoryClusterer
+from src.pipeline import StagePipeline
+from src.daily_state import DailyStateStore
 from src.llm_analyzer import LLMAnalyzer
+from src.llm_cache import LLMResponseCache
+from src.rate_limiter import RateLimiter
 from src.digest_generator import DigestGenerator
 from src.email_sender import EmailSender
-import json
 
 # 配置日志
 logging.basicConfig(
@@ -46,20 +51,68 @@ class AIDailyDigest:
             data_dir=os.path.join(base_dir, SYSTEM_CONFIG['data_dir'])
         )
         
+        dedup_config = SYSTEM_CONFIG.get('near_duplicate', {})
+        self.deduplicator = NearDuplicateDetector(
+            os.path.join(base_dir, SYSTEM_CONFIG['data_dir'], 'story_index.db'),
+            threshold=dedup_config.get('threshold', 0.5),
+            num_perm=dedup_config.get('num_perm', 64),
+            bands=dedup_config.get('bands', 16),
+            ttl_days=dedup_config.get('ttl_days', 7),
+            drop_previously_seen=dedup_config.get('drop_previously_seen', True)
+        ) if dedup_config.get('enabled', True) else None
+        
+        clustering_config = SYSTEM_CONFIG.get('story_clustering', {})
+        self.clusterer = StoryClusterer(
+            threshold=clustering_config.get('threshold', 0.3),
+            max_features=clustering_config.get('max_features', 4096)
+        ) if clustering_config.get('enabled', True) else None
+        
+        incremental_config = SYSTEM_CONFIG.get('incremental', {})
+        self.incremental = incremental_config.get('enabled', False)
+        self.daily_states = self._open_daily_states() if self.incremental else None
+        
+        cache_config = LLM_CONFIG.get('cache', {})
+        self.llm_cache = LLMResponseCache(
+            os.path.join(base_dir, SYSTEM_CONFIG['data_dir'], 'llm_cache.db'),
+            max_entries=cache_config.get('max_entries', 5000),
+            max_age_days=cache_config.get('max_age_days', 30)
+        ) if LLM_CONFIG.get('enabled', True) and cache_config.get('enabled', True) else None
+        
         self.analyzer = LLMAnalyzer(
             model=LLM_CONFIG.get('model', 'gpt-4.1-nano'),
-            max_tokens=LLM_CONFIG.get('max_tokens', 500)
+            max_tokens=LLM_CONFIG.get('max_tokens', 500),
+            backend_config=LLM_CONFIG.get('backend'),
+            cache=self.llm_cache,
+            rate_limiter=RateLimiter(
+                requests_per_minute=LLM_CONFIG.get('rate_limit', {}).get('requests_per_minute'),
+                tokens_per_minute=LLM_CONFIG.get('rate_limit', {}).get('tokens_per_minute')
+            ),
+            max_retries=LLM_CONFIG.get('max_retries', 4),
+            summary_workers=LLM_CONFIG.get('summary_concurrency', 4),
+            batch_size=LLM_CONFIG.get('summary_batch_size', 1),
+            batch_token_budget=LLM_CONFIG.get('summary_batch_token_budget', 6000),
+            digest_token_budget=LLM_CONFIG.get('digest_input_token_budget', 4000),
+            digest_max_items=LLM_CONFIG.get('digest_max_items', 40),
+            fallback_models=LLM_CONFIG.get('fallback_models'),
+            call_timeouts=LLM_CONFIG.get('call_timeouts'),
+            hedge_config=LLM_CONFIG.get('hedge'),
+            model_skip_after=LLM_CONFIG.get('model_skip_after_failures', 2)
         ) if LLM_CONFIG.get('enabled', True) else None
         
+        output_config = SYSTEM_CONFIG.get('outputs', {})
+        self.output_formats = output_config.get('formats', [])
         self.generator = DigestGenerator(
             output_dir=os.path.join(base_dir, SYSTEM_CONFIG['output_dir']),
-            title=SYSTEM_CONFIG.get('digest_title', 'AI 每日简报')
+            title=SYSTEM_CONFIG.get('digest_title', 'AI 每日简报'),
+            emitter_options={'atom': {'feed_url': output_config.get('feed_url', ''),
+                                      'site_url': output_config.get('site_url', '')}}
         )
         
         self.email_sender = EmailSender(EMAIL_CONFIG)
     
     def run(self, send_email: bool = True, save_file: bool = True, 
-            hours_back: int = 48, update_web: bool = True, web_data_path: str = None) -> dict:
+            hours_back: int = 48, update_web: bool = True, web_data_path: str = None,
+            replay_run_id: str = None, incremental: bool = None) -> dict:
         """
         运行完整的简报生成流程
         
@@ -67,6 +120,8 @@ class AIDailyDigest:
             send_email: 是否发送邮件
             save_file: 是否保存文件
             hours_back: 抓取多少小时内的文章
+            replay_run_id: 回放指定运行录制的RSS响应（不访问网络，跳过LLM分析和邮件发送）
+            incremental: 日内增量模式：合并当天已处理的文章，只对新文章调用LLM（默认读取配置）
             
         Returns:
             包含运行结果的字典
@@ -76,6 +131,8 @@ class AIDailyDigest:
             'articles_count': 0,
             'file_path': None,
             'email_sent': False,
+            'fetch_stats': {},
+            'run_id': None,
             'error': None
         }
         
@@ -85,73 +142,144 @@ class AIDailyDigest:
             logger.info("=" * 50)
             
             # 1. 抓取RSS源
-            logger.info("步骤 1/4: 抓取RSS源...")
-            articles = self.fetcher.fetch_all_feeds(
-                max_articles_per_source=SYSTEM_CONFIG.get('max_articles_per_source', 5),
-                hours_back=hours_back,
-                retry_attempts=SYSTEM_CONFIG.get('retry_attempts', 3),
-                retry_delay=SYSTEM_CONFIG.get('retry_delay', 2)
-            )
+            if replay_run_id:
+                logger.info(f"步骤 1/4: 回放运行 {replay_run_id} 录制的RSS响应...")
+                articles = self.fetcher.replay(
+                    replay_run_id,
+                    max_articles_per_source=SYSTEM_CONFIG.get('max_articles_per_source', 5),
+                    hours_back=hours_back
+                )
+            else:
+                logger.info("步骤 1/4: 抓取RSS源...")
+                articles = self.fetcher.fetch_all_feeds(
+                    max_articles_per_source=SYSTEM_CONFIG.get('max_articles_per_source', 5),
+                    hours_back=hours_back,
+                    retry_attempts=SYSTEM_CONFIG.get('retry_attempts', 3),
+                    retry_delay=SYSTEM_CONFIG.get('retry_delay', 2)
+                )
+            result['fetch_stats'] = dict(self.fetcher.last_run_stats)
+            result['run_id'] = self.fetcher.run_id
+            
+            # 合并跨来源的近似重复报道，避免同一新闻重复消耗 LLM 调用
+            if self.deduplicator and articles:
+                fetched_count = len(articles)
+                articles = self.deduplicator.collapse(articles, use_history=not replay_run_id)
+                result['duplicates_collapsed'] = fetched_count - len(articles)
             
             if not articles:
                 logger.warning("未获取到任何新文章")
                 result['error'] = "未获取到任何新文章"
                 return result
             
+            # 增量模式：与当天已处理的文章合并，已有摘要的文章不再调用 LLM
+            state = None
+            new_ids = {id(a) for a in articles}
+            if (self.incremental if incremental is None else incremental) and not replay_run_id:
+                if self.daily_states is None:
+                    self.daily_states = self._open_daily_states()
+                state = self.daily_states.load()
+                new_articles = state.merge(articles)
+                new_ids = {id(a) for a in new_articles}
+                articles = list(state.articles)
+                self.fetcher.rank_articles(articles)
+                result['new_articles_count'] = len(new_articles)
+                logger.info(f"增量模式: 新文章 {len(new_articles)} 篇，当天累计 {len(articles)} 篇")
+            
             result['articles_count'] = len(articles)
             logger.info(f"共获取 {len(articles)} 篇文章")
             
+            # 将报道同一事件的文章聚为故事，LLM 只处理每个故事的代表文章
+            if self.clusterer:
+                stories = self.clusterer.cluster(articles)
+                result['story_clusters'] = dict(self.clusterer.last_stats)
+            else:
+                stories = [[article] for article in articles]
+            representatives = [story[0] for story in stories]
+            
             # 2. LLM分析（如果启用）
             analysis = None
             categories = None
             
-            if self.analyzer:
+            # 简报最多收录的文章（分类和摘要都只针对这些文章）
+            max_articles = SYSTEM_CONFIG.get('max_total_articles', 30)
+            shown = articles[:max_articles]
+            
+            if replay_run_id:
+                logger.info("步骤 2/4: 回放模式不访问网络，跳过LLM分析...")
+            elif self.analyzer:
                 logger.info("步骤 2/4: 使用LLM进行智能分析...")
+                cache_before = self.llm_cache.stats() if self.llm_cache else None
+                self.analyzer.metrics.reset()
+                self.analyzer.reset_unavailable_models()
                 
-                # 生成综合分析
-                analysis = self.analyzer.generate_daily_digest(articles)
-                
-                # 分类文章
-                categories = self.analyzer.categorize_articles(articles)
+                # 增量模式下已有上一版分析时，只用全新的故事更新分析
+                previous_analysis = state.analysis if state is not None else None
+                if previous_analysis:
+                    digest_articles = [story[0] for story in stories if all(id(a) in new_ids for a in story)]
+                    analyze = lambda items: self.analyzer.update_daily_digest(previous_analysis, items)
+                else:
+                    digest_articles = representatives
+                    analyze = self.analyzer.generate_daily_digest
                 
-                # 为重要文章生成中文摘要（限制数量以节省API调用）
-                priority_articles = [a for a in articles if a.get('priority', 5) <= 2][:10]
-                for article in priority_articles:
-                    if not article.get('chinese_summary'):
-                        article['chinese_summary'] = self.analyzer.summarize_article(article)
+                # 综合分析与分类、摘要互不依赖，作为流水线步骤并发执行；
+                # 摘要按简报实际展示的文章（由分类结果和每类上限决定）按需生成
+                pipeline = (
+                    StagePipeline(max_workers=3)
+                    .add('analysis', lambda digest_articles: analyze(digest_articles), requires=['digest_articles'])
+                    .add('categories', self.analyzer.categorize_articles, requires=['articles'])
+                    .add('summaries',
+                         lambda articles, categories: self._summarize_stories(
+                             stories, self.generator.plan_articles(articles, categories)),
+                         requires=['articles', 'categories'])
+                )
+                outputs = pipeline.run({
+                    'articles': shown,
+                    'digest_articles': digest_articles,
+                })
+                analysis = outputs['analysis']
+                categories = outputs['categories']
+                result['llm_usage'] = dict(self.analyzer.last_digest_usage)
+                result['stage_timings'] = pipeline.last_timings
                 
+                if self.llm_cache:
+                    cache_after = self.llm_cache.stats()
+                    result['llm_cache'] = {key: cache_after[key] - cache_before[key] for key in ('hits', 'misses')}
+                    logger.info(f"LLM缓存: 命中 {result['llm_cache']['hits']} 次，"
+                                f"未命中 {result['llm_cache']['misses']} 次")
+                result['llm_metrics'] = self.analyzer.metrics.summary()
+                self._write_llm_metrics(result['run_id'])
                 logger.info("LLM分析完成")
             else:
                 logger.info("步骤 2/4: LLM分析已禁用，跳过...")
             
+            if state is not None:
+                state.analysis = analysis
+                self.daily_states.save(state)
+            
             # 3. 生成简报
-            logger.info("步骤 3/4: 生成Markdown简报...")
+            logger.info("步骤 3/4: 生成简报...")
             
             # 限制文章总数
-            max_articles = SYSTEM_CONFIG.get('max_total_articles', 30)
-            articles = articles[:max_articles]
+            articles = shown
             
-            markdown_content = self.generator.generate_markdown(
-                articles, 
-                analysis=analysis,
-                categories=categories
-            )
+            # 构建一次简报模型，各输出格式（Markdown、HTML、JSON、纯文本、Atom）共用
+            digest = self.generator.build(articles, analysis=analysis, categories=categories)
+            markdown_content = self.generator.emit(digest, 'markdown')
             
             # 保存文件
             if save_file:
                 file_path = self.generator.save_digest(markdown_content)
                 result['file_path'] = file_path
                 logger.info(f"简报已保存到: {file_path}")
+                if self.output_formats:
+                    try:
+                        result['output_files'] = self.generator.save_outputs(digest, self.output_formats)
+                    except Exception as e:
+                        logger.error(f"保存其他格式的简报失败: {e}")
 
             # 更新网页数据
             if update_web:
                 try:
-                    web_data = {
-                        "date": datetime.now().strftime("%Y-%m-%d"),
-                        "articles": articles,
-                        "analysis": analysis
-                    }
-                    
                     # 如果没有提供路径，使用默认路径（本地开发环境）
                     if not web_data_path:
                         web_public_dir = "/home/ubuntu/ai-digest-web/client/public"
@@ -165,22 +293,27 @@ class AIDailyDigest:
                         target_path = web_data_path
                     
                     with open(target_path, 'w', encoding='utf-8') as f:
-                        json.dump(web_data, f, ensure_ascii=False, indent=2)
+                        self.generator.emit(digest, 'json', f)
                     
                     logger.info(f"网页数据已更新到: {target_path}")
+                    
+                    # 订阅源随网站一起发布
+                    if 'atom' in self.output_formats:
+                        self.generator.save_outputs(digest, ['atom'], output_dir=os.path.dirname(target_path) or '.')
                 except Exception as e:
                     logger.error(f"更新网页数据失败: {e}")
             
             # 4. 发送邮件
-            if send_email:
+            if send_email and replay_run_id:
+                logger.info("步骤 4/4: 回放模式跳过邮件发送")
+            elif send_email:
                 logger.info("步骤 4/4: 发送邮件...")
                 
                 if not self.email_sender.is_configured():
                     logger.warning("邮件未配置，跳过发送")
                     logger.info("请在 config.py 中配置 EMAIL_CONFIG")
                 else:
-                    # 生成HTML版本
-                    html_content = self.generator.generate_html(markdown_content)
+                    html_content = self.generator.emit(digest, 'html')
                     
                     # 发送邮件
                     today = datetime.now().strftime("%Y-%m-%d")
@@ -212,10 +345,65 @@ class AIDailyDigest:
         
         return result
     
+    def _open_daily_states(self) -> DailyStateStore:
+        """创建当日状态存储（只在使用增量模式时创建）"""
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        incremental_config = SYSTEM_CONFIG.get('incremental', {})
+        return DailyStateStore(
+            os.path.join(base_dir, SYSTEM_CONFIG['data_dir'], incremental_config.get('state_dir', 'daily_state')),
+            keep_days=incremental_config.get('keep_days', 7)
+        )
+    
+    def _summarize_stories(self, stories: list, rendered: list) -> int:
+        """
+        为简报中展示的文章所在的故事批量生成中文摘要（只摘要代表文章，结果回填到故事内所有文章）
+        
+        Returns:
+            生成摘要的故事数
+        """
+        rendered_ids = {id(a) for a in rendered}
+        pending = []
+        for story in stories:
+            if not any(id(a) in rendered_ids for a in story):
+                continue
+            # 故事内已有摘要（如增量模式下之前运行生成的）时直接复用
+            existing = next((a['chinese_summary'] for a in story if a.get('chinese_summary')), None)
+            if existing:
+                for article in story:
+                    article.setdefault('chinese_summary', existing)
+            else:
+                pending.append(story)
+        if LLM_CONFIG.get('max_summaries') is not None:
+            pending = pending[:LLM_CONFIG['max_summaries']]
+        summaries = self.analyzer.summarize_articles([story[0] for story in pending])
+        for story, summary in zip(pending, summaries):
+            for article in story:
+                article['chinese_summary'] = summary
+        return len(pending)
+    
+    def _write_llm_metrics(self, run_id: str) -> None:
+        """写入本次运行的 LLM 调用指标（JSON 和 Prometheus 文本格式）"""
+        metrics_config = LLM_CONFIG.get('metrics', {})
+        if not metrics_config.get('enabled', True):
+            return
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        directory = os.path.join(base_dir, SYSTEM_CONFIG['data_dir'], metrics_config.get('dir', 'metrics'))
+        try:
+            paths = self.analyzer.metrics.write(directory, run_id or datetime.now().strftime('%Y%m%d_%H%M%S'))
+            for method, stats in self.analyzer.metrics.summary().items():
+                p95 = f"{stats['p95_seconds']:.2f}s" if stats['p95_seconds'] is not None else "-"
+                logger.info(f"LLM调用 {method}: {stats['calls']} 次，p95 {p95}，"
+                            f"输入 {stats['input_tokens']} / 输出 {stats['output_tokens']} tokens，"
+                            f"失败 {stats['errors']} 次，降级 {stats['fallbacks']} 次")
+            logger.info(f"LLM调用指标已写入: {paths['json']}")
+        except Exception as e:
+            logger.error(f"写入LLM调用指标失败: {e}")
+    
     def test_fetch(self) -> None:
         """测试RSS抓取"""
         logger.info("测试RSS抓取...")
-        articles = self.fetcher.fetch_all_feeds(max_articles_per_source=2, hours_back=72)
+        articles = self.fetcher.fetch_all_feeds(max_articles_per_source=2, hours_back=72,
+                                                respect_schedule=False)
         
         print(f"\n获取到 {len(articles)} 篇文章:\n")
         for i, article in enumerate(articles[:10], 1):
@@ -244,6 +432,10 @@ def main():
     parser.add_argument('--test-fetch', action='store_true', help='测试RSS抓取')
     parser.add_argument('--test-email', action='store_true', help='测试邮件发送')
     parser.add_argument('--update-web-path', type=str, help='更新网页数据文件路径')
+    parser.add_argument('--incremental', action='store_true',
+                        help='日内增量模式：合并当天已处理的文章，只对新文章调用LLM')
+    parser.add_argument('--replay', type=str, metavar='RUN_ID',
+                        help='离线回放指定运行录制的RSS响应（见 data/http_cache/runs/）')
     
     args = parser.parse_args()
     
@@ -263,15 +455,33 @@ def main():
             save_file=not args.no_save,
             hours_back=args.hours,
             update_web=args.update_web_path is not None,
-            web_data_path=args.update_web_path
+            web_data_path=args.update_web_path,
+            replay_run_id=args.replay,
+            incremental=True if args.incremental else None
         )
         
         print("\n" + "=" * 50)
         print("运行结果:")
         print(f"  - 成功: {result['success']}")
         print(f"  - 文章数: {result['articles_count']}")
+        if 'new_articles_count' in result:
+            print(f"  - 新文章数: {result['new_articles_count']}")
+        if result.get('run_id'):
+            print(f"  - 运行ID: {result['run_id']}（可用 --replay 回放）")
         print(f"  - 文件路径: {result['file_path']}")
+        if result.get('output_files'):
+            print(f"  - 其他格式: {', '.join(result['output_files'].values())}")
         print(f"  - 邮件已发送: {result['email_sent']}")
+        fetch_stats = result.get('fetch_stats') or {}
+        if result.get('story_clusters'):
+            print(f"  - 故事数: {result['story_clusters']['stories']}"
+                  f"（{result['story_clusters']['clustered_articles']} 篇归入已有故事）")
+        if fetch_stats:
+            print(f"  - 网络传输: {fetch_stats.get('bytes_on_wire', 0) / 1024:.1f} KB"
+                  f"（{fetch_stats.get('http_requests', 0)} 次请求，"
+                  f"复用连接 {fetch_stats.get('reused_connections', 0)} 次）")
+            if fetch_stats.get('timed_out_feeds'):
+                print(f"  - 超时放弃的源: {', '.join(fetch_stats['timed_out_feeds'])}")
         if result['error']:
             print(f"  - 错误: {result['error']}")
         print("=" * 50)
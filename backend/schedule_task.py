@@ -29,11 +29,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 在多次调度之间复用同一个实例，保持抓取器的 HTTP 连接池
+_digest = None
+
+def get_digest() -> AIDailyDigest:
+    """获取（并按需创建）简报生成实例"""
+    global _digest
+    if _digest is None:
+        _digest = AIDailyDigest()
+    return _digest
+
 def job():
     """执行每日任务"""
     logger.info("开始执行每日定时任务...")
     try:
-        digest = AIDailyDigest()
+        digest = get_digest()
         result = digest.run(send_email=True, save_file=True)
         
         if result['success']:
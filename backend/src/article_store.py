@@ -0,0 +1,199 @@
+"""
+已抓取文章存储模块
+使用 SQLite 保存已见过的文章ID，支持增量写入、按时间索引过期和布隆过滤器前置判断
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """简单的布隆过滤器，用于快速判断ID“一定不存在”"""
+
+    def __init__(self, capacity: int = 200000, error_rate: float = 0.01):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预期元素数量
+            error_rate: 期望误判率
+        """
+        capacity = max(capacity, 1000)
+        self.size = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count = max(1, int(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class ArticleStore:
+    """已见文章ID存储（SQLite）"""
+
+    def __init__(self, db_path: str, ttl_days: int = 7, legacy_cache_file: str = None):
+        """
+        初始化存储
+
+        Args:
+            db_path: SQLite 数据库路径
+            ttl_days: 文章ID保留天数
+            legacy_cache_file: 旧版 article_cache.json 路径（首次创建数据库时导入）
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._pending: Dict[str, str] = {}
+        self._bloom = None
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        is_new = not os.path.exists(db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_articles ("
+            " id TEXT PRIMARY KEY,"
+            " first_seen REAL NOT NULL,"
+            " title TEXT"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_seen_articles_first_seen ON seen_articles(first_seen)"
+        )
+
+        if is_new and legacy_cache_file and os.path.exists(legacy_cache_file):
+            self._import_legacy_cache(legacy_cache_file)
+
+        self.expire()
+
+    def _import_legacy_cache(self, cache_file: str) -> None:
+        """从旧版 JSON 缓存导入数据"""
+        try:
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+            rows = []
+            for article_id, info in data.items():
+                try:
+                    first_seen = time.mktime(time.strptime(info.get('date', '')[:19], '%Y-%m-%dT%H:%M:%S'))
+                except ValueError:
+                    first_seen = time.time()
+                rows.append((article_id, first_seen, info.get('title', '')))
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO seen_articles (id, first_seen, title) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            logger.info(f"已从 {cache_file} 导入 {len(rows)} 条文章缓存")
+        except Exception as e:
+            logger.warning(f"导入旧版缓存失败: {e}")
+
+    def _build_bloom(self) -> BloomFilter:
+        """根据数据库中的ID构建布隆过滤器"""
+        count = self._conn.execute("SELECT COUNT(*) FROM seen_articles").fetchone()[0]
+        bloom = BloomFilter(capacity=count * 2)
+        for (article_id,) in self._conn.execute("SELECT id FROM seen_articles"):
+            bloom.add(article_id)
+        return bloom
+
+    def __contains__(self, article_id: str) -> bool:
+        """判断文章是否已见过：布隆过滤器判定不存在时无需查询数据库"""
+        if article_id in self._pending:
+            return True
+        if article_id not in self._bloom:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen_articles WHERE id = ?", (article_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_articles").fetchone()[0] + len(self._pending)
+
+    def add(self, article_id: str, title: str = '') -> None:
+        """标记文章为已见（暂存在内存中，调用 commit 后写入数据库）"""
+        with self._lock:
+            self._pending[article_id] = title[:100]
+
+    def commit(self, articles: Iterable[Dict] = ()) -> int:
+        """
+        将暂存的ID和给定文章在一个事务中写入数据库
+
+        Args:
+            articles: 需要额外标记为已见的文章（需包含 id 字段）
+
+        Returns:
+            写入的行数
+        """
+        now = time.time()
+        with self._lock:
+            pending = dict(self._pending)
+            for article in articles:
+                pending[article['id']] = article.get('title', '')[:100]
+            self._pending.clear()
+            if not pending:
+                return 0
+            rows = [(article_id, now, title) for article_id, title in pending.items()]
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO seen_articles (id, first_seen, title) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._pending.update(pending)
+                raise
+            for article_id in pending:
+                self._bloom.add(article_id)
+        return len(rows)
+
+    def discard_pending(self) -> int:
+        """丢弃暂存但尚未写入的ID（如超时放弃的源在解析中途标记的文章）"""
+        with self._lock:
+            count = len(self._pending)
+            self._pending.clear()
+        return count
+
+    def expire(self) -> int:
+        """
+        按 first_seen 索引删除过期的ID
+
+        布隆过滤器不支持删除，有ID过期时按剩余的ID重建，避免长期运行的进程中过滤器被旧ID填满
+
+        Returns:
+            删除的行数
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM seen_articles WHERE first_seen < ?", (cutoff,)).rowcount
+            if removed or self._bloom is None:
+                self._bloom = self._build_bloom()
+        return removed
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
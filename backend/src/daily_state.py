@@ -0,0 +1,116 @@
+"""
+当日状态模块
+保存当天已处理的文章（含中文摘要）和综合分析，日内多次运行时只对新到达的文章调用 LLM
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DailyState:
+    """某一天的累积状态"""
+
+    def __init__(self, date: str, articles: Optional[List[Dict]] = None,
+                 analysis: Optional[Dict] = None, cycles: int = 0):
+        """
+        初始化状态
+
+        Args:
+            date: 日期（YYYY-MM-DD）
+            articles: 当天已处理的文章
+            analysis: 当前的综合分析
+            cycles: 已完成的运行次数
+        """
+        self.date = date
+        self.articles = articles or []
+        self.analysis = analysis
+        self.cycles = cycles
+        self._ids = {article.get('id') for article in self.articles}
+
+    def merge(self, articles: List[Dict]) -> List[Dict]:
+        """
+        加入本次抓取的文章
+
+        Returns:
+            之前没有处理过的新文章
+        """
+        new_articles = [article for article in articles if article.get('id') not in self._ids]
+        for article in new_articles:
+            self._ids.add(article.get('id'))
+        self.articles.extend(new_articles)
+        return new_articles
+
+    def is_known(self, article: Dict) -> bool:
+        """文章是否已在当天状态中（包括本次加入的文章）"""
+        return article.get('id') in self._ids
+
+    def to_dict(self) -> Dict:
+        return {
+            'date': self.date,
+            'cycles': self.cycles,
+            'updated_at': time.time(),
+            'analysis': self.analysis,
+            'articles': self.articles,
+        }
+
+
+class DailyStateStore:
+    """按日期保存当日状态（每天一个 JSON 文件）"""
+
+    def __init__(self, state_dir: str, keep_days: int = 7):
+        """
+        初始化存储
+
+        Args:
+            state_dir: 状态文件目录
+            keep_days: 状态文件保留天数
+        """
+        self.state_dir = state_dir
+        self.keep_days = keep_days
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _path(self, date: str) -> str:
+        return os.path.join(self.state_dir, f"{date}.json")
+
+    def load(self, date: Optional[str] = None) -> DailyState:
+        """
+        读取某天的状态（默认今天），不存在或损坏时返回空状态
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        path = self._path(date)
+        if not os.path.exists(path):
+            return DailyState(date)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            state = DailyState(date, data.get('articles', []), data.get('analysis'), data.get('cycles', 0))
+            logger.info(f"已加载当日状态: {len(state.articles)} 篇文章，已运行 {state.cycles} 次")
+            return state
+        except Exception as e:
+            logger.warning(f"读取当日状态失败，将从头开始: {e}")
+            return DailyState(date)
+
+    def save(self, state: DailyState) -> None:
+        """保存状态（先写临时文件再替换），并清理过期的状态文件"""
+        state.cycles += 1
+        path = self._path(state.date)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._expire()
+
+    def _expire(self) -> None:
+        cutoff = (datetime.now() - timedelta(days=self.keep_days)).strftime("%Y-%m-%d")
+        for name in os.listdir(self.state_dir):
+            if name.endswith('.json') and name[:-5] < cutoff:
+                try:
+                    os.remove(os.path.join(self.state_dir, name))
+                except OSError as e:
+                    logger.warning(f"删除过期状态文件失败 {name}: {e}")
@@ -0,0 +1,290 @@
+"""
+近似重复检测模块
+使用 MinHash + LSH 分桶索引识别跨来源报道的同一新闻，并合并为一篇规范文章
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# MinHash 使用的梅森素数 2^61 - 1
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 英文停用词（不参与相似度计算）
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'by', 'at', 'from',
+    'is', 'are', 'was', 'were', 'be', 'its', 'it', 'this', 'that', 'as', 'new', 'how', 'why',
+    'what', 'now', 'has', 'have', 'will', 'can', 'about', 'after', 'into', 'over', 'says',
+}
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9\.\-\+]*|[一-鿿]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将标题/摘要切分为词列表（保留重复，供词频统计使用）
+
+    英文按单词切分并去除停用词；中文按相邻两字切分（单字词保留原样）。
+    """
+    text = _TAG_RE.sub(' ', text or '').lower()
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if '一' <= token[0] <= '鿿':
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            token = token.strip('.-+')
+            if len(token) > 1 and token not in STOPWORDS:
+                tokens.append(token)
+    return tokens
+
+
+def normalize_tokens(text: str) -> Set[str]:
+    """将标题/摘要规范化为词集合"""
+    return set(tokenize(text))
+
+
+class MinHasher:
+    """MinHash 签名计算器"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        初始化签名计算器
+
+        Args:
+            num_perm: 置换（哈希函数）数量
+            seed: 随机种子，保证跨运行签名一致
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens: Set[str]) -> List[int]:
+        """计算词集合的 MinHash 签名"""
+        if not tokens:
+            return [_MAX_HASH] * self.num_perm
+        hashes = [
+            int.from_bytes(hashlib.blake2b(t.encode(), digest_size=4).digest(), 'little')
+            for t in tokens
+        ]
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        ]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """根据签名估计 Jaccard 相似度"""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class NearDuplicateDetector:
+    """跨来源近似重复检测器（LSH 索引持久化在 SQLite 中）"""
+
+    def __init__(self, db_path: str, threshold: float = 0.5, num_perm: int = 64,
+                 bands: int = 16, ttl_days: int = 7, drop_previously_seen: bool = True):
+        """
+        初始化检测器
+
+        Args:
+            db_path: 索引数据库路径
+            threshold: 判定为重复的相似度阈值
+            num_perm: MinHash 签名长度
+            bands: LSH 分段数（num_perm 需能被整除）
+            ttl_days: 索引保留天数
+            drop_previously_seen: 是否丢弃与往期已收录文章重复的新文章
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.db_path = db_path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ttl_seconds = ttl_days * 86400
+        self.drop_previously_seen = drop_previously_seen
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS story_docs ("
+            " article_id TEXT PRIMARY KEY, signature TEXT NOT NULL,"
+            " title TEXT, link TEXT, source_name TEXT, first_seen REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_story_docs_first_seen ON story_docs(first_seen);"
+            "CREATE TABLE IF NOT EXISTS story_buckets ("
+            " band INTEGER NOT NULL, bucket TEXT NOT NULL, article_id TEXT NOT NULL,"
+            " first_seen REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_story_buckets_key ON story_buckets(band, bucket);"
+            "CREATE INDEX IF NOT EXISTS idx_story_buckets_first_seen ON story_buckets(first_seen);"
+        )
+        self.expire()
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, str]]:
+        """将签名切分为 LSH 分段并计算桶键"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(','.join(map(str, chunk)).encode(), digest_size=8).hexdigest()
+            keys.append((band, digest))
+        return keys
+
+    def _article_signature(self, article: Dict) -> List[int]:
+        """计算文章（标题 + 摘要开头）的签名"""
+        text = f"{article.get('title', '')} {article.get('summary', '')[:300]}"
+        return self.hasher.signature(normalize_tokens(text))
+
+    def _find_indexed(self, signature: List[int], band_keys: List[Tuple[int, str]]) -> Optional[Dict]:
+        """在持久化索引中查找与签名相似的往期文章"""
+        candidates = set()
+        with self._lock:
+            for band, bucket in band_keys:
+                rows = self._conn.execute(
+                    "SELECT article_id FROM story_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+                ).fetchall()
+                candidates.update(row[0] for row in rows)
+            best = None
+            for article_id in candidates:
+                row = self._conn.execute(
+                    "SELECT signature, title, link, source_name FROM story_docs WHERE article_id = ?",
+                    (article_id,)
+                ).fetchone()
+                if not row:
+                    continue
+                score = estimate_similarity(signature, json.loads(row[0]))
+                if score >= self.threshold and (best is None or score > best['score']):
+                    best = {'article_id': article_id, 'title': row[1], 'link': row[2],
+                            'source_name': row[3], 'score': score}
+        return best
+
+    def collapse(self, articles: List[Dict], use_history: bool = True) -> List[Dict]:
+        """
+        合并近似重复的文章
+
+        按输入顺序（排序靠前者优先）保留规范文章，其余重复文章的来源记录在
+        规范文章的 alternate_sources 字段中；与往期已收录文章重复的新文章会被丢弃。
+
+        Args:
+            articles: 已排序的文章列表
+            use_history: 是否查询并更新持久化索引（离线回放时关闭）
+
+        Returns:
+            去重后的文章列表
+        """
+        if use_history:
+            # 常驻进程（如定时任务）每轮都清理过期索引，而不只在启动时
+            self.expire()
+
+        kept: List[Dict] = []
+        run_buckets: Dict[Tuple[int, str], List[int]] = {}
+        run_signatures: List[List[int]] = []
+        new_docs = []
+        merged = dropped = 0
+
+        for article in articles:
+            signature = self._article_signature(article)
+            band_keys = self._band_keys(signature)
+
+            # 1. 本次运行内的重复：合并到排序靠前的规范文章
+            candidates = {idx for key in band_keys for idx in run_buckets.get(key, ())}
+            match = max(
+                ((estimate_similarity(signature, run_signatures[idx]), idx) for idx in candidates),
+                default=(0.0, None)
+            )
+            if match[1] is not None and match[0] >= self.threshold:
+                canonical = kept[match[1]]
+                canonical.setdefault('alternate_sources', []).append({
+                    'source_name': article.get('source_name', ''),
+                    'title': article.get('title', ''),
+                    'link': article.get('link', ''),
+                })
+                merged += 1
+                continue
+
+            # 2. 与往期已收录文章重复
+            previous = self._find_indexed(signature, band_keys) if use_history else None
+            if previous and previous['article_id'] != article.get('id') and self.drop_previously_seen:
+                logger.debug(f"跳过往期已收录的重复报道: {article.get('title', '')[:50]} "
+                             f"(同 {previous['source_name']}: {previous['title'][:50]})")
+                dropped += 1
+                continue
+
+            idx = len(kept)
+            kept.append(article)
+            run_signatures.append(signature)
+            for key in band_keys:
+                run_buckets.setdefault(key, []).append(idx)
+            new_docs.append((article, signature, band_keys))
+
+        if use_history:
+            self._index(new_docs)
+        if merged or dropped:
+            logger.info(f"近似重复检测: 合并 {merged} 篇，跳过往期重复 {dropped} 篇")
+        return kept
+
+    def _index(self, docs: List[Tuple[Dict, List[int], List[Tuple[int, str]]]]) -> None:
+        """将规范文章写入持久化索引"""
+        if not docs:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for article, signature, band_keys in docs:
+                    article_id = article.get('id') or hashlib.md5(
+                        f"{article.get('title', '')}{article.get('link', '')}".encode()
+                    ).hexdigest()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO story_docs "
+                        "(article_id, signature, title, link, source_name, first_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (article_id, json.dumps(signature), article.get('title', '')[:200],
+                         article.get('link', ''), article.get('source_name', ''), now)
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO story_buckets (band, bucket, article_id, first_seen) VALUES (?, ?, ?, ?)",
+                        [(band, bucket, article_id, now) for band, bucket in band_keys]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def expire(self) -> int:
+        """
+        删除超过保留期的索引数据
+
+        Returns:
+            删除的往期文章数
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._conn.execute("DELETE FROM story_buckets WHERE first_seen < ?", (cutoff,))
+            removed = self._conn.execute("DELETE FROM story_docs WHERE first_seen < ?", (cutoff,)).rowcount
+        if removed:
+            logger.info(f"近似重复索引: 清理 {removed} 篇过期文章")
+        return removed
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
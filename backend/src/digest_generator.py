@@ -1,30 +1,118 @@
 """
 简报生成模块
-将抓取的文章整理成格式化的Markdown简报
+将抓取的文章整理成简报模型，并输出为 Markdown、HTML、JSON、纯文本和 Atom 订阅源等格式
 """
 
+import html
+import io
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TextIO, Tuple
 import logging
 
+from src.digest_model import Digest, build_digest
+from src.digest_renderer import DigestEmitter, create_emitter, HTML_DOCUMENT_HEAD, HTML_DOCUMENT_TAIL
+
 logger = logging.getLogger(__name__)
 
 class DigestGenerator:
     """简报生成器"""
     
-    def __init__(self, output_dir: str = "output", title: str = "AI 每日简报"):
+    # 每个分类最多展示的文章数
+    MAX_PER_CATEGORY = 10
+    # 未分类时每个来源最多展示的文章数
+    MAX_PER_SOURCE = 5
+    
+    CATEGORY_ICONS = {
+        "大语言模型": "🤖",
+        "AI应用与产品": "🚀",
+        "研究与论文": "📚",
+        "行业动态": "🏢",
+        "其他": "📌"
+    }
+    
+    def __init__(self, output_dir: str = "output", title: str = "AI 每日简报",
+                 emitter_options: Optional[Dict[str, Dict]] = None):
         """
         初始化生成器
         
         Args:
             output_dir: 输出目录
             title: 简报标题
+            emitter_options: 各输出格式的参数 {格式名: 参数}（如 Atom 订阅源的 feed_url）
         """
         self.output_dir = output_dir
         self.title = title
+        self.emitter_options = emitter_options or {}
+        self._emitters: Dict[str, DigestEmitter] = {}
         os.makedirs(output_dir, exist_ok=True)
     
+    def build(self, articles: List[Dict], analysis: Optional[Dict] = None,
+              categories: Optional[Dict[str, List[Dict]]] = None,
+              now: Optional[datetime] = None) -> Digest:
+        """
+        构建简报模型（每次运行构建一次，各输出格式共用）
+        
+        Args:
+            articles: 文章列表
+            analysis: LLM分析结果
+            categories: 分类后的文章
+            now: 生成时间（默认当前时间）
+            
+        Returns:
+            简报模型
+        """
+        return build_digest(self.title, articles, self.plan_sections(articles, categories), analysis,
+                            categorized=bool(categories), now=now)
+    
+    def emitter(self, name: str) -> DigestEmitter:
+        """获取指定格式的输出器"""
+        if name not in self._emitters:
+            self._emitters[name] = create_emitter(name, **self.emitter_options.get(name, {}))
+        return self._emitters[name]
+    
+    def emit(self, digest: Digest, name: str, out: Optional[TextIO] = None) -> Optional[str]:
+        """
+        将简报输出为指定格式
+        
+        Args:
+            digest: 简报模型
+            name: 格式名（markdown、html、json、text、atom）
+            out: 输出流（为 None 时返回字符串）
+            
+        Returns:
+            未指定输出流时返回输出内容
+        """
+        if out is not None:
+            self.emitter(name).emit(digest, out)
+            return None
+        buffer = io.StringIO()
+        self.emitter(name).emit(digest, buffer)
+        return buffer.getvalue()
+    
+    def save_outputs(self, digest: Digest, formats: List[str],
+                     output_dir: Optional[str] = None) -> Dict[str, str]:
+        """
+        将简报按多种格式保存到文件
+        
+        Args:
+            digest: 简报模型
+            formats: 格式名列表
+            output_dir: 输出目录（默认为生成器的输出目录）
+            
+        Returns:
+            {格式名: 文件路径}
+        """
+        output_dir = output_dir or self.output_dir
+        paths = {}
+        for name in formats:
+            path = os.path.join(output_dir, self.emitter(name).filename(digest))
+            with open(path, 'w', encoding='utf-8') as f:
+                self.emit(digest, name, f)
+            paths[name] = path
+            logger.info(f"简报（{name}）已保存到: {path}")
+        return paths
+    
     def generate_markdown(self, articles: List[Dict], 
                           analysis: Optional[Dict] = None,
                           categories: Optional[Dict[str, List[Dict]]] = None) -> str:
@@ -39,130 +127,59 @@ class DigestGenerator:
         Returns:
             Markdown格式的简报内容
         """
-        today = datetime.now().strftime("%Y年%m月%d日")
-        weekday = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][datetime.now().weekday()]
+        return self.emit(self.build(articles, analysis, categories), 'markdown')
+    
+    def render(self, articles: List[Dict], analysis: Optional[Dict] = None,
+               categories: Optional[Dict[str, List[Dict]]] = None,
+               md_out: Optional[TextIO] = None, html_out: Optional[TextIO] = None) -> None:
+        """
+        构建一次简报模型，生成 Markdown 简报和 HTML 邮件
         
-        md_content = f"""# {self.title}
-
-**{today} {weekday}** | 共收录 {len(articles)} 篇文章
-
----
-
-"""
+        Args:
+            articles: 文章列表
+            analysis: LLM分析结果
+            categories: 分类后的文章
+            md_out: Markdown 输出流（为 None 时不生成）
+            html_out: HTML 输出流，写入完整的 HTML 文档（为 None 时不生成）
+        """
+        digest = self.build(articles, analysis, categories)
+        if md_out is not None:
+            self.emit(digest, 'markdown', md_out)
+        if html_out is not None:
+            self.emit(digest, 'html', html_out)
+    
+    def plan_sections(self, articles: List[Dict],
+                      categories: Optional[Dict[str, List[Dict]]] = None) -> List[Tuple[str, str, List[Dict]]]:
+        """
+        确定简报中展示的分组和文章
         
-        # 添加综合分析
-        if analysis:
-            md_content += """## 📊 今日概览
-
-"""
-            if analysis.get('overview'):
-                md_content += f"{analysis['overview']}\n\n"
-            
-            if analysis.get('highlights'):
-                md_content += "### 🔥 今日要点\n\n"
-                for i, highlight in enumerate(analysis['highlights'], 1):
-                    md_content += f"{i}. {highlight}\n"
-                md_content += "\n"
-            
-            if analysis.get('trends'):
-                md_content += "### 📈 趋势观察\n\n"
-                for trend in analysis['trends']:
-                    md_content += f"- {trend}\n"
-                md_content += "\n"
-            
-            if analysis.get('recommendation'):
-                md_content += f"### ⭐ 今日推荐\n\n{analysis['recommendation']}\n\n"
-            
-            md_content += "---\n\n"
+        简报模型和按需生成摘要共用这一结果，只为实际展示的文章调用 LLM。
         
-        # 按分类展示文章
-        if categories:
-            md_content += "## 📰 详细内容\n\n"
-            
-            category_icons = {
-                "大语言模型": "🤖",
-                "AI应用与产品": "🚀",
-                "研究与论文": "📚",
-                "行业动态": "🏢",
-                "其他": "📌"
-            }
-            
-            for category, cat_articles in categories.items():
-                if cat_articles:
-                    icon = category_icons.get(category, "📌")
-                    md_content += f"### {icon} {category}\n\n"
-                    
-                    for article in cat_articles[:10]:  # 每个分类最多10篇
-                        md_content += self._format_article(article)
-                    
-                    md_content += "\n"
-        else:
-            # 如果没有分类，按来源展示
-            md_content += "## 📰 最新文章\n\n"
-            
-            # 按来源分组
-            by_source = {}
-            for article in articles:
-                source = article.get('source_name', '其他')
-                if source not in by_source:
-                    by_source[source] = []
-                by_source[source].append(article)
+        Args:
+            articles: 文章列表
+            categories: 分类后的文章（为空时按来源分组）
             
-            for source, source_articles in by_source.items():
-                md_content += f"### 📍 {source}\n\n"
-                for article in source_articles[:5]:
-                    md_content += self._format_article(article)
-                md_content += "\n"
-        
-        # 添加页脚
-        md_content += """---
-
-## 📌 关于本简报
-
-本简报由 AI Daily Digest 自动生成，汇集了以下信息源的最新内容：
-
-- **公司博客**: OpenAI, Google AI, Anthropic
-- **学术研究**: Berkeley AI Research, MIT AI News, arXiv
-- **技术博客**: Simon Willison, Lilian Weng, The Batch
-- **社区讨论**: Hacker News, Reddit ML
-
-如有问题或建议，请回复此邮件。
-
----
-*生成时间: {timestamp}*
-""".format(timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        Returns:
+            [(图标, 分组名, 展示的文章列表)]
+        """
+        if categories:
+            return [
+                (self.CATEGORY_ICONS.get(category, "📌"), category, cat_articles[:self.MAX_PER_CATEGORY])
+                for category, cat_articles in categories.items() if cat_articles
+            ]
         
-        return md_content
+        # 按来源分组
+        by_source = {}
+        for article in articles:
+            by_source.setdefault(article.get('source_name', '其他'), []).append(article)
+        return [("📍", source, source_articles[:self.MAX_PER_SOURCE])
+                for source, source_articles in by_source.items()]
     
-    def _format_article(self, article: Dict) -> str:
-        """格式化单篇文章"""
-        title = article.get('title', '无标题')
-        link = article.get('link', '#')
-        summary = article.get('chinese_summary', article.get('summary', ''))
-        source = article.get('source_name', '')
-        
-        # 解析发布时间
-        pub_date = article.get('published', '')
-        if pub_date:
-            try:
-                dt = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                pub_date = dt.strftime("%m-%d %H:%M")
-            except:
-                pub_date = pub_date[:10] if len(pub_date) > 10 else pub_date
-        
-        formatted = f"**[{title}]({link})**\n"
-        if pub_date:
-            formatted += f"*{source} | {pub_date}*\n\n"
-        else:
-            formatted += f"*{source}*\n\n"
-        
-        if summary:
-            # 限制摘要长度
-            if len(summary) > 300:
-                summary = summary[:300] + "..."
-            formatted += f"> {summary}\n\n"
-        
-        return formatted
+    def plan_articles(self, articles: List[Dict],
+                      categories: Optional[Dict[str, List[Dict]]] = None) -> List[Dict]:
+        """按展示顺序返回简报中实际展示的文章"""
+        return [article for _, _, section_articles in self.plan_sections(articles, categories)
+                for article in section_articles]
     
     def save_digest(self, content: str, filename: Optional[str] = None) -> str:
         """
@@ -188,7 +205,7 @@ class DigestGenerator:
     
     def generate_html(self, markdown_content: str) -> str:
         """
-        将Markdown转换为HTML（用于邮件发送）
+        将Markdown文本转换为HTML（只有Markdown文本时使用；生成简报时请用 build 构建模型后按格式输出）
         
         Args:
             markdown_content: Markdown内容
@@ -204,82 +221,7 @@ class DigestGenerator:
             extensions=['tables', 'fenced_code', 'toc']
         )
         
-        # 包装成完整的HTML文档
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.title}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        h2 {{
-            color: #34495e;
-            margin-top: 30px;
-        }}
-        h3 {{
-            color: #7f8c8d;
-        }}
-        a {{
-            color: #3498db;
-            text-decoration: none;
-        }}
-        a:hover {{
-            text-decoration: underline;
-        }}
-        blockquote {{
-            border-left: 4px solid #3498db;
-            margin: 10px 0;
-            padding: 10px 20px;
-            background-color: #f8f9fa;
-            color: #666;
-        }}
-        hr {{
-            border: none;
-            border-top: 1px solid #eee;
-            margin: 20px 0;
-        }}
-        code {{
-            background-color: #f4f4f4;
-            padding: 2px 6px;
-            border-radius: 3px;
-        }}
-        .footer {{
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 1px solid #eee;
-            font-size: 0.9em;
-            color: #999;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        {html_body}
-    </div>
-</body>
-</html>
-"""
-        return html_content
+        return HTML_DOCUMENT_HEAD.format(title=html.escape(self.title)) + html_body + HTML_DOCUMENT_TAIL
 
 
 def test_generator():
@@ -0,0 +1,198 @@
+"""
+简报数据模型
+每次运行只构建一次的中间表示：文章的展示字段（发布时间、截断后的摘要、来源信息等）在构建时计算一次，
+各输出格式（Markdown、HTML、JSON、纯文本、Atom 订阅源）共用这些字段
+"""
+
+import html
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+# 文章摘要的最大展示长度
+MAX_SUMMARY_CHARS = 300
+
+
+def parse_published(published: str) -> Optional[datetime]:
+    """解析 ISO 格式的发布时间（无法解析时返回 None）"""
+    if not published:
+        return None
+    try:
+        return datetime.fromisoformat(published.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def format_pub_date(published: str, parsed: Optional[datetime] = None) -> str:
+    """将 ISO 格式的发布时间转换为 "月-日 时:分"（无法解析时保留日期部分）"""
+    if not published:
+        return ''
+    parsed = parsed or parse_published(published)
+    if parsed is None:
+        return published[:10] if len(published) > 10 else published
+    return parsed.strftime("%m-%d %H:%M")
+
+
+def display_summary(article: Dict) -> str:
+    """文章展示用的摘要（优先中文摘要，超长时截断）"""
+    summary = article.get('chinese_summary', article.get('summary', ''))
+    if summary and len(summary) > MAX_SUMMARY_CHARS:
+        summary = summary[:MAX_SUMMARY_CHARS] + "..."
+    return summary
+
+
+@dataclass
+class DigestArticle:
+    """简报中的一篇文章（展示字段已格式化）"""
+    title: str
+    link: str
+    source: str
+    published: str                       # 原始发布时间（ISO 格式）
+    published_at: Optional[datetime]     # 解析后的发布时间
+    pub_date: str                        # 展示用的发布时间（月-日 时:分）
+    meta: str                            # 来源和发布时间（"来源 | 时间"）
+    summary: str                         # 展示用的摘要（已截断）
+    alternates: List[Tuple[str, str]]    # 同一故事的其他来源 [(来源名, 链接)]
+    category: str
+    raw: Dict                            # 原始文章字典（JSON 输出保持原有字段）
+
+    @classmethod
+    def from_dict(cls, article: Dict) -> 'DigestArticle':
+        """由抓取的文章字典构建"""
+        published = article.get('published', '')
+        published_at = parse_published(published)
+        pub_date = format_pub_date(published, published_at)
+        source = article.get('source_name', '')
+        return cls(
+            title=article.get('title', '无标题'),
+            link=article.get('link', '#'),
+            source=source,
+            published=published,
+            published_at=published_at,
+            pub_date=pub_date,
+            meta=f"{source} | {pub_date}" if pub_date else source,
+            summary=display_summary(article),
+            alternates=[(alt.get('source_name', ''), alt.get('link', '#'))
+                        for alt in article.get('alternate_sources') or []],
+            category=article.get('category', ''),
+            raw=article,
+        )
+
+    @cached_property
+    def escaped(self) -> Dict[str, str]:
+        """HTML/XML 转义后的字段（HTML 和 Atom 输出共用，首次使用时计算）"""
+        return {
+            'title': html.escape(self.title),
+            'link': html.escape(self.link),
+            'source': html.escape(self.source),
+            'meta': html.escape(self.meta),
+            'summary': html.escape(self.summary),
+        }
+
+
+@dataclass
+class DigestSection:
+    """简报中的一个分组（主题分类或来源）"""
+    icon: str
+    name: str
+    articles: List[DigestArticle]
+
+
+@dataclass
+class DigestAnalysis:
+    """LLM 综合分析结果"""
+    overview: str = ''
+    highlights: List[str] = field(default_factory=list)
+    trends: List[str] = field(default_factory=list)
+    recommendation: str = ''
+    raw: Dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, analysis: Optional[Dict]) -> Optional['DigestAnalysis']:
+        """由 LLM 分析结果构建（结果为空时返回 None）"""
+        if not analysis:
+            return None
+        return cls(
+            overview=str(analysis.get('overview') or ''),
+            highlights=[str(item) for item in analysis.get('highlights') or []],
+            trends=[str(item) for item in analysis.get('trends') or []],
+            recommendation=str(analysis.get('recommendation') or ''),
+            raw=analysis,
+        )
+
+
+@dataclass
+class Digest:
+    """一期简报"""
+    title: str
+    generated_at: datetime
+    articles: List[DigestArticle]        # 收录的全部文章（按排名）
+    sections: List[DigestSection]        # 展示的分组（文章与 articles 中为同一对象）
+    analysis: Optional[DigestAnalysis] = None
+    categorized: bool = True             # 分组是否为主题分类（否则为按来源分组）
+
+    @property
+    def article_count(self) -> int:
+        return len(self.articles)
+
+    @property
+    def date(self) -> str:
+        return self.generated_at.strftime("%Y-%m-%d")
+
+    @property
+    def date_label(self) -> str:
+        return self.generated_at.strftime("%Y年%m月%d日")
+
+    @property
+    def weekday(self) -> str:
+        return WEEKDAYS[self.generated_at.weekday()]
+
+    @property
+    def timestamp(self) -> str:
+        return self.generated_at.strftime("%Y-%m-%d %H:%M:%S")
+
+    def shown_articles(self) -> List[DigestArticle]:
+        """按展示顺序返回各分组中的文章"""
+        return [article for section in self.sections for article in section.articles]
+
+
+def build_digest(title: str, articles: List[Dict], sections: List[Tuple[str, str, List[Dict]]],
+                 analysis: Optional[Dict] = None, categorized: bool = True,
+                 now: Optional[datetime] = None) -> Digest:
+    """
+    构建简报模型（每篇文章只格式化一次，分组和文章列表共用同一对象）
+
+    Args:
+        title: 简报标题
+        articles: 收录的文章列表
+        sections: [(图标, 分组名, 文章列表)]，见 DigestGenerator.plan_sections
+        analysis: LLM分析结果
+        categorized: 分组是否为主题分类
+        now: 生成时间（默认当前时间）
+
+    Returns:
+        简报模型
+    """
+    converted: Dict[int, DigestArticle] = {}
+
+    def convert(article: Dict) -> DigestArticle:
+        item = converted.get(id(article))
+        if item is None:
+            item = converted[id(article)] = DigestArticle.from_dict(article)
+        return item
+
+    return Digest(
+        title=title,
+        generated_at=now or datetime.now(),
+        articles=[convert(article) for article in articles],
+        sections=[DigestSection(icon, name, [convert(article) for article in section_articles])
+                  for icon, name, section_articles in sections],
+        analysis=DigestAnalysis.from_dict(analysis),
+        categorized=categorized,
+    )
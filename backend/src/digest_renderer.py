@@ -0,0 +1,458 @@
+"""
+简报输出模块
+各输出格式（Markdown、HTML、JSON、纯文本、Atom 订阅源）实现为输出器，读取同一个简报模型
+（见 digest_model），使用预编译模板写入文本流；HTML 不再由 Markdown 文本二次解析生成
+"""
+
+import html
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, TextIO, Type
+
+from src.digest_model import Digest, DigestAnalysis, DigestArticle
+
+logger = logging.getLogger(__name__)
+
+_escape = html.escape
+
+# ---- Markdown 模板（预先绑定 str.format）----
+_MD_HEADER = "# {title}\n\n**{date} {weekday}** | 共收录 {count} 篇文章\n\n---\n\n".format
+_MD_OVERVIEW_TITLE = "## 📊 今日概览\n\n"
+_MD_PARAGRAPH = "{0}\n\n".format
+_MD_HIGHLIGHTS_TITLE = "### 🔥 今日要点\n\n"
+_MD_ORDERED_ITEM = "{0}. {1}\n".format
+_MD_TRENDS_TITLE = "### 📈 趋势观察\n\n"
+_MD_BULLET_ITEM = "- {0}\n".format
+_MD_RECOMMENDATION = "### ⭐ 今日推荐\n\n{0}\n\n".format
+_MD_RULE = "---\n\n"
+_MD_SECTION = "### {0} {1}\n\n".format
+_MD_ARTICLE_TITLE = "**[{0}]({1})**\n".format
+_MD_ARTICLE_META = "*{0}*\n\n".format
+_MD_ARTICLE_SUMMARY = "> {0}\n\n".format
+_MD_ALTERNATE = "[{0}]({1})".format
+_MD_ALTERNATES = "*另见: {0}*\n\n".format
+
+# ---- HTML 模板（结构与 markdown 库转换上述 Markdown 的结果一致）----
+_HTML_HEADER = "<h1>{title}</h1>\n<p><strong>{date} {weekday}</strong> | 共收录 {count} 篇文章</p>\n<hr />\n".format
+_HTML_OVERVIEW_TITLE = "<h2>📊 今日概览</h2>\n"
+_HTML_PARAGRAPH = "<p>{0}</p>\n".format
+_HTML_HIGHLIGHTS_TITLE = "<h3>🔥 今日要点</h3>\n"
+_HTML_TRENDS_TITLE = "<h3>📈 趋势观察</h3>\n"
+_HTML_LIST_ITEM = "<li>{0}</li>\n".format
+_HTML_RECOMMENDATION = "<h3>⭐ 今日推荐</h3>\n<p>{0}</p>\n".format
+_HTML_RULE = "<hr />\n"
+_HTML_HEADING2 = "<h2>{0}</h2>\n".format
+_HTML_SECTION = "<h3>{0} {1}</h3>\n".format
+_HTML_ARTICLE = '<p><strong><a href="{1}">{0}</a></strong>\n<em>{2}</em></p>\n'.format
+_HTML_ARTICLE_SUMMARY = "<blockquote>\n<p>{0}</p>\n</blockquote>\n".format
+_HTML_ALTERNATE = '<a href="{1}">{0}</a>'.format
+_HTML_ALTERNATES = "<p><em>另见: {0}</em></p>\n".format
+
+_MD_FOOTER = """---
+
+## 📌 关于本简报
+
+本简报由 AI Daily Digest 自动生成，汇集了以下信息源的最新内容：
+
+- **公司博客**: OpenAI, Google AI, Anthropic
+- **学术研究**: Berkeley AI Research, MIT AI News, arXiv
+- **技术博客**: Simon Willison, Lilian Weng, The Batch
+- **社区讨论**: Hacker News, Reddit ML
+
+如有问题或建议，请回复此邮件。
+
+---
+*生成时间: {timestamp}*
+""".format
+
+_HTML_FOOTER = """<hr />
+<h2>📌 关于本简报</h2>
+<p>本简报由 AI Daily Digest 自动生成，汇集了以下信息源的最新内容：</p>
+<ul>
+<li><strong>公司博客</strong>: OpenAI, Google AI, Anthropic</li>
+<li><strong>学术研究</strong>: Berkeley AI Research, MIT AI News, arXiv</li>
+<li><strong>技术博客</strong>: Simon Willison, Lilian Weng, The Batch</li>
+<li><strong>社区讨论</strong>: Hacker News, Reddit ML</li>
+</ul>
+<p>如有问题或建议，请回复此邮件。</p>
+<hr />
+<p><em>生成时间: {timestamp}</em></p>
+""".format
+
+# 邮件 HTML 文档外壳（正文写在 HTML_DOCUMENT_HEAD 和 HTML_DOCUMENT_TAIL 之间）
+HTML_DOCUMENT_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }}
+        .container {{
+            background-color: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        h1 {{
+            color: #2c3e50;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+        }}
+        h2 {{
+            color: #34495e;
+            margin-top: 30px;
+        }}
+        h3 {{
+            color: #7f8c8d;
+        }}
+        a {{
+            color: #3498db;
+            text-decoration: none;
+        }}
+        a:hover {{
+            text-decoration: underline;
+        }}
+        blockquote {{
+            border-left: 4px solid #3498db;
+            margin: 10px 0;
+            padding: 10px 20px;
+            background-color: #f8f9fa;
+            color: #666;
+        }}
+        hr {{
+            border: none;
+            border-top: 1px solid #eee;
+            margin: 20px 0;
+        }}
+        code {{
+            background-color: #f4f4f4;
+            padding: 2px 6px;
+            border-radius: 3px;
+        }}
+        .footer {{
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #eee;
+            font-size: 0.9em;
+            color: #999;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        """
+HTML_DOCUMENT_TAIL = """
+    </div>
+</body>
+</html>
+"""
+
+
+
+# ---- 纯文本模板 ----
+_TEXT_HEADER = "{title}\n{date} {weekday} | 共收录 {count} 篇文章\n\n".format
+_TEXT_HEADING = "【{0}】\n\n".format
+_TEXT_ORDERED_ITEM = "  {0}. {1}\n".format
+_TEXT_BULLET_ITEM = "  - {0}\n".format
+_TEXT_SECTION = "== {0} {1} ==\n\n".format
+_TEXT_ARTICLE = "* {0}\n  {1}\n  {2}\n".format
+_TEXT_ARTICLE_SUMMARY = "  {0}\n".format
+_TEXT_ALTERNATES = "  另见: {0}\n".format
+_TEXT_RULE = "-" * 40 + "\n"
+
+# ---- Atom 订阅源模板 ----
+_ATOM_HEAD = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>{title}</title>
+  <id>{feed_id}</id>
+  <updated>{updated}</updated>
+  <author><name>{title}</name></author>
+  <generator>AI Daily Digest</generator>
+""".format
+_ATOM_SUBTITLE = "  <subtitle>{0}</subtitle>\n".format
+_ATOM_LINK = '  <link rel="{0}" href="{1}"/>\n'.format
+_ATOM_ENTRY = """  <entry>
+    <title>{title}</title>
+    <id>{entry_id}</id>
+    <link rel="alternate" href="{link}"/>
+    <updated>{updated}</updated>
+    <author><name>{source}</name></author>
+    <category term="{category}"/>
+""".format
+_ATOM_ENTRY_SUMMARY = '    <summary type="text">{0}</summary>\n'.format
+_ATOM_RELATED = '    <link rel="related" href="{0}" title="{1}"/>\n'.format
+_ATOM_ENTRY_END = "  </entry>\n"
+_ATOM_TAIL = "</feed>\n"
+
+
+def _rfc3339(value: datetime) -> str:
+    """Atom 使用的 RFC 3339 时间格式（value 需带时区）"""
+    return value.isoformat(timespec='seconds')
+
+
+class DigestEmitter:
+    """输出器基类：将简报模型写入文本流"""
+
+    # 格式名（配置和 DigestGenerator.emit 中使用）
+    name = ''
+    # 保存文件时的扩展名
+    extension = ''
+
+    def filename(self, digest: Digest) -> str:
+        """保存到输出目录时的文件名"""
+        return f"ai_digest_{digest.generated_at.strftime('%Y%m%d')}.{self.extension}"
+
+    def emit(self, digest: Digest, out: TextIO) -> None:
+        """将简报写入输出流"""
+        raise NotImplementedError
+
+
+class MarkdownEmitter(DigestEmitter):
+    """Markdown 简报"""
+
+    name = 'markdown'
+    extension = 'md'
+
+    def emit(self, digest: Digest, out: TextIO) -> None:
+        write = out.write
+        write(_MD_HEADER(title=digest.title, date=digest.date_label, weekday=digest.weekday,
+                         count=digest.article_count))
+        if digest.analysis:
+            self._emit_analysis(digest.analysis, write)
+
+        write(f"## {'📰 详细内容' if digest.categorized else '📰 最新文章'}\n\n")
+        for section in digest.sections:
+            write(_MD_SECTION(section.icon, section.name))
+            for article in section.articles:
+                self._emit_article(article, write)
+            write("\n")
+        write(_MD_FOOTER(timestamp=digest.timestamp))
+
+    @staticmethod
+    def _emit_analysis(analysis: DigestAnalysis, write) -> None:
+        write(_MD_OVERVIEW_TITLE)
+        if analysis.overview:
+            write(_MD_PARAGRAPH(analysis.overview))
+        if analysis.highlights:
+            write(_MD_HIGHLIGHTS_TITLE)
+            write(''.join(_MD_ORDERED_ITEM(i, item) for i, item in enumerate(analysis.highlights, 1)))
+            write("\n")
+        if analysis.trends:
+            write(_MD_TRENDS_TITLE)
+            write(''.join(_MD_BULLET_ITEM(item) for item in analysis.trends))
+            write("\n")
+        if analysis.recommendation:
+            write(_MD_RECOMMENDATION(analysis.recommendation))
+        write(_MD_RULE)
+
+    @staticmethod
+    def _emit_article(article: DigestArticle, write) -> None:
+        write(_MD_ARTICLE_TITLE(article.title, article.link))
+        write(_MD_ARTICLE_META(article.meta))
+        if article.summary:
+            write(_MD_ARTICLE_SUMMARY(article.summary))
+        if article.alternates:
+            write(_MD_ALTERNATES(", ".join(_MD_ALTERNATE(source, link) for source, link in article.alternates)))
+
+
+class HTMLEmitter(DigestEmitter):
+    """HTML 邮件（结构与 markdown 库转换 Markdown 简报的结果一致）"""
+
+    name = 'html'
+    extension = 'html'
+
+    def __init__(self, document: bool = True):
+        """
+        初始化输出器
+
+        Args:
+            document: 是否输出完整的 HTML 文档（否则只输出正文，见 HTML_DOCUMENT_HEAD / HTML_DOCUMENT_TAIL）
+        """
+        self.document = document
+
+    def emit(self, digest: Digest, out: TextIO) -> None:
+        write = out.write
+        if self.document:
+            write(HTML_DOCUMENT_HEAD.format(title=_escape(digest.title)))
+        write(_HTML_HEADER(title=_escape(digest.title), date=digest.date_label, weekday=digest.weekday,
+                           count=digest.article_count))
+        if digest.analysis:
+            self._emit_analysis(digest.analysis, write)
+
+        write(_HTML_HEADING2("📰 详细内容" if digest.categorized else "📰 最新文章"))
+        for section in digest.sections:
+            write(_HTML_SECTION(section.icon, _escape(section.name)))
+            for article in section.articles:
+                self._emit_article(article, write)
+        write(_HTML_FOOTER(timestamp=digest.timestamp))
+        if self.document:
+            write(HTML_DOCUMENT_TAIL)
+
+    @staticmethod
+    def _emit_analysis(analysis: DigestAnalysis, write) -> None:
+        write(_HTML_OVERVIEW_TITLE)
+        if analysis.overview:
+            write(_HTML_PARAGRAPH(_escape(analysis.overview)))
+        if analysis.highlights:
+            write(_HTML_HIGHLIGHTS_TITLE)
+            write("<ol>\n" + ''.join(_HTML_LIST_ITEM(_escape(item)) for item in analysis.highlights) + "</ol>\n")
+        if analysis.trends:
+            write(_HTML_TRENDS_TITLE)
+            write("<ul>\n" + ''.join(_HTML_LIST_ITEM(_escape(item)) for item in analysis.trends) + "</ul>\n")
+        if analysis.recommendation:
+            write(_HTML_RECOMMENDATION(_escape(analysis.recommendation)))
+        write(_HTML_RULE)
+
+    @staticmethod
+    def _emit_article(article: DigestArticle, write) -> None:
+        escaped = article.escaped
+        write(_HTML_ARTICLE(escaped['title'], escaped['link'], escaped['meta']))
+        if article.summary:
+            write(_HTML_ARTICLE_SUMMARY(escaped['summary']))
+        if article.alternates:
+            write(_HTML_ALTERNATES(", ".join(
+                _HTML_ALTERNATE(_escape(source), _escape(link)) for source, link in article.alternates
+            )))
+
+
+class JSONEmitter(DigestEmitter):
+    """网页数据（data.json：日期、收录的文章原始字段和综合分析）"""
+
+    name = 'json'
+    extension = 'json'
+
+    def emit(self, digest: Digest, out: TextIO) -> None:
+        json.dump({
+            "date": digest.date,
+            "articles": [article.raw for article in digest.articles],
+            "analysis": digest.analysis.raw if digest.analysis else None
+        }, out, ensure_ascii=False, indent=2)
+
+
+class TextEmitter(DigestEmitter):
+    """纯文本简报（适合不渲染 Markdown 的客户端和消息推送）"""
+
+    name = 'text'
+    extension = 'txt'
+
+    def emit(self, digest: Digest, out: TextIO) -> None:
+        write = out.write
+        write(_TEXT_HEADER(title=digest.title, date=digest.date_label, weekday=digest.weekday,
+                           count=digest.article_count))
+        analysis = digest.analysis
+        if analysis:
+            write(_TEXT_HEADING("📊 今日概览"))
+            if analysis.overview:
+                write(analysis.overview + "\n\n")
+            if analysis.highlights:
+                write("今日要点:\n")
+                write(''.join(_TEXT_ORDERED_ITEM(i, item) for i, item in enumerate(analysis.highlights, 1)))
+                write("\n")
+            if analysis.trends:
+                write("趋势观察:\n")
+                write(''.join(_TEXT_BULLET_ITEM(item) for item in analysis.trends))
+                write("\n")
+            if analysis.recommendation:
+                write(f"今日推荐: {analysis.recommendation}\n\n")
+
+        write(_TEXT_HEADING("📰 详细内容" if digest.categorized else "📰 最新文章"))
+        for section in digest.sections:
+            write(_TEXT_SECTION(section.icon, section.name))
+            for article in section.articles:
+                write(_TEXT_ARTICLE(article.title, article.meta, article.link))
+                if article.summary:
+                    write(_TEXT_ARTICLE_SUMMARY(article.summary))
+                if article.alternates:
+                    write(_TEXT_ALTERNATES(", ".join(f"{source} {link}" for source, link in article.alternates)))
+                write("\n")
+        write(_TEXT_RULE)
+        write(f"生成时间: {digest.timestamp}\n")
+
+
+class AtomFeedEmitter(DigestEmitter):
+    """本简报的 Atom 订阅源（每篇收录的文章一个条目，内容为简报中的摘要）"""
+
+    name = 'atom'
+    extension = 'xml'
+
+    def __init__(self, feed_url: str = '', site_url: str = ''):
+        """
+        初始化输出器
+
+        Args:
+            feed_url: 订阅源的公开地址（self 链接，同时作为订阅源 ID）
+            site_url: 网站地址（alternate 链接）
+        """
+        self.feed_url = feed_url
+        self.site_url = site_url
+
+    def filename(self, digest: Digest) -> str:
+        # 订阅源地址固定，每次运行覆盖
+        return "feed.xml"
+
+    def emit(self, digest: Digest, out: TextIO) -> None:
+        write = out.write
+        updated = _rfc3339(digest.generated_at.astimezone())
+        feed_id = self.feed_url or self.site_url or "urn:ai-daily-digest:feed"
+        write(_ATOM_HEAD(title=_escape(digest.title), feed_id=_escape(feed_id), updated=updated))
+        if digest.analysis and digest.analysis.overview:
+            write(_ATOM_SUBTITLE(_escape(digest.analysis.overview)))
+        if self.feed_url:
+            write(_ATOM_LINK("self", _escape(self.feed_url)))
+        if self.site_url:
+            write(_ATOM_LINK("alternate", _escape(self.site_url)))
+
+        for section in digest.sections:
+            category = _escape(section.name)
+            for article in section.articles:
+                escaped = article.escaped
+                published_at = article.published_at
+                if published_at is not None and published_at.tzinfo is None:
+                    published_at = published_at.replace(tzinfo=timezone.utc)
+                article_id = article.raw.get('id')
+                write(_ATOM_ENTRY(
+                    title=escaped['title'],
+                    entry_id=f"urn:ai-daily-digest:article:{_escape(article_id)}" if article_id else escaped['link'],
+                    link=escaped['link'],
+                    updated=_rfc3339(published_at) if published_at else updated,
+                    source=escaped['source'] or _escape(digest.title),
+                    category=category,
+                ))
+                if article.summary:
+                    write(_ATOM_ENTRY_SUMMARY(escaped['summary']))
+                for source, link in article.alternates:
+                    write(_ATOM_RELATED(_escape(link), _escape(source)))
+                write(_ATOM_ENTRY_END)
+        write(_ATOM_TAIL)
+
+
+EMITTERS: Dict[str, Type[DigestEmitter]] = {
+    emitter.name: emitter
+    for emitter in (MarkdownEmitter, HTMLEmitter, JSONEmitter, TextEmitter, AtomFeedEmitter)
+}
+
+
+def create_emitter(name: str, **options) -> DigestEmitter:
+    """
+    按格式名创建输出器
+
+    Args:
+        name: 格式名（markdown、html、json、text、atom）
+        options: 传给输出器构造函数的参数
+
+    Returns:
+        输出器实例
+    """
+    if name not in EMITTERS:
+        raise ValueError(f"未知的简报输出格式: {name}（可选: {', '.join(EMITTERS)}）")
+    return EMITTERS[name](**options)
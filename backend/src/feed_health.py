@@ -0,0 +1,156 @@
+"""
+RSS源健康状态与熔断模块
+记录每个源的成功率、延迟和错误，连续失败的源在冷却期内不再抓取
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.feed_state import FeedStateStore
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """计算百分位数（最近邻插值）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class FeedHealthTracker:
+    """源健康统计与熔断器"""
+
+    def __init__(self, feed_state: FeedStateStore, failure_threshold: int = 3,
+                 cooldown_hours: float = 6, max_cooldown_hours: float = 72,
+                 latency_window: int = 50):
+        """
+        初始化健康统计
+
+        Args:
+            feed_state: 源状态存储
+            failure_threshold: 连续失败多少次后熔断
+            cooldown_hours: 首次熔断的冷却时长
+            max_cooldown_hours: 冷却时长上限（半开试探失败后冷却时长翻倍）
+            latency_window: 每个源保留的延迟样本数
+        """
+        self.feed_state = feed_state
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown_hours * 3600
+        self.max_cooldown = max_cooldown_hours * 3600
+        self.latency_window = latency_window
+
+    def _health(self, feed_id: str) -> Dict:
+        return dict(self.feed_state.get(feed_id).get('health', {}))
+
+    def circuit_state(self, feed_id: str, now: Optional[float] = None) -> str:
+        """
+        返回熔断器状态
+
+        Returns:
+            "closed"（正常）、"open"（冷却中，跳过）或 "half_open"（冷却结束，允许试探一次）
+        """
+        now = now or time.time()
+        open_until = self._health(feed_id).get('circuit_open_until')
+        if not open_until:
+            return 'closed'
+        return 'open' if now < open_until else 'half_open'
+
+    def allow_request(self, feed_id: str, now: Optional[float] = None) -> bool:
+        """熔断器打开（冷却中）时不允许抓取"""
+        return self.circuit_state(feed_id, now) != 'open'
+
+    def attempts_allowed(self, feed_id: str, retry_attempts: int) -> int:
+        """半开状态只试探一次，不再重试；retry_attempts 小于 1 时也至少请求一次"""
+        return 1 if self.circuit_state(feed_id) == 'half_open' else max(1, retry_attempts)
+
+    def record_success(self, feed_id: str, latency: float) -> None:
+        """记录一次成功抓取（含 304），并关闭熔断器"""
+        health = self._health(feed_id)
+        latencies = (health.get('latencies_ms', []) + [round(latency * 1000)])[-self.latency_window:]
+        if health.get('circuit_open_until'):
+            logger.info(f"{feed_id} 已恢复，关闭熔断")
+        health.update({
+            'successes': health.get('successes', 0) + 1,
+            'consecutive_failures': 0,
+            'latencies_ms': latencies,
+            'last_success_at': time.time(),
+            'circuit_open_until': None,
+            'circuit_cooldown': None,
+        })
+        self.feed_state.update(feed_id, health={k: v for k, v in health.items() if v is not None})
+
+    def record_failure(self, feed_id: str, error: str, latency: Optional[float] = None) -> None:
+        """记录一次失败抓取（已用尽重试），必要时打开熔断器"""
+        now = time.time()
+        health = self._health(feed_id)
+        was_half_open = self.circuit_state(feed_id, now) == 'half_open'
+        consecutive = health.get('consecutive_failures', 0) + 1
+        health.update({
+            'failures': health.get('failures', 0) + 1,
+            'consecutive_failures': consecutive,
+            'last_error': str(error)[:300],
+            'last_error_at': now,
+        })
+        if latency is not None:
+            health['latencies_ms'] = (health.get('latencies_ms', []) + [round(latency * 1000)])[-self.latency_window:]
+
+        if was_half_open or consecutive >= self.failure_threshold:
+            # 半开试探失败时冷却时长翻倍
+            cooldown = health.get('circuit_cooldown') or self.cooldown
+            if was_half_open:
+                cooldown = min(cooldown * 2, self.max_cooldown)
+            health['circuit_cooldown'] = cooldown
+            health['circuit_open_until'] = now + cooldown
+            logger.warning(f"{feed_id} 连续失败 {consecutive} 次，熔断 {cooldown / 3600:.1f} 小时")
+        self.feed_state.update(feed_id, health=health)
+
+    def report(self, feeds_config: Dict) -> Dict:
+        """生成所有源的健康报告"""
+        now = time.time()
+        feeds = {}
+        for feed_id, feed_config in feeds_config.items():
+            health = self._health(feed_id)
+            successes = health.get('successes', 0)
+            failures = health.get('failures', 0)
+            latencies = health.get('latencies_ms', [])
+            open_until = health.get('circuit_open_until')
+            feeds[feed_id] = {
+                'name': feed_config.get('name', feed_id),
+                'url': feed_config.get('url', ''),
+                'success_rate': round(successes / (successes + failures), 3) if successes + failures else None,
+                'successes': successes,
+                'failures': failures,
+                'consecutive_failures': health.get('consecutive_failures', 0),
+                'latency_p50_ms': _percentile(latencies, 50),
+                'latency_p95_ms': _percentile(latencies, 95),
+                'last_error': health.get('last_error'),
+                'last_error_at': datetime.fromtimestamp(health['last_error_at']).isoformat()
+                if health.get('last_error_at') else None,
+                'last_success_at': datetime.fromtimestamp(health['last_success_at']).isoformat()
+                if health.get('last_success_at') else None,
+                'circuit': self.circuit_state(feed_id, now),
+                'circuit_open_until': datetime.fromtimestamp(open_until).isoformat() if open_until else None,
+            }
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'feeds': feeds,
+        }
+
+    def write_report(self, path: str, feeds_config: Dict) -> None:
+        """将健康报告写入 JSON 文件"""
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(feeds_config), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"写入源健康报告失败: {e}")
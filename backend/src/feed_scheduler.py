@@ -0,0 +1,95 @@
+"""
+自适应轮询调度模块
+根据每个RSS源的历史发布时间估计更新频率，只轮询可能有新内容的源
+"""
+
+import logging
+import math
+import time
+from typing import Dict, Iterable, Optional
+
+from src.feed_state import FeedStateStore
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePollScheduler:
+    """基于发布频率（泊松过程）估计的轮询调度器"""
+
+    def __init__(self, feed_state: FeedStateStore, min_probability: float = 0.3,
+                 max_staleness_hours: float = 12, history_size: int = 50,
+                 min_history: int = 3, history_window_days: float = 30):
+        """
+        初始化调度器
+
+        Args:
+            feed_state: 源状态存储
+            min_probability: 预计有新文章的概率达到该值才轮询
+            max_staleness_hours: 距上次成功轮询超过该时长时强制轮询
+            history_size: 每个源保留的发布时间数量
+            min_history: 发布记录少于该数量时总是轮询
+            history_window_days: 估计频率时使用的最长历史窗口
+        """
+        self.feed_state = feed_state
+        self.min_probability = min_probability
+        self.max_staleness = max_staleness_hours * 3600
+        self.history_size = history_size
+        self.min_history = min_history
+        self.history_window = history_window_days * 86400
+
+    def estimate_rate(self, feed_id: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        估计源的更新频率
+
+        Returns:
+            每小时发布的文章数；历史记录不足时返回 None
+        """
+        now = now or time.time()
+        history = [t for t in self.feed_state.get(feed_id).get('publish_history', [])
+                   if now - t <= self.history_window]
+        if len(history) < self.min_history:
+            return None
+        span_hours = max((now - min(history)) / 3600, 1.0)
+        return len(history) / span_hours
+
+    def new_item_probability(self, feed_id: str, now: Optional[float] = None) -> float:
+        """估计自上次轮询以来出现新文章的概率 P = 1 - exp(-λ·Δt)"""
+        now = now or time.time()
+        last_polled = self.feed_state.get(feed_id).get('last_polled')
+        rate = self.estimate_rate(feed_id, now)
+        if last_polled is None or rate is None:
+            return 1.0
+        elapsed_hours = max(now - last_polled, 0) / 3600
+        return 1 - math.exp(-rate * elapsed_hours)
+
+    def should_poll(self, feed_id: str, now: Optional[float] = None) -> bool:
+        """判断本轮是否需要轮询该源"""
+        now = now or time.time()
+        last_polled = self.feed_state.get(feed_id).get('last_polled')
+        if last_polled is None or now - last_polled >= self.max_staleness:
+            return True
+        return self.new_item_probability(feed_id, now) >= self.min_probability
+
+    def record_poll(self, feed_id: str, publish_times: Iterable[float] = (),
+                    now: Optional[float] = None) -> None:
+        """
+        记录一次成功的轮询（含 304），并合并观察到的发布时间
+
+        Args:
+            feed_id: 源ID
+            publish_times: 本次解析到的文章发布时间（Unix 时间戳）
+        """
+        now = now or time.time()
+        history = set(self.feed_state.get(feed_id).get('publish_history', []))
+        history.update(int(t) for t in publish_times if t <= now)
+        merged = sorted(history)[-self.history_size:]
+        self.feed_state.update(feed_id, last_polled=now, publish_history=merged)
+
+    def describe(self, feed_id: str, now: Optional[float] = None) -> Dict:
+        """返回某个源的调度信息（用于日志）"""
+        now = now or time.time()
+        rate = self.estimate_rate(feed_id, now)
+        return {
+            'rate_per_day': round(rate * 24, 2) if rate is not None else None,
+            'probability': round(self.new_item_probability(feed_id, now), 3),
+        }
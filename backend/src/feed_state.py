@@ -0,0 +1,81 @@
+"""
+RSS源状态存储模块
+按源ID持久化每个RSS源的抓取状态（如 ETag / Last-Modified 校验值）
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FeedStateStore:
+    """按源ID保存抓取状态的轻量存储（JSON文件）"""
+
+    def __init__(self, state_file: str):
+        """
+        初始化状态存储
+
+        Args:
+            state_file: 状态文件路径
+        """
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._state = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict]:
+        """加载状态文件"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except Exception as e:
+                logger.warning(f"加载源状态失败: {e}")
+        return {}
+
+    def get(self, feed_id: str) -> Dict:
+        """获取某个源的状态记录（返回副本）"""
+        with self._lock:
+            return dict(self._state.get(feed_id, {}))
+
+    def update(self, feed_id: str, **fields) -> None:
+        """更新某个源的状态字段，值为 None 的字段会被删除"""
+        with self._lock:
+            record = self._state.setdefault(feed_id, {})
+            for key, value in fields.items():
+                if value is None:
+                    record.pop(key, None)
+                else:
+                    record[key] = value
+            self._dirty = True
+
+    def get_validators(self, feed_id: str) -> Dict[str, str]:
+        """获取某个源的条件请求校验值（etag / last_modified）"""
+        record = self.get(feed_id)
+        return {k: record[k] for k in ('etag', 'last_modified') if record.get(k)}
+
+    def set_validators(self, feed_id: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """保存某个源的条件请求校验值"""
+        self.update(feed_id, etag=etag, last_modified=last_modified)
+
+    def save(self) -> None:
+        """原子写入状态文件（先写临时文件再替换）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._state, ensure_ascii=False)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"保存源状态失败: {e}")
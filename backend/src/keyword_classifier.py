@@ -0,0 +1,175 @@
+"""
+关键词分类模块
+将配置中的分类规则编译为 Aho-Corasick 自动机，一次扫描文章文本即可得到所有分类的匹配得分
+"""
+
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 参与匹配的文章字段
+MATCH_FIELDS = ('title', 'summary', 'source_name', 'source_id')
+
+
+class AhoCorasickMatcher:
+    """多模式子串匹配自动机（预先展开失败转移，扫描时每个字符只查一次表）"""
+
+    def __init__(self, patterns: List[Tuple[str, object]]):
+        """
+        构建自动机
+
+        Args:
+            patterns: (关键词, 附带数据) 列表，同一关键词可以出现多次
+        """
+        self._delta: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[object]] = [[]]
+        for keyword, payload in patterns:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._delta[state].get(char)
+                if next_state is None:
+                    next_state = len(self._delta)
+                    self._delta.append({})
+                    self._outputs.append([])
+                    self._delta[state][char] = next_state
+                state = next_state
+            self._outputs[state].append(payload)
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        """按层次计算失败链接，并把失败状态的转移和输出合并到当前状态"""
+        fail = [0] * len(self._delta)
+        queue = deque(self._delta[0].values())
+        while queue:
+            state = queue.popleft()
+            # 合并失败状态的输出（此时失败状态的层次更浅，已处理完毕）
+            if fail[state]:
+                self._outputs[state] = self._outputs[state] + self._outputs[fail[state]]
+            for char, child in list(self._delta[state].items()):
+                fail_state = fail[state]
+                while fail_state and char not in self._delta[fail_state]:
+                    fail_state = fail[fail_state]
+                target = self._delta[fail_state].get(char, 0)
+                fail[child] = target if target != child else 0
+                queue.append(child)
+            # 展开失败转移：缺失的字符直接跳到失败状态对应的转移
+            if state:
+                for char, target in self._delta[fail[state]].items():
+                    self._delta[state].setdefault(char, target)
+        self.state_count = len(self._delta)
+
+    def find_all(self, text: str) -> List[object]:
+        """
+        扫描文本
+
+        Returns:
+            每次匹配对应关键词的附带数据（同一关键词出现多次则返回多次）
+        """
+        delta = self._delta
+        outputs = self._outputs
+        matches = []
+        state = 0
+        for char in text:
+            # 非根状态已展开了根的转移，查不到即回到根
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                matches.extend(outputs[state])
+        return matches
+
+
+class KeywordClassifier:
+    """
+    基于分类规则的文章分类器
+
+    规则按顺序排列，文章归入第一个得分大于 0 的分类（与原先 if/elif 的优先级一致），
+    都没有命中时归入默认分类。每条规则可以包含:
+        name: 分类名
+        source_categories: 命中即计分的源类别（RSS_FEEDS 中的 category）
+        keywords: {字段名: [关键词, ...]}，字段为 title / summary / source_name / source_id
+        weight: 每次命中的分值（默认 1）
+    """
+
+    def __init__(self, taxonomy: List[Dict], default_category: str = "其他"):
+        """
+        编译分类规则
+
+        Args:
+            taxonomy: 分类规则列表（按优先级排列）
+            default_category: 没有命中任何规则时的分类
+        """
+        self.categories = [rule['name'] for rule in taxonomy]
+        self.default_category = default_category
+        self._weights = [float(rule.get('weight', 1)) for rule in taxonomy]
+        self._source_categories = [set(rule.get('source_categories', [])) for rule in taxonomy]
+
+        patterns = []
+        for index, rule in enumerate(taxonomy):
+            for field, keywords in rule.get('keywords', {}).items():
+                if field not in MATCH_FIELDS:
+                    raise ValueError(f"分类 {rule['name']} 使用了不支持的字段: {field}")
+                field_index = MATCH_FIELDS.index(field)
+                patterns.extend((keyword.lower(), (index, field_index)) for keyword in keywords)
+        self.keyword_count = len(patterns)
+        self._used_fields = sorted({field_index for _, (_, field_index) in patterns})
+        self._matcher = AhoCorasickMatcher(patterns)
+        self.state_count = self._matcher.state_count
+
+    def score(self, article: Dict) -> Dict[str, float]:
+        """
+        计算文章在每个分类上的得分
+
+        Returns:
+            {分类名: 得分}（只包含得分大于 0 的分类）
+        """
+        scores = [0.0] * len(self.categories)
+        source_category = article.get('category', '')
+        for index, categories in enumerate(self._source_categories):
+            if source_category in categories:
+                scores[index] += self._weights[index]
+
+        # 每个字段只扫描一次，只统计配置在该字段上的关键词
+        for field_index in self._used_fields:
+            text = str(article.get(MATCH_FIELDS[field_index], '') or '').lower()
+            for index, matched_field in self._matcher.find_all(text):
+                if matched_field == field_index:
+                    scores[index] += self._weights[index]
+
+        return {name: value for name, value in zip(self.categories, scores) if value > 0}
+
+    def classify(self, article: Dict) -> Tuple[str, Dict[str, float]]:
+        """
+        分类单篇文章
+
+        Returns:
+            (分类名, 各分类得分)
+        """
+        scores = self.score(article)
+        for name in self.categories:
+            if scores.get(name):
+                return name, scores
+        return self.default_category, scores
+
+    def categorize(self, articles: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        将文章按分类分组
+
+        Returns:
+            {分类名: 文章列表}，按规则顺序排列，空分类不包含在内
+        """
+        groups: Dict[str, List[Dict]] = {name: [] for name in self.categories + [self.default_category]}
+        for article in articles:
+            category, _ = self.classify(article)
+            groups[category].append(article)
+        return {name: items for name, items in groups.items() if items}
+
+
+def build_classifier(taxonomy: Optional[List[Dict]] = None, default_category: str = "其他") -> KeywordClassifier:
+    """根据配置创建分类器（默认读取 config.CATEGORY_TAXONOMY）"""
+    if taxonomy is None:
+        from config import CATEGORY_TAXONOMY
+        taxonomy = CATEGORY_TAXONOMY
+    return KeywordClassifier(taxonomy, default_category)
@@ -1,39 +1,298 @@
 """
 LLM 分析模块
-使用 Google Gemini 模型对文章进行智能分析和摘要
+使用 LLM 后端（默认 Google Gemini）对文章进行智能分析和摘要
 """
 
-import os
 import logging
 import json
-import google.generativeai as genai
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 
+from src.llm_backends import GenerationResult, LLMBackend, LLMBackendError, LLMRateLimitError, create_backend
+from src.keyword_classifier import KeywordClassifier, build_classifier
+from src.llm_cache import LLMResponseCache
+from src.llm_metrics import LLMMetrics
+from src.llm_resilience import HedgedCaller, LatencyTracker
+from src.prompt_builder import build_article_context
+from src.rate_limiter import RateLimiter
+from src.token_counter import estimate_tokens
+
 logger = logging.getLogger(__name__)
 
+# 提示词模板版本：修改提示词后需要更新版本号，使旧的缓存结果失效
+SUMMARY_PROMPT_VERSION = "summary-v1"
+DIGEST_PROMPT_VERSION = "digest-v1"
+BATCH_SUMMARY_PROMPT_VERSION = "batch-summary-v1"
+DIGEST_UPDATE_PROMPT_VERSION = "digest-update-v1"
+
+DIGEST_PROMPT_TEMPLATE = """基于以下今日AI领域的最新文章，请生成一份简报分析：
+
+{articles_text}
+
+请用中文输出以下内容（使用JSON格式）：
+{{
+    "overview": "今日AI领域整体动态概述（2-3句话）",
+    "highlights": ["重点1", "重点2", "重点3"],
+    "trends": ["趋势观察1", "趋势观察2"],
+    "recommendation": "今日最值得关注的一篇文章标题及原因"
+}}
+
+请确保输出是有效的JSON格式，不要包含Markdown代码块标记："""
+
+DIGEST_UPDATE_PROMPT_TEMPLATE = """以下是今日AI领域简报的当前分析，以及此后新到达的文章。请结合新文章更新分析，保留仍然重要的内容：
+
+当前分析（JSON）：
+{previous}
+
+新到达的文章：
+{articles_text}
+
+请用中文输出更新后的完整分析（使用JSON格式，结构与当前分析相同）：
+{{
+    "overview": "今日AI领域整体动态概述（2-3句话）",
+    "highlights": ["重点1", "重点2", "重点3"],
+    "trends": ["趋势观察1", "趋势观察2"],
+    "recommendation": "今日最值得关注的一篇文章标题及原因"
+}}
+
+请确保输出是有效的JSON格式，不要包含Markdown代码块标记："""
+
+# 批量摘要时每篇文章预留的输出 token 数（与单篇摘要的 max_output_tokens 一致）
+SUMMARY_OUTPUT_TOKENS = 200
+
+# 调用类型对应的方法名（指标中的 method 标签）
+METHOD_NAMES = {
+    "summary": "summarize_article",
+    "batch_summary": "summarize_batch",
+    "digest": "generate_daily_digest",
+    "digest_update": "update_daily_digest",
+}
+
+
 class LLMAnalyzer:
-    """使用 Google Gemini 进行内容分析"""
+    """使用 LLM 进行内容分析"""
     
-    def __init__(self, model: str = None, max_tokens: int = None):
+    def __init__(self, model: str = None, max_tokens: int = None,
+                 backend: Optional[LLMBackend] = None,
+                 backend_config: Optional[Dict] = None,
+                 cache: Optional[LLMResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 4, summary_workers: int = 4,
+                 batch_size: int = 1, batch_token_budget: int = 6000,
+                 digest_token_budget: int = 4000, digest_max_items: Optional[int] = 40,
+                 classifier: Optional[KeywordClassifier] = None,
+                 fallback_models: Optional[List[str]] = None,
+                 fallback_backends: Optional[List[LLMBackend]] = None,
+                 call_timeouts: Optional[Dict[str, float]] = None,
+                 hedge_config: Optional[Dict] = None,
+                 metrics: Optional[LLMMetrics] = None,
+                 model_skip_after: Optional[int] = 2):
         """
         初始化分析器
         
         Args:
             model: 使用的模型名称
             max_tokens: 最大token数
+            backend: LLM 后端实例（为 None 时按 backend_config 创建）
+            backend_config: 后端配置（LLM_CONFIG['backend']，默认使用 GEMINI_API_KEY 创建 Gemini 后端）
+            cache: LLM 响应缓存（为 None 时不缓存）
+            rate_limiter: 所有调用共享的限流器（为 None 时不限流）
+            max_retries: 遇到限流错误（429）时的最大重试次数
+            summary_workers: 并发生成摘要的线程数
+            batch_size: 每次请求最多合并摘要的文章数（1 表示逐篇请求）
+            batch_token_budget: 批量摘要请求的输入 token 预算
+            digest_token_budget: 综合分析提示词的输入 token 预算
+            digest_max_items: 综合分析最多纳入的文章数
+            classifier: 文章分类器（默认按 config.CATEGORY_TAXONOMY 构建）
+            fallback_models: 主模型失败或超时后依次尝试的模型（按 backend_config 创建后端）
+            fallback_backends: 备用后端实例（提供时忽略 fallback_models）
+            call_timeouts: 各类调用的截止时间（秒），键为 summary / batch_summary / digest
+            hedge_config: 对冲请求配置（enabled / quantile / min_samples / initial_delay_seconds）
+            metrics: 调用指标记录器（默认新建）
+            model_skip_after: 模型连续失败多少次后在本次运行中跳过（None 表示不跳过）
         """
-        # 从环境变量获取 API Key
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            logger.warning("未找到 GEMINI_API_KEY 环境变量，LLM 功能将不可用")
-            self.client = None
-        else:
-            genai.configure(api_key=api_key)
-            self.model_name = model or "gemini-1.5-flash"
-            self.client = genai.GenerativeModel(self.model_name)
+        self.model_name = model or "gemini-1.5-flash"
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.summary_workers = summary_workers
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+        self.digest_token_budget = digest_token_budget
+        self.digest_max_items = digest_max_items
+        self.last_digest_usage: Dict = {}
+        self.classifier = classifier or build_classifier()
+        self.retry_base_delay = 2.0
+        
+        # 缺少 API Key 时 backend 为 None，各方法返回不依赖 LLM 的结果
+        self.backend = backend or create_backend(backend_config or {'type': 'gemini'}, self.model_name)
+        if fallback_backends is None:
+            fallback_backends = [create_backend(backend_config or {'type': 'gemini'}, name)
+                                 for name in fallback_models or []] if self.backend else []
+        self.fallback_backends = [b for b in fallback_backends if b]
+        
+        # 缓存按给出结果的模型保存，读取时依次查找整个模型链（主模型优先）
+        chain = [self.model_name] + [b.model for b in ([self.backend] if self.backend else []) + self.fallback_backends]
+        self.cache_models = list(dict.fromkeys(chain))
+        
+        # 连续失败的模型在本次运行中跳过（如配置了后端不支持的主模型），避免每次调用都先付出一次失败的请求
+        self.model_skip_after = model_skip_after
+        self._model_failures: Dict[str, int] = {}
+        self.unavailable_models: set = set()
+        self._model_lock = threading.Lock()
+        
+        self.call_timeouts = call_timeouts or {}
+        self.hedge_config = hedge_config or {}
+        self.latency = LatencyTracker()
+        self.metrics = metrics or LLMMetrics()
+        self._caller = HedgedCaller(max_workers=max(8, summary_workers * 4))
             
         self.max_tokens = max_tokens or 2000
     
+    def _cache_get(self, prompt_version: str, content: str) -> Optional[str]:
+        """读取缓存的 LLM 响应（依次查找主模型和备用模型的结果）"""
+        if not self.cache:
+            return None
+        try:
+            for model in self.cache_models:
+                cached = self.cache.get(model, prompt_version, content)
+                if cached is not None:
+                    return cached
+            return None
+        except Exception as e:
+            logger.warning(f"读取LLM缓存失败: {e}")
+            return None
+    
+    def _cache_put(self, prompt_version: str, content: str, response: str,
+                   model: Optional[str] = None) -> None:
+        """保存成功的 LLM 响应（按给出结果的模型保存，默认主模型）"""
+        if not self.cache:
+            return
+        try:
+            self.cache.put(model or self.model_name, prompt_version, content, response)
+        except Exception as e:
+            logger.warning(f"写入LLM缓存失败: {e}")
+    
+    def reset_unavailable_models(self) -> None:
+        """清除模型的连续失败记录（每次运行开始时调用，之前跳过的模型重新尝试）"""
+        with self._model_lock:
+            self._model_failures.clear()
+            self.unavailable_models.clear()
+    
+    def _record_model_result(self, model: str, ok: bool) -> None:
+        """记录模型调用结果，连续失败达到 model_skip_after 次后在本次运行中跳过该模型"""
+        with self._model_lock:
+            if ok:
+                self._model_failures[model] = 0
+                return
+            self._model_failures[model] = self._model_failures.get(model, 0) + 1
+            if (self.model_skip_after and self._model_failures[model] >= self.model_skip_after
+                    and model not in self.unavailable_models):
+                self.unavailable_models.add(model)
+                logger.warning(f"模型 {model} 连续失败 {self._model_failures[model]} 次，本次运行不再调用")
+    
+    def _generate(self, prompt: str, max_output_tokens: int, temperature: float,
+                  json_mode: bool = False, kind: str = "summary") -> GenerationResult:
+        """
+        调用模型生成内容
+        
+        依次尝试主模型和备用模型，某个模型失败（包括超时和重试耗尽的限流）后改用下一个，
+        全部失败时抛出最后一个错误，由调用方退回不依赖 LLM 的结果。
+        
+        Args:
+            kind: 调用类型（summary / batch_summary / digest），决定截止时间和延迟统计
+        """
+        chain = [self.backend] + self.fallback_backends
+        # 跳过本次运行中连续失败的模型（全部被跳过时仍按完整的模型链尝试）
+        backends = [b for b in chain if b.model not in self.unavailable_models] or chain
+        call_stats = {'retries': 0, 'hedged': False, 'rate_limit_wait': 0.0}
+        started = time.monotonic()
+        for index, backend in enumerate(backends):
+            try:
+                response = self._generate_with(backend, prompt, max_output_tokens, temperature, json_mode,
+                                               kind, call_stats)
+            except LLMBackendError as e:
+                self._record_model_result(backend.model, ok=False)
+                if index + 1 == len(backends):
+                    self._record_call(kind, started, call_stats, error=str(e))
+                    raise
+                logger.warning(f"模型 {backend.model} 调用失败（{e}），改用备用模型 {backends[index + 1].model}")
+                continue
+            response.model = backend.model
+            self._record_model_result(backend.model, ok=True)
+            self._record_call(kind, started, call_stats, response=response, model_fallback=backend is not self.backend)
+            return response
+    
+    def _record_call(self, kind: str, started: float, call_stats: Dict,
+                     response: Optional[GenerationResult] = None, model_fallback: bool = False,
+                     error: Optional[str] = None) -> None:
+        """记录一次调用的指标（耗时不含等待限流配额的时间）"""
+        self.metrics.record_call(
+            METHOD_NAMES.get(kind, kind),
+            latency=time.monotonic() - started - call_stats['rate_limit_wait'],
+            model=response.model if response else None,
+            prompt_tokens=response.prompt_tokens if response else None,
+            output_tokens=response.output_tokens if response else None,
+            finish_reason=response.finish_reason if response else None,
+            retries=call_stats['retries'],
+            hedged=call_stats['hedged'],
+            model_fallback=model_fallback,
+            rate_limit_wait=call_stats['rate_limit_wait'],
+            error=error
+        )
+    
+    def _hedge_delay(self, backend: LLMBackend, kind: str) -> Optional[float]:
+        """对冲请求的等待时间：近期延迟的分位数（样本不足时使用初始值）"""
+        if not self.hedge_config.get('enabled'):
+            return None
+        delay = self.latency.quantile((backend.model, kind), self.hedge_config.get('quantile', 0.95),
+                                      self.hedge_config.get('min_samples', 20))
+        return delay if delay is not None else self.hedge_config.get('initial_delay_seconds', 15)
+    
+    def _generate_with(self, backend: LLMBackend, prompt: str, max_output_tokens: int,
+                       temperature: float, json_mode: bool, kind: str, call_stats: Dict) -> GenerationResult:
+        """
+        调用单个模型
+        
+        请求前先经过限流器（按提示词和输出上限估算 token 数），每次请求受 call_timeouts
+        的截止时间限制，可选地在超过延迟分位数后发出对冲请求；遇到 429 时暂停所有调用方
+        并按指数退避重试，其他错误直接抛出。重试次数、对冲和限流等待时间累计到 call_stats。
+        """
+        estimated_tokens = estimate_tokens(prompt) + max_output_tokens
+        invoke = backend.generate_json if json_mode else backend.generate
+        
+        def can_hedge() -> bool:
+            # 对冲请求不等待限流配额，配额不足时放弃对冲
+            return self.rate_limiter.try_acquire(estimated_tokens) if self.rate_limiter else True
+        
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                call_stats['rate_limit_wait'] += self.rate_limiter.acquire(estimated_tokens)
+            started = time.monotonic()
+            try:
+                response, hedged = self._caller.call(
+                    lambda: invoke(prompt, max_output_tokens, temperature),
+                    timeout=self.call_timeouts.get(kind),
+                    hedge_delay=self._hedge_delay(backend, kind),
+                    can_hedge=can_hedge
+                )
+                self.latency.record((backend.model, kind), time.monotonic() - started)
+                call_stats['hedged'] = call_stats['hedged'] or hedged
+                return response
+            except LLMRateLimitError:
+                if attempt == self.max_retries:
+                    raise
+                call_stats['retries'] += 1
+                delay = min(self.retry_base_delay * 2 ** attempt, 60) * random.uniform(0.8, 1.2)
+                logger.info(f"LLM 请求被限流，{delay:.1f} 秒后重试 (第 {attempt + 1}/{self.max_retries} 次)")
+                if self.rate_limiter:
+                    self.rate_limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+    
     def summarize_article(self, article: Dict) -> str:
         """
         为单篇文章生成中文摘要
@@ -44,7 +303,14 @@ class LLMAnalyzer:
         Returns:
             中文摘要
         """
-        if not self.client:
+        content = self._summary_content(article)
+        cached = self._cache_get(SUMMARY_PROMPT_VERSION, content)
+        if cached is not None:
+            self.metrics.record_cache_hit("summarize_article")
+            return cached
+        
+        if not self.backend:
+            self.metrics.record_fallback("summarize_article", "no_backend")
             return article.get('summary', '')[:200] + '...'
 
         try:
@@ -57,20 +323,169 @@ class LLMAnalyzer:
 
 请直接输出中文摘要，不要有任何前缀："""
 
-            response = self.client.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=200,
-                    temperature=0.3
-                )
-            )
+            response = self._generate(prompt, max_output_tokens=200, temperature=0.3)
             
-            return response.text.strip()
+            summary = response.text.strip()
+            self._cache_put(SUMMARY_PROMPT_VERSION, content, summary, model=response.model)
+            return summary
             
         except Exception as e:
             logger.warning(f"生成摘要失败: {e}")
-            # 返回原始摘要的截断版本
-            return article.get('summary', '')[:200] + '...' if len(article.get('summary', '')) > 200 else article.get('summary', '')
+            self.metrics.record_fallback("summarize_article", "truncated")
+            return self._fallback_summary(article)
+    
+    @staticmethod
+    def _summary_content(article: Dict) -> str:
+        """摘要提示词中实际使用的文章内容（也作为缓存键）"""
+        return f"{article.get('title', '')}\n{article.get('source_name', '')}\n{article.get('summary', '')[:1000]}"
+    
+    @staticmethod
+    def _fallback_summary(article: Dict) -> str:
+        """返回原始摘要的截断版本"""
+        summary = article.get('summary', '')
+        return summary[:200] + '...' if len(summary) > 200 else summary
+    
+    @staticmethod
+    def _parse_json_text(text: str):
+        """解析模型输出的 JSON（清理可能存在的 Markdown 代码块标记）"""
+        text = text.strip()
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0]
+        elif "```" in text:
+            text = text.split("```")[1].split("```")[0]
+        return json.loads(text)
+    
+    def _plan_batches(self, articles: List[Dict]) -> List[List[Dict]]:
+        """按输入 token 预算和 batch_size 将文章依次装入批次"""
+        batches = []
+        current: List[Dict] = []
+        used = 0
+        for article in articles:
+            cost = estimate_tokens(self._summary_content(article)) + 20  # id 和 JSON 结构的开销
+            if current and (len(current) >= self.batch_size or used + cost > self.batch_token_budget):
+                batches.append(current)
+                current, used = [], 0
+            current.append(article)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _summarize_batch_once(self, batch: List[Dict]) -> Dict[str, str]:
+        """
+        在一次 JSON 模式请求中为一批文章生成摘要
+        
+        Returns:
+            {文章id: 摘要}，只包含输出中有效的条目（缺失或格式错误的条目由调用方重试）
+        """
+        items = [
+            {
+                'id': article['id'],
+                'title': article.get('title', ''),
+                'source': article.get('source_name', ''),
+                'summary': article.get('summary', '')[:1000],
+            }
+            for article in batch
+        ]
+        prompt = f"""请用简洁的中文分别总结以下每篇AI领域文章的核心内容，突出关键技术点和重要发现。
+每篇摘要应该在2-3句话内，适合非技术背景的读者理解。
+
+文章列表（JSON）：
+{json.dumps(items, ensure_ascii=False)}
+
+请输出一个JSON对象，键为文章的 id，值为对应的中文摘要，必须包含所有文章。
+请确保输出是有效的JSON格式，不要包含Markdown代码块标记："""
+        
+        max_output_tokens = SUMMARY_OUTPUT_TOKENS * len(batch) + 100
+        try:
+            response = self._generate(prompt, max_output_tokens, temperature=0.3, json_mode=True,
+                                      kind="batch_summary")
+            data = self._parse_json_text(response.text)
+        except Exception as e:
+            logger.warning(f"批量生成摘要失败（{len(batch)} 篇）: {e}")
+            return {}
+        
+        if not isinstance(data, dict):
+            logger.warning(f"批量摘要输出格式错误（{len(batch)} 篇）")
+            return {}
+        summaries = {}
+        for article in batch:
+            summary = data.get(article['id'])
+            if isinstance(summary, str) and summary.strip():
+                summaries[article['id']] = summary.strip()
+                self._cache_put(BATCH_SUMMARY_PROMPT_VERSION, self._summary_content(article),
+                                summaries[article['id']], model=response.model)
+        return summaries
+    
+    def summarize_batch(self, articles: List[Dict], max_workers: Optional[int] = None) -> Dict[str, str]:
+        """
+        批量为多篇文章生成中文摘要
+        
+        按 token 预算将多篇文章合并到一次 JSON 模式请求中，多个批次并发执行；
+        输出缺失或格式错误的文章单独组成新批次重试一次，仍失败的逐篇请求。
+        
+        Args:
+            articles: 文章列表（需包含 id 字段）
+            max_workers: 并发线程数（默认使用 summary_workers）
+            
+        Returns:
+            {文章id: 中文摘要}
+        """
+        summaries = {}
+        pending = []
+        for article in articles:
+            cached = self._cache_get(BATCH_SUMMARY_PROMPT_VERSION, self._summary_content(article))
+            if cached is not None:
+                summaries[article['id']] = cached
+            else:
+                pending.append(article)
+        if summaries:
+            self.metrics.record_cache_hit("summarize_batch", len(summaries))
+        
+        if not self.backend:
+            self.metrics.record_fallback("summarize_batch", "no_backend", len(pending))
+            summaries.update({article['id']: self._fallback_summary(article) for article in pending})
+            return summaries
+        
+        workers = max_workers or self.summary_workers
+        for _ in range(2):  # 首次请求 + 对失败条目重试一次
+            if not pending:
+                break
+            batches = self._plan_batches(pending)
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+                for result in executor.map(self._summarize_batch_once, batches):
+                    summaries.update(result)
+            pending = [article for article in pending if article['id'] not in summaries]
+            if pending:
+                logger.info(f"批量摘要中有 {len(pending)} 篇缺失或格式错误，重新请求")
+                self.metrics.record_fallback("summarize_batch", "retry_missing", len(pending))
+        
+        if pending:
+            self.metrics.record_fallback("summarize_batch", "single_article", len(pending))
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as executor:
+                for article, summary in zip(pending, executor.map(self.summarize_article, pending)):
+                    summaries[article['id']] = summary
+        return summaries
+    
+    def summarize_articles(self, articles: List[Dict], max_workers: Optional[int] = None) -> List[str]:
+        """
+        并发为多篇文章生成中文摘要
+        
+        Args:
+            articles: 文章列表
+            max_workers: 并发线程数（默认使用 summary_workers）
+            
+        Returns:
+            与输入顺序一致的中文摘要列表
+        """
+        if not articles:
+            return []
+        if self.batch_size > 1:
+            summaries = self.summarize_batch(articles, max_workers)
+            return [summaries[article['id']] for article in articles]
+        workers = max(1, min(max_workers or self.summary_workers, len(articles)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.summarize_article, articles))
     
     def generate_daily_digest(self, articles: List[Dict]) -> Dict:
         """
@@ -89,7 +504,24 @@ class LLMAnalyzer:
                 "trends": []
             }
             
-        if not self.client:
+        # 在 token 预算内按排名挑选文章并分配摘要长度
+        template_tokens = estimate_tokens(DIGEST_PROMPT_TEMPLATE.format(articles_text=''))
+        articles_text, usage = build_article_context(
+            articles, max(self.digest_token_budget - template_tokens, 0), max_items=self.digest_max_items
+        )
+        usage['prompt_tokens_estimated'] = template_tokens + usage['context_tokens']
+        self.last_digest_usage = usage
+        logger.info(f"综合分析提示词: 约 {usage['prompt_tokens_estimated']} tokens"
+                    f"（预算 {self.digest_token_budget}），纳入 {usage['articles_included']}/"
+                    f"{usage['articles_available']} 篇文章，截断摘要 {usage['summaries_truncated']} 篇")
+        
+        cached = self._cache_get(DIGEST_PROMPT_VERSION, articles_text)
+        if cached is not None:
+            self.metrics.record_cache_hit("generate_daily_digest")
+            return json.loads(cached)
+        
+        if not self.backend:
+            self.metrics.record_fallback("generate_daily_digest", "no_backend")
             return {
                 "overview": f"今日共收集到 {len(articles)} 篇AI领域相关文章（LLM未配置）。",
                 "highlights": [a['title'] for a in articles[:3]],
@@ -98,47 +530,21 @@ class LLMAnalyzer:
             }
         
         try:
-            # 准备文章摘要
-            articles_text = "\n".join([
-                f"- [{a['source_name']}] {a['title']}: {a.get('summary', '')[:200]}"
-                for a in articles[:20]  # 限制数量避免token过多
-            ])
-            
-            prompt = f"""基于以下今日AI领域的最新文章，请生成一份简报分析：
+            prompt = DIGEST_PROMPT_TEMPLATE.format(articles_text=articles_text)
 
-{articles_text}
-
-请用中文输出以下内容（使用JSON格式）：
-{{
-    "overview": "今日AI领域整体动态概述（2-3句话）",
-    "highlights": ["重点1", "重点2", "重点3"],
-    "trends": ["趋势观察1", "趋势观察2"],
-    "recommendation": "今日最值得关注的一篇文章标题及原因"
-}}
-
-请确保输出是有效的JSON格式，不要包含Markdown代码块标记："""
-
-            response = self.client.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=self.max_tokens,
-                    temperature=0.5,
-                    response_mime_type="application/json"
-                )
-            )
+            response = self._generate(prompt, self.max_tokens, temperature=0.5, json_mode=True, kind="digest")
             
-            result_text = response.text.strip()
-            
-            # 清理可能存在的 Markdown 标记
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0]
-            
-            return json.loads(result_text)
+            usage['prompt_tokens'] = response.prompt_tokens
+            usage['output_tokens'] = response.output_tokens
+            usage['model'] = response.model
+            analysis = self._parse_json_text(response.text)
+            self._cache_put(DIGEST_PROMPT_VERSION, articles_text, json.dumps(analysis, ensure_ascii=False),
+                            model=response.model)
+            return analysis
             
         except Exception as e:
             logger.warning(f"生成综合分析失败: {e}")
+            self.metrics.record_fallback("generate_daily_digest", "static")
             return {
                 "overview": f"今日共收集到 {len(articles)} 篇AI领域相关文章。",
                 "highlights": [a['title'] for a in articles[:3]],
@@ -146,48 +552,79 @@ class LLMAnalyzer:
                 "recommendation": articles[0]['title'] if articles else ""
             }
     
-    def categorize_articles(self, articles: List[Dict]) -> Dict[str, List[Dict]]:
+    def update_daily_digest(self, previous: Optional[Dict], new_articles: List[Dict]) -> Dict:
         """
-        将文章按主题分类
+        用新到达的文章更新已有的综合分析（日内增量运行）
+        
+        提示词只包含上一版分析和新文章，成本与新增内容成正比；没有上一版分析时
+        生成完整分析，调用失败时保留上一版分析。
         
         Args:
-            articles: 文章列表
+            previous: 上一版分析结果
+            new_articles: 新到达的文章列表（已按排名排序）
             
         Returns:
-            分类后的文章字典
+            更新后的分析结果
         """
-        categories = {
-            "商业前沿": [],
-            "技术硬核": [],
-            "AI应用与产品": [],
-            "行业动态": [],
-            "其他": []
-        }
+        if not previous:
+            return self.generate_daily_digest(new_articles)
+        if not new_articles:
+            return previous
         
-        for article in articles:
-            title_lower = article.get('title', '').lower()
-            summary_lower = article.get('summary', '').lower()
-            source_category = article.get('category', '')
-            source_name = article.get('source_name', '').lower()
+        previous_text = json.dumps(
+            {key: previous.get(key) for key in ('overview', 'highlights', 'trends', 'recommendation')},
+            ensure_ascii=False
+        )
+        template_tokens = estimate_tokens(DIGEST_UPDATE_PROMPT_TEMPLATE.format(previous=previous_text, articles_text=''))
+        articles_text, usage = build_article_context(
+            new_articles, max(self.digest_token_budget - template_tokens, 0), max_items=self.digest_max_items
+        )
+        usage['prompt_tokens_estimated'] = template_tokens + usage['context_tokens']
+        usage['mode'] = 'update'
+        self.last_digest_usage = usage
+        logger.info(f"增量更新分析提示词: 约 {usage['prompt_tokens_estimated']} tokens，"
+                    f"纳入新文章 {usage['articles_included']}/{usage['articles_available']} 篇")
+        
+        content = f"{previous_text}\n{articles_text}"
+        cached = self._cache_get(DIGEST_UPDATE_PROMPT_VERSION, content)
+        if cached is not None:
+            self.metrics.record_cache_hit("update_daily_digest")
+            return json.loads(cached)
+        
+        if not self.backend:
+            self.metrics.record_fallback("update_daily_digest", "no_backend")
+            return previous
+        
+        try:
+            prompt = DIGEST_UPDATE_PROMPT_TEMPLATE.format(previous=previous_text, articles_text=articles_text)
+            response = self._generate(prompt, self.max_tokens, temperature=0.5, json_mode=True, kind="digest_update")
             
-            # 商业类优先
-            if source_category == 'business' or any(kw in source_name for kw in ['techcrunch', 'venturebeat', 'information']):
-                categories["商业前沿"].append(article)
-            # 技术类
-            elif source_category == 'research' or 'arxiv' in article.get('source_id', '') or 'hugging face' in source_name:
-                categories["技术硬核"].append(article)
-            # 其他分类逻辑
-            elif any(kw in title_lower or kw in summary_lower 
-                     for kw in ['launch', 'release', 'product', 'app', 'tool', 'api']):
-                categories["AI应用与产品"].append(article)
-            elif source_category == 'company' or any(kw in title_lower 
-                     for kw in ['openai', 'google', 'microsoft', 'anthropic', 'meta']):
-                categories["行业动态"].append(article)
-            else:
-                categories["其他"].append(article)
+            usage['prompt_tokens'] = response.prompt_tokens
+            usage['output_tokens'] = response.output_tokens
+            usage['model'] = response.model
+            analysis = self._parse_json_text(response.text)
+            if not isinstance(analysis, dict):
+                raise ValueError("输出不是JSON对象")
+            self._cache_put(DIGEST_UPDATE_PROMPT_VERSION, content, json.dumps(analysis, ensure_ascii=False),
+                            model=response.model)
+            return analysis
+            
+        except Exception as e:
+            logger.warning(f"增量更新分析失败，保留上一版分析: {e}")
+            self.metrics.record_fallback("update_daily_digest", "previous")
+            return previous
+    
+    def categorize_articles(self, articles: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        将文章按主题分类（规则见 config.CATEGORY_TAXONOMY）
         
-        # 移除空分类
-        return {k: v for k, v in categories.items() if v}
+        Args:
+            articles: 文章列表
+            
+        Returns:
+            分类后的文章字典（移除空分类）
+        """
+        return self.classifier.categorize(articles)
 
 if __name__ == "__main__":
     # 简单的本地测试
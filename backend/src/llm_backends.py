@@ -0,0 +1,273 @@
+"""
+LLM 后端模块
+定义统一的后端接口（generate / generate_json / stream），提供 Gemini 实现和可注入延迟与错误的本地模拟实现
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from src.token_counter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendError(Exception):
+    """LLM 后端调用失败"""
+
+
+class LLMRateLimitError(LLMBackendError):
+    """LLM 后端限流（HTTP 429 / RESOURCE_EXHAUSTED），可退避后重试"""
+
+
+class LLMTimeoutError(LLMBackendError):
+    """LLM 调用超过截止时间"""
+
+
+class GenerationResult:
+    """一次生成调用的结果"""
+
+    def __init__(self, text: str, prompt_tokens: Optional[int] = None,
+                 output_tokens: Optional[int] = None, finish_reason: Optional[str] = None,
+                 model: Optional[str] = None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.finish_reason = finish_reason
+        self.model = model  # 实际生成结果的模型（启用备用模型时可能不是主模型）
+
+
+class LLMBackend:
+    """LLM 后端接口"""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> GenerationResult:
+        """生成文本"""
+        raise NotImplementedError
+
+    def generate_json(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> GenerationResult:
+        """以 JSON 模式生成（输出应为合法 JSON 文本）"""
+        raise NotImplementedError
+
+    def stream(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> Iterator[str]:
+        """流式生成，逐块返回文本"""
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini 后端"""
+
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: str, request_timeout: Optional[float] = None):
+        super().__init__(model)
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
+
+        self._genai = genai
+        # HTTP 层超时：调用方放弃等待后，请求线程也会在该时间内结束
+        self._request_options = {'timeout': request_timeout} if request_timeout else {}
+        self._rate_limit_errors = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+        genai.configure(api_key=api_key)
+        self._client = genai.GenerativeModel(model)
+
+    def _config(self, max_output_tokens: int, temperature: float, json_mode: bool = False):
+        options = {'max_output_tokens': max_output_tokens, 'temperature': temperature}
+        if json_mode:
+            options['response_mime_type'] = "application/json"
+        return self._genai.types.GenerationConfig(**options)
+
+    def _call(self, prompt: str, generation_config, stream: bool = False):
+        try:
+            return self._client.generate_content(prompt, generation_config=generation_config, stream=stream,
+                                                 request_options=self._request_options)
+        except self._rate_limit_errors as e:
+            raise LLMRateLimitError(str(e)) from e
+        except Exception as e:
+            if '429' in str(e):
+                raise LLMRateLimitError(str(e)) from e
+            raise LLMBackendError(str(e)) from e
+
+    def _result(self, response) -> GenerationResult:
+        usage = getattr(response, 'usage_metadata', None)
+        finish_reason = None
+        candidates = getattr(response, 'candidates', None)
+        if candidates:
+            reason = getattr(candidates[0], 'finish_reason', None)
+            finish_reason = getattr(reason, 'name', None) or (str(reason) if reason is not None else None)
+        try:
+            text = response.text
+        except ValueError as e:
+            # 被安全策略拦截等情况下没有可用文本
+            raise LLMBackendError(f"响应没有文本内容 (finish_reason={finish_reason}): {e}") from e
+        return GenerationResult(
+            text,
+            prompt_tokens=getattr(usage, 'prompt_token_count', None),
+            output_tokens=getattr(usage, 'candidates_token_count', None),
+            finish_reason=finish_reason,
+        )
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> GenerationResult:
+        return self._result(self._call(prompt, self._config(max_output_tokens, temperature)))
+
+    def generate_json(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> GenerationResult:
+        return self._result(self._call(prompt, self._config(max_output_tokens, temperature, json_mode=True)))
+
+    def stream(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> Iterator[str]:
+        response = self._call(prompt, self._config(max_output_tokens, temperature), stream=True)
+        try:
+            for chunk in response:
+                if getattr(chunk, 'text', None):
+                    yield chunk.text
+        except self._rate_limit_errors as e:
+            raise LLMRateLimitError(str(e)) from e
+
+
+class LocalStubBackend(LLMBackend):
+    """
+    本地模拟后端（不访问网络）
+
+    输出由提示词哈希决定（相同提示词得到相同结果）；耗时为固定延迟加上按吞吐量
+    计算的生成时间，并按给定概率注入错误和限流，用于离线压测并发、限流和缓存。
+    """
+
+    name = "local"
+
+    _ARTICLES_RE = re.compile(r'文章列表（JSON）：\s*(\[.*?\])\s*\n', re.S)
+    _TITLE_RE = re.compile(r'^标题: (.*)$', re.M)
+    _SENTENCES = ('该工作提出了新的方法。', '模型在多项基准测试上取得提升。', '相关功能已向开发者开放。',
+                  '业内认为这将影响后续的竞争格局。', '研究团队同时公开了代码和数据。')
+
+    def __init__(self, model: str = "local-stub", latency_ms: float = 300,
+                 tokens_per_second: float = 150, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 0):
+        """
+        初始化模拟后端
+
+        Args:
+            model: 模型名称（用于缓存键）
+            latency_ms: 每次调用的固定延迟（首 token 延迟）
+            tokens_per_second: 输出吞吐量（token/秒）
+            error_rate: 返回错误的概率
+            rate_limit_rate: 返回限流错误（429）的概率
+            seed: 随机种子（决定错误注入序列）
+        """
+        super().__init__(model)
+        self.latency = latency_ms / 1000
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _inject_failure(self) -> None:
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            time.sleep(self.latency / 2)
+            raise LLMRateLimitError("429 模拟限流")
+        if roll < self.rate_limit_rate + self.error_rate:
+            time.sleep(self.latency / 2)
+            raise LLMBackendError("模拟后端错误")
+
+    def _sleep_for(self, output_tokens: int) -> None:
+        time.sleep(self.latency + output_tokens / self.tokens_per_second)
+
+    @classmethod
+    def _fake_text(cls, prompt: str, label: str) -> str:
+        digest = hashlib.sha256(f"{label}:{prompt}".encode('utf-8')).hexdigest()
+        rng = random.Random(digest)
+        return f"{label}：" + ''.join(rng.choice(cls._SENTENCES) for _ in range(3))
+
+    def _reply(self, prompt: str, max_output_tokens: int) -> str:
+        titles = self._TITLE_RE.findall(prompt)
+        label = titles[0] if titles else "模拟输出"
+        text = self._fake_text(prompt, label)
+        return text[:max_output_tokens]
+
+    def _json_reply(self, prompt: str) -> str:
+        match = self._ARTICLES_RE.search(prompt)
+        if match:
+            try:
+                items = json.loads(match.group(1))
+                return json.dumps({
+                    item['id']: self._fake_text(prompt, item.get('title', ''))
+                    for item in items if isinstance(item, dict) and 'id' in item
+                }, ensure_ascii=False)
+            except ValueError:
+                pass
+        titles = [line[2:].split(': ')[0] for line in prompt.splitlines() if line.startswith('- [')]
+        return json.dumps({
+            "overview": self._fake_text(prompt, "今日动态概述"),
+            "highlights": titles[:3],
+            "trends": ["模拟趋势观察"],
+            "recommendation": titles[0] if titles else "",
+        }, ensure_ascii=False)
+
+    def _respond(self, prompt: str, text: str, max_output_tokens: int) -> GenerationResult:
+        output_tokens = min(estimate_tokens(text), max_output_tokens)
+        self._sleep_for(output_tokens)
+        finish_reason = "MAX_TOKENS" if estimate_tokens(text) > max_output_tokens else "STOP"
+        return GenerationResult(text, prompt_tokens=estimate_tokens(prompt),
+                                output_tokens=output_tokens, finish_reason=finish_reason)
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> GenerationResult:
+        self._inject_failure()
+        return self._respond(prompt, self._reply(prompt, max_output_tokens), max_output_tokens)
+
+    def generate_json(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> GenerationResult:
+        self._inject_failure()
+        return self._respond(prompt, self._json_reply(prompt), max_output_tokens)
+
+    def stream(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> Iterator[str]:
+        self._inject_failure()
+        time.sleep(self.latency)
+        text = self._reply(prompt, max_output_tokens)
+        for start in range(0, len(text), 8):
+            chunk = text[start:start + 8]
+            time.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield chunk
+
+
+def create_backend(config: Dict, model: str) -> Optional[LLMBackend]:
+    """
+    根据配置创建后端
+
+    Args:
+        config: LLM_CONFIG['backend'] 配置
+        model: 模型名称
+
+    Returns:
+        后端实例；Gemini 后端缺少 GEMINI_API_KEY 时返回 None
+    """
+    kind = (config or {}).get('type', 'gemini')
+    if kind == 'local':
+        options = (config or {}).get('local', {})
+        return LocalStubBackend(
+            model=model,
+            latency_ms=options.get('latency_ms', 300),
+            tokens_per_second=options.get('tokens_per_second', 150),
+            error_rate=options.get('error_rate', 0.0),
+            rate_limit_rate=options.get('rate_limit_rate', 0.0),
+            seed=options.get('seed', 0),
+        )
+    if kind != 'gemini':
+        raise ValueError(f"未知的 LLM 后端类型: {kind}")
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        logger.warning("未找到 GEMINI_API_KEY 环境变量，LLM 功能将不可用")
+        return None
+    return GeminiBackend(model, api_key, request_timeout=(config or {}).get('request_timeout_seconds'))
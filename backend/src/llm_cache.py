@@ -0,0 +1,132 @@
+"""
+LLM 响应缓存模块
+按 (模型, 提示词版本, 规范化内容哈希) 持久化保存 LLM 输出，重复运行或时间窗口重叠时不再重复调用 API
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_content(content: str) -> str:
+    """规范化内容（Unicode NFKC + 合并空白），使排版上的细微差异不影响缓存命中"""
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', content or '')).strip()
+
+
+class LLMResponseCache:
+    """LLM 响应缓存（SQLite），按条数和时间淘汰"""
+
+    def __init__(self, db_path: str, max_entries: int = 5000, max_age_days: float = 30):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 数据库路径
+            max_entries: 最多保留的条数（超出时淘汰最久未使用的）
+            max_age_days: 条目保留天数
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " prompt_version TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used_at)"
+        )
+        self.evict()
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, content: str) -> str:
+        """计算缓存键"""
+        digest = hashlib.sha256(normalize_content(content).encode('utf-8')).hexdigest()
+        return f"{model}:{prompt_version}:{digest}"
+
+    def get(self, model: str, prompt_version: str, content: str) -> Optional[str]:
+        """
+        读取缓存的响应
+
+        Returns:
+            响应文本，未命中或已过期时返回 None
+        """
+        key = self.make_key(model, prompt_version, content)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.max_age_seconds:
+                self._conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+        return None
+
+    def put(self, model: str, prompt_version: str, content: str, response: str) -> None:
+        """保存响应（只应保存成功的调用结果）"""
+        key = self.make_key(model, prompt_version, content)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, prompt_version, response, created_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, prompt_version, response, now, now)
+            )
+            self._writes_since_evict += 1
+            should_evict = self._writes_since_evict >= 100
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """删除过期条目，并在超过 max_entries 时淘汰最久未使用的条目"""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            self._writes_since_evict = 0
+            removed = self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (cutoff,)).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            if count > self.max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN ("
+                    " SELECT key FROM llm_responses ORDER BY last_used_at LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+        return removed
+
+    def stats(self) -> Dict:
+        """返回命中统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+        }
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,291 @@
+"""
+LLM 调用指标模块
+记录每次调用的延迟、token 数、结束原因、重试和降级情况，按方法汇总为直方图，
+输出为每次运行的 JSON 文件和 Prometheus 文本格式文件
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+# token 数直方图的桶上界
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+# 保留在运行 JSON 中的单次调用记录数上限
+MAX_CALL_RECORDS = 2000
+
+
+class Histogram:
+    """累积桶直方图（与 Prometheus histogram 语义一致）"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个桶为 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._values: List[float] = []
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+        self._values.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """精确分位数（基于本次运行的全部样本）"""
+        if not self._values:
+            return None
+        values = sorted(self._values)
+        return round(values[min(int(q * len(values)), len(values) - 1)], 3)
+
+    def cumulative(self) -> List[int]:
+        """各桶（含 +Inf）的累积计数"""
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def to_dict(self) -> Dict:
+        labels = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': round(max(self._values), 3) if self._values else None,
+            'buckets': dict(zip(labels, self.cumulative())),
+        }
+
+
+class MethodStats:
+    """单个方法的汇总指标"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedged = 0
+        self.model_fallbacks = 0
+        self.cache_hits = 0
+        self.rate_limit_wait = 0.0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.output_tokens = Histogram(TOKEN_BUCKETS)
+        self.finish_reasons: Dict[str, int] = {}
+        self.models: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'hedged': self.hedged,
+            'model_fallbacks': self.model_fallbacks,
+            'cache_hits': self.cache_hits,
+            'rate_limit_wait_seconds': round(self.rate_limit_wait, 3),
+            'latency_seconds': self.latency.to_dict(),
+            'prompt_tokens': self.prompt_tokens.to_dict(),
+            'output_tokens': self.output_tokens.to_dict(),
+            'finish_reasons': dict(self.finish_reasons),
+            'models': dict(self.models),
+            'fallbacks': dict(self.fallbacks),
+        }
+
+
+class LLMMetrics:
+    """一次运行内的 LLM 调用指标（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空指标（每次运行开始时调用）"""
+        with self._lock:
+            self.started_at = time.time()
+            self.methods: Dict[str, MethodStats] = {}
+            self.calls: List[Dict] = []
+
+    def _method(self, method: str) -> MethodStats:
+        if method not in self.methods:
+            self.methods[method] = MethodStats()
+        return self.methods[method]
+
+    def record_call(self, method: str, latency: float, model: Optional[str] = None,
+                    prompt_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+                    finish_reason: Optional[str] = None, retries: int = 0, hedged: bool = False,
+                    model_fallback: bool = False, rate_limit_wait: float = 0.0,
+                    error: Optional[str] = None) -> None:
+        """
+        记录一次模型调用（包括主模型和备用模型的全部尝试）
+
+        Args:
+            method: 发起调用的方法名
+            latency: 墙钟耗时（秒，不含等待限流配额的时间）
+            model: 最终给出结果的模型
+            prompt_tokens: 输入 token 数
+            output_tokens: 输出 token 数
+            finish_reason: 结束原因
+            retries: 限流重试次数
+            hedged: 是否发出了对冲请求
+            model_fallback: 是否由备用模型给出结果
+            rate_limit_wait: 等待限流配额的秒数
+            error: 所有模型都失败时的错误信息
+        """
+        with self._lock:
+            stats = self._method(method)
+            stats.calls += 1
+            stats.retries += retries
+            stats.hedged += int(hedged)
+            stats.model_fallbacks += int(model_fallback)
+            stats.rate_limit_wait += rate_limit_wait
+            stats.latency.observe(latency)
+            if error:
+                stats.errors += 1
+            if prompt_tokens is not None:
+                stats.prompt_tokens.observe(prompt_tokens)
+            if output_tokens is not None:
+                stats.output_tokens.observe(output_tokens)
+            if finish_reason:
+                stats.finish_reasons[finish_reason] = stats.finish_reasons.get(finish_reason, 0) + 1
+            if model:
+                stats.models[model] = stats.models.get(model, 0) + 1
+            if len(self.calls) < MAX_CALL_RECORDS:
+                self.calls.append({
+                    'method': method,
+                    'at': round(time.time() - self.started_at, 3),
+                    'latency': round(latency, 3),
+                    'model': model,
+                    'prompt_tokens': prompt_tokens,
+                    'output_tokens': output_tokens,
+                    'finish_reason': finish_reason,
+                    'retries': retries,
+                    'hedged': hedged,
+                    'model_fallback': model_fallback,
+                    'error': error,
+                })
+
+    def record_cache_hit(self, method: str, count: int = 1) -> None:
+        """记录缓存命中（未调用模型）"""
+        with self._lock:
+            self._method(method).cache_hits += count
+
+    def record_fallback(self, method: str, kind: str, count: int = 1) -> None:
+        """记录降级处理（如批量摘要重试、截断的原文摘要）"""
+        with self._lock:
+            fallbacks = self._method(method).fallbacks
+            fallbacks[kind] = fallbacks.get(kind, 0) + count
+
+    def summary(self) -> Dict:
+        """各方法的简要统计（用于运行结果）"""
+        with self._lock:
+            return {
+                method: {
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'p95_seconds': stats.latency.quantile(0.95),
+                    'input_tokens': int(stats.prompt_tokens.sum),
+                    'output_tokens': int(stats.output_tokens.sum),
+                    'fallbacks': sum(stats.fallbacks.values()) + stats.model_fallbacks,
+                }
+                for method, stats in self.methods.items()
+            }
+
+    def to_dict(self) -> Dict:
+        """完整指标（每次运行的 JSON）"""
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'duration_seconds': round(time.time() - self.started_at, 3),
+                'llm_wall_seconds': round(sum(s.latency.sum for s in self.methods.values()), 3),
+                'methods': {method: stats.to_dict() for method, stats in self.methods.items()},
+                'calls': list(self.calls),
+            }
+
+    def to_prometheus(self, prefix: str = "ai_digest_llm") -> str:
+        """Prometheus 文本格式（可由 node_exporter 的 textfile collector 采集）"""
+        lines = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def histogram(name: str, help_text: str, attr: str) -> None:
+            header(name, 'histogram', help_text)
+            for method, stats in self.methods.items():
+                hist = getattr(stats, attr)
+                bounds = [str(bound) for bound in hist.buckets] + ['+Inf']
+                for bound, count in zip(bounds, hist.cumulative()):
+                    lines.append(f'{prefix}_{name}_bucket{{method="{method}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_{name}_sum{{method="{method}"}} {hist.sum:g}')
+                lines.append(f'{prefix}_{name}_count{{method="{method}"}} {hist.count}')
+
+        def counter(name: str, help_text: str, values: Dict[str, float]) -> None:
+            header(name, 'counter', help_text)
+            for labels, value in values.items():
+                lines.append(f'{prefix}_{name}{{{labels}}} {value:g}')
+
+        with self._lock:
+            histogram('call_latency_seconds', 'LLM call wall latency in seconds', 'latency')
+            histogram('prompt_tokens', 'Input tokens per LLM call', 'prompt_tokens')
+            histogram('output_tokens', 'Output tokens per LLM call', 'output_tokens')
+            counter('calls_total', 'LLM calls by outcome', {
+                f'method="{m}",outcome="{outcome}"': value
+                for m, s in self.methods.items()
+                for outcome, value in (('ok', s.calls - s.errors), ('error', s.errors))
+            })
+            counter('retries_total', 'Rate-limit retries', {f'method="{m}"': s.retries for m, s in self.methods.items()})
+            counter('hedged_total', 'Calls that sent a hedged request',
+                    {f'method="{m}"': s.hedged for m, s in self.methods.items()})
+            counter('cache_hits_total', 'Responses served from the LLM cache',
+                    {f'method="{m}"': s.cache_hits for m, s in self.methods.items()})
+            counter('rate_limit_wait_seconds_total', 'Time spent waiting for rate-limit quota',
+                    {f'method="{m}"': s.rate_limit_wait for m, s in self.methods.items()})
+            counter('fallbacks_total', 'Results produced by a fallback path', {
+                **{f'method="{m}",kind="model"': s.model_fallbacks for m, s in self.methods.items()},
+                **{f'method="{m}",kind="{kind}"': value
+                   for m, s in self.methods.items() for kind, value in s.fallbacks.items()},
+            })
+            counter('finish_reason_total', 'LLM calls by finish reason', {
+                f'method="{m}",reason="{reason}"': value
+                for m, s in self.methods.items() for reason, value in s.finish_reasons.items()
+            })
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str, run_id: str) -> Dict[str, str]:
+        """
+        写入本次运行的指标文件
+
+        Args:
+            directory: 输出目录
+            run_id: 运行ID（JSON 文件名）
+
+        Returns:
+            {'json': JSON 文件路径, 'prometheus': Prometheus 文件路径}
+        """
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"llm_{run_id}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+        # 先写临时文件再替换，避免采集器读到写了一半的文件
+        prom_path = os.path.join(directory, "llm_metrics.prom")
+        tmp_path = prom_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, prom_path)
+        return {'json': json_path, 'prometheus': prom_path}
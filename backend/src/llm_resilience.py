@@ -0,0 +1,124 @@
+"""
+LLM 调用时延控制模块
+为单次调用设置截止时间，并在调用超过近期延迟分位数仍未返回时发出对冲请求，限制长尾延迟
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from src.llm_backends import LLMTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """按调用类型记录最近的成功调用延迟，用于估计分位数"""
+
+    def __init__(self, window: int = 200):
+        """
+        初始化记录器
+
+        Args:
+            window: 每种调用类型保留的最近样本数
+        """
+        self.window = window
+        self._samples: Dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        """记录一次调用延迟"""
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, key: Hashable, q: float, min_samples: int = 1) -> Optional[float]:
+        """
+        计算延迟分位数
+
+        Returns:
+            分位数（秒），样本少于 min_samples 时返回 None
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+class HedgedCaller:
+    """在独立线程中执行调用，支持截止时间和对冲请求"""
+
+    def __init__(self, max_workers: int = 16):
+        """
+        初始化调用器
+
+        Args:
+            max_workers: 执行调用的线程数（超时被放弃的调用在返回前仍占用线程）
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+
+    def call(self, func: Callable, timeout: Optional[float] = None,
+             hedge_delay: Optional[float] = None,
+             can_hedge: Optional[Callable[[], bool]] = None) -> Tuple[object, bool]:
+        """
+        执行调用
+
+        超过 hedge_delay 仍未返回时再发出一个相同的请求（can_hedge 返回 False 时不发出），
+        取先成功返回的结果；请求失败时若另一个请求仍在进行则继续等待它。
+        超过 timeout 时放弃等待（后台线程中的请求不会被中断，其结果会被丢弃）。
+
+        Args:
+            func: 无参数的调用函数
+            timeout: 截止时间（秒，None 表示不限制）
+            hedge_delay: 发出对冲请求前等待的秒数（None 表示不对冲）
+            can_hedge: 发出对冲请求前的检查（如限流配额）
+
+        Returns:
+            (调用结果, 是否发出了对冲请求)
+
+        Raises:
+            LLMTimeoutError: 超过截止时间
+        """
+        if timeout is None and hedge_delay is None:
+            return func(), False
+
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        futures = {self._executor.submit(func)}
+        hedged = False
+        error = None
+        while futures:
+            now = time.monotonic()
+            waits = []
+            if deadline is not None:
+                waits.append(deadline - now)
+            if hedge_delay is not None and not hedged:
+                waits.append(started + hedge_delay - now)
+            done, futures = wait(futures, timeout=max(min(waits), 0) if waits else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result(), hedged
+                except Exception as e:
+                    error = e
+            if not futures:
+                break
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                for future in futures:
+                    future.cancel()
+                raise LLMTimeoutError(f"调用超过截止时间 {timeout:.1f} 秒")
+            if hedge_delay is not None and not hedged and now >= started + hedge_delay:
+                hedged = True
+                if error is None and (can_hedge is None or can_hedge()):
+                    logger.debug(f"调用超过 {hedge_delay:.1f} 秒未返回，发出对冲请求")
+                    futures.add(self._executor.submit(func))
+        raise error
+
+    def shutdown(self) -> None:
+        """关闭线程池（不等待被放弃的调用）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,137 @@
+"""
+流水线模块
+将处理步骤表示为有向无环图，依赖全部完成的步骤立即在线程池中执行，
+相互独立的步骤（如综合分析和文章摘要）并发运行
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineError(Exception):
+    """流水线定义错误或必需步骤执行失败"""
+
+
+class Stage:
+    """流水线中的一个步骤"""
+
+    def __init__(self, name: str, func: Callable, requires: Iterable[str] = (), optional: bool = False):
+        """
+        定义步骤
+
+        Args:
+            name: 步骤名（即输出名，其他步骤通过它声明依赖）
+            func: 执行函数，依赖的输出按名称作为关键字参数传入
+            requires: 依赖的输入或步骤名
+            optional: 失败时是否允许继续（输出记为 None）
+        """
+        self.name = name
+        self.func = func
+        self.requires = list(requires)
+        self.optional = optional
+
+
+class StagePipeline:
+    """步骤依赖图执行器"""
+
+    def __init__(self, max_workers: int = 4):
+        """
+        初始化执行器
+
+        Args:
+            max_workers: 同时执行的最大步骤数
+        """
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+        self.last_timings: Dict[str, Dict] = {}
+
+    def add(self, name: str, func: Callable, requires: Iterable[str] = (),
+            optional: bool = False) -> 'StagePipeline':
+        """添加步骤（返回自身，便于链式调用）"""
+        if name in self.stages:
+            raise PipelineError(f"步骤重复定义: {name}")
+        self.stages[name] = Stage(name, func, requires, optional)
+        return self
+
+    def _check(self, inputs: Dict) -> None:
+        """检查依赖是否都存在且没有环"""
+        for stage in self.stages.values():
+            if stage.name in inputs:
+                raise PipelineError(f"步骤名与输入重名: {stage.name}")
+            missing = [dep for dep in stage.requires if dep not in self.stages and dep not in inputs]
+            if missing:
+                raise PipelineError(f"步骤 {stage.name} 依赖不存在: {', '.join(missing)}")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in visited or name not in self.stages:
+                return
+            if name in visiting:
+                raise PipelineError(f"步骤存在循环依赖: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.stages[name].requires:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+    def run(self, inputs: Optional[Dict] = None) -> Dict:
+        """
+        执行流水线
+
+        Args:
+            inputs: 初始输入 {名称: 值}
+
+        Returns:
+            输入和所有步骤输出合并后的字典
+
+        Raises:
+            PipelineError: 定义错误，或非可选步骤执行失败（尚未开始的步骤不再执行）
+        """
+        results = dict(inputs or {})
+        self._check(results)
+        self.last_timings = {}
+        pending = dict(self.stages)
+        started_at = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            def submit_ready() -> None:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.requires):
+                        del pending[name]
+                        kwargs = {dep: results[dep] for dep in stage.requires}
+                        self.last_timings[name] = {'start': round(time.time() - started_at, 3)}
+                        running[executor.submit(stage.func, **kwargs)] = stage
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    timing = self.last_timings[stage.name]
+                    timing['seconds'] = round(time.time() - started_at - timing['start'], 3)
+                    try:
+                        results[stage.name] = future.result()
+                        timing['status'] = 'ok'
+                    except Exception as e:
+                        timing['status'] = 'failed'
+                        if not stage.optional:
+                            for other in running:
+                                other.cancel()
+                            raise PipelineError(f"步骤 {stage.name} 执行失败: {e}") from e
+                        logger.error(f"可选步骤 {stage.name} 执行失败: {e}")
+                        results[stage.name] = None
+                submit_ready()
+
+        summary = ", ".join(f"{name} {timing['seconds']:.2f}s" for name, timing in self.last_timings.items())
+        logger.info(f"流水线完成，耗时 {time.time() - started_at:.2f} 秒（{summary}）")
+        return results
@@ -0,0 +1,72 @@
+"""
+提示词构建模块
+在输入 token 预算内按排名挑选文章并分配摘要长度，构建简报分析的文章上下文
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from src.token_counter import estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# 摘要少于该 token 数时不再附带（只保留来源和标题）
+MIN_SUMMARY_TOKENS = 12
+
+
+def build_article_context(articles: List[Dict], token_budget: int,
+                          max_items: Optional[int] = None,
+                          max_summary_tokens: int = 150) -> Tuple[str, Dict]:
+    """
+    构建文章上下文
+
+    按排名顺序（列表顺序）依次加入文章：每篇文章的份额为剩余预算除以剩余篇数，
+    标题必须完整放入，摘要截断到份额内；排名靠前的文章用不完的份额会留给后面的文章。
+    剩余预算连标题都放不下时停止。
+
+    Args:
+        articles: 已按排名排序的文章列表
+        token_budget: 上下文的 token 预算
+        max_items: 最多加入的文章数（None 表示不限制）
+        max_summary_tokens: 单篇摘要的 token 上限
+
+    Returns:
+        (上下文文本, token 使用统计)
+    """
+    candidates = articles[:max_items] if max_items else articles
+    lines = []
+    used = 0
+    truncated = 0
+    for index, article in enumerate(candidates):
+        remaining = token_budget - used
+        share = remaining // (len(candidates) - index)
+        header = f"- [{article.get('source_name', '')}] {article.get('title', '')}"
+        if article.get('story_size', 1) > 1:
+            header += f"（{article['story_size']} 篇相关报道）"
+        header_tokens = estimate_tokens(header) + 1  # 换行
+        if header_tokens > remaining:
+            break
+
+        summary = article.get('summary', '').strip()
+        summary_budget = min(max(share - header_tokens - 1, 0), max_summary_tokens)  # 减去分隔符
+        line = header
+        if summary and summary_budget >= MIN_SUMMARY_TOKENS:
+            clipped = truncate_to_tokens(summary, summary_budget)
+            if clipped != summary:
+                truncated += 1
+            line = f"{header}: {clipped}"
+        elif summary:
+            truncated += 1
+
+        line_tokens = estimate_tokens(line) + 1
+        lines.append(line)
+        used += line_tokens
+
+    stats = {
+        'budget_tokens': token_budget,
+        'context_tokens': used,
+        'articles_included': len(lines),
+        'articles_available': len(articles),
+        'summaries_truncated': truncated,
+    }
+    return "\n".join(lines), stats
@@ -0,0 +1,102 @@
+"""
+限流模块
+使用令牌桶同时限制每分钟请求数和每分钟 token 数，供并发的 LLM 调用共享
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟配额，按秒匀速补充"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """返回凑齐 amount 个令牌还需等待的秒数（单次请求超过容量时按容量计算）"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """按每分钟请求数（RPM）和每分钟 token 数（TPM）限流"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_minute: 每分钟请求数上限（None 表示不限制）
+            tokens_per_minute: 每分钟 token 数上限（None 表示不限制）
+        """
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        阻塞直到允许发送一个请求
+
+        Args:
+            tokens: 该请求预计消耗的 token 数（输入 + 输出）
+
+        Returns:
+            实际等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._take(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """
+        不等待地尝试获取一个请求的配额
+
+        Returns:
+            配额充足时扣除配额并返回 True，否则返回 False
+        """
+        with self._lock:
+            return self._take(tokens) <= 0
+
+    def _take(self, tokens: int) -> float:
+        """配额充足时扣除并返回 0，否则返回还需等待的秒数（调用方需持有锁）"""
+        now = time.monotonic()
+        wait = max(self._paused_until - now, 0.0)
+        if self._requests:
+            wait = max(wait, self._requests.wait_time(1, now))
+        if self._tokens and tokens:
+            wait = max(wait, self._tokens.wait_time(tokens, now))
+        if wait <= 0:
+            if self._requests:
+                self._requests.consume(1)
+            if self._tokens and tokens:
+                self._tokens.consume(tokens)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """收到限流错误（429）后暂停所有调用方一段时间"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.info(f"LLM 接口限流，暂停 {seconds:.1f} 秒")
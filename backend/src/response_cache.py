@@ -0,0 +1,171 @@
+"""
+HTTP 响应缓存模块
+按内容哈希压缩保存RSS原始响应，并记录每次运行使用的响应，支持离线回放
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """内容寻址的磁盘响应缓存（objects/ 按 sha256 存储 gzip 压缩的响应体）"""
+
+    def __init__(self, cache_dir: str, ttl_minutes: float = 30, retention_days: float = 7):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_minutes: 响应在该时间内视为新鲜，可直接复用而不访问网络
+            retention_days: 运行记录和响应体的保留天数
+        """
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.runs_dir = os.path.join(cache_dir, "runs")
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.ttl_seconds = ttl_minutes * 60
+        self.retention_seconds = retention_days * 86400
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Dict[str, Dict]] = {}
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self._index = self._load_json(self.index_file)
+
+    @staticmethod
+    def _load_json(path: str) -> Dict:
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"读取 {path} 失败: {e}")
+        return {}
+
+    @staticmethod
+    def _write_json(path: str, data: Dict) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], f"{sha}.gz")
+
+    def put(self, url: str, body: bytes, status: int = 200, headers: Optional[Dict] = None) -> str:
+        """
+        保存响应体（相同内容只存一份）
+
+        Returns:
+            响应体的 sha256
+        """
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._index[url] = {
+                'sha': sha,
+                'status': status,
+                'fetched_at': time.time(),
+                'headers': {k: v for k, v in (headers or {}).items() if v},
+            }
+        return sha
+
+    def get_body(self, sha: str) -> Optional[bytes]:
+        """按哈希读取响应体"""
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def get_fresh(self, url: str) -> Optional[Tuple[bytes, Dict]]:
+        """返回仍在有效期内的缓存响应 (body, meta)，否则返回 None"""
+        with self._lock:
+            meta = self._index.get(url)
+        if not meta or time.time() - meta.get('fetched_at', 0) > self.ttl_seconds:
+            return None
+        body = self.get_body(meta['sha'])
+        return (body, meta) if body is not None else None
+
+    def record(self, run_id: str, feed_id: str, url: str, sha: Optional[str],
+               status: int, fetched_at: Optional[float] = None,
+               article_ids: Optional[List[str]] = None) -> None:
+        """
+        记录某次运行中某个源使用的响应
+
+        Args:
+            article_ids: 该源在本次运行中实际产出的文章ID（回放时据此选取文章）
+        """
+        with self._lock:
+            self._runs.setdefault(run_id, {})[feed_id] = {
+                'url': url,
+                'sha': sha,
+                'status': status,
+                'fetched_at': fetched_at or time.time(),
+                'article_ids': list(article_ids or []),
+            }
+
+    def save_run(self, run_id: str) -> Optional[str]:
+        """写入运行记录和索引，并清理过期数据"""
+        with self._lock:
+            manifest = self._runs.pop(run_id, None)
+            index = dict(self._index)
+        try:
+            path = None
+            if manifest is not None:
+                path = os.path.join(self.runs_dir, f"{run_id}.json")
+                self._write_json(path, {'run_id': run_id, 'created_at': time.time(), 'feeds': manifest})
+            self._write_json(self.index_file, index)
+            self.prune()
+            return path
+        except Exception as e:
+            logger.warning(f"保存响应缓存失败: {e}")
+            return None
+
+    def load_run(self, run_id: str) -> Dict[str, Dict]:
+        """
+        读取运行记录
+
+        Raises:
+            FileNotFoundError: 运行记录不存在
+        """
+        path = os.path.join(self.runs_dir, f"{run_id}.json")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"未找到运行记录: {run_id}（可用: {', '.join(self.list_runs()[-5:]) or '无'}）")
+        return self._load_json(path).get('feeds', {})
+
+    def list_runs(self) -> List[str]:
+        """列出所有可回放的运行ID（按时间升序）"""
+        return sorted(name[:-5] for name in os.listdir(self.runs_dir) if name.endswith('.json'))
+
+    def prune(self) -> None:
+        """删除过期的运行记录和不再被引用的响应体"""
+        cutoff = time.time() - self.retention_seconds
+        referenced = set()
+        for run_id in self.list_runs():
+            path = os.path.join(self.runs_dir, f"{run_id}.json")
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                continue
+            referenced.update(e.get('sha') for e in self._load_json(path).get('feeds', {}).values())
+        with self._lock:
+            self._index = {url: meta for url, meta in self._index.items() if meta.get('fetched_at', 0) >= cutoff}
+            referenced.update(meta['sha'] for meta in self._index.values())
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                if name.endswith('.gz') and name[:-3] not in referenced:
+                    os.remove(os.path.join(prefix_dir, name))
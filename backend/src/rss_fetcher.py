@@ -3,17 +3,26 @@ RSS Feed 抓取模块
 负责从配置的RSS源获取最新文章
 """
 
-import feedparser
+import asyncio
 import requests
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple
+from urllib.parse import urlparse
 import logging
 import hashlib
-import json
 import os
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from config import SYSTEM_CONFIG
+from src.article_store import ArticleStore
+from src.feed_health import FeedHealthTracker
+from src.feed_scheduler import AdaptivePollScheduler
+from src.feed_state import FeedStateStore
+from src.response_cache import ResponseCache
+from src.stream_parser import StreamingFeedParser
 
 # 设置日志
 logging.basicConfig(level=logging.INFO)
@@ -34,48 +43,117 @@ class RSSFetcher:
         self.data_dir = data_dir
         self.cache_file = os.path.join(data_dir, "article_cache.json")
         self.seen_articles = self._load_cache()
+        self.feed_state = FeedStateStore(os.path.join(data_dir, "feed_state.json"))
+        self.conditional_get = SYSTEM_CONFIG.get('conditional_get', True)
+        self.fetch_concurrency = SYSTEM_CONFIG.get('fetch_concurrency', 5)
+        self.fetch_per_host_limit = SYSTEM_CONFIG.get('fetch_per_host_limit', 2)
+        self.request_timeout = SYSTEM_CONFIG.get('request_timeout', 15)
+        self.max_feed_bytes = SYSTEM_CONFIG.get('max_feed_bytes', 5 * 1024 * 1024)
+        self.old_entry_tolerance = SYSTEM_CONFIG.get('stream_old_entry_tolerance', 3)
+        self.stream_chunk_size = 16 * 1024
+        
+        # 自适应轮询：根据历史发布频率跳过近期不太可能更新的源
+        polling_config = SYSTEM_CONFIG.get('adaptive_polling', {})
+        self.poll_scheduler = AdaptivePollScheduler(
+            self.feed_state,
+            min_probability=polling_config.get('min_probability', 0.3),
+            max_staleness_hours=polling_config.get('max_staleness_hours', 12),
+            history_size=polling_config.get('history_size', 50),
+        ) if polling_config.get('enabled', True) else None
+        
+        # 源健康统计与熔断：连续失败的源在冷却期内直接跳过
+        breaker_config = SYSTEM_CONFIG.get('circuit_breaker', {})
+        self.feed_health = FeedHealthTracker(
+            self.feed_state,
+            failure_threshold=breaker_config.get('failure_threshold', 3),
+            cooldown_hours=breaker_config.get('cooldown_hours', 6),
+            max_cooldown_hours=breaker_config.get('max_cooldown_hours', 72),
+        )
+        self.circuit_breaker_enabled = breaker_config.get('enabled', True)
+        self.health_report_file = os.path.join(data_dir, "feed_health.json")
+        
+        # 原始响应缓存：短时间内重跑直接复用，并按运行ID记录以支持离线回放
+        cache_config = SYSTEM_CONFIG.get('response_cache', {})
+        self.response_cache = ResponseCache(
+            os.path.join(data_dir, "http_cache"),
+            ttl_minutes=cache_config.get('ttl_minutes', 30),
+            retention_days=cache_config.get('retention_days', 7),
+        ) if cache_config.get('enabled', True) else None
+        self.run_id = self._new_run_id()
+        self.drain_limit_bytes = 64 * 1024
         
         # 请求头，模拟浏览器
         self.headers = {
             "User-Agent": SYSTEM_CONFIG.get('user_agent', 'ThinkDeep.ai/1.0'),
             "Accept": "application/rss+xml, application/xml, text/xml, */*",
         }
+        if SYSTEM_CONFIG.get('http_compression', True):
+            # 显式声明压缩支持（安装了 brotli 时包含 br）
+            self.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        
+        # 长连接池：在源、重试和多次调度之间复用 TCP/TLS 连接
+        self.session = self._create_session()
+        self._stats_lock = threading.Lock()
+        self.last_run_stats: Dict = {}
     
-    def _load_cache(self) -> set:
-        """加载已抓取文章的缓存"""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r') as f:
-                    data = json.load(f)
-                    # 只保留最近7天的缓存
-                    cutoff = (datetime.now() - timedelta(days=7)).isoformat()
-                    return set(k for k, v in data.items() if v.get('date', '') > cutoff)
-            except Exception as e:
-                logger.warning(f"加载缓存失败: {e}")
-        return set()
+    def _create_session(self) -> requests.Session:
+        """创建带连接池的 HTTP 会话，连接池大小与抓取并发数一致"""
+        session = requests.Session()
+        hosts = {urlparse(c.get('url', '')).netloc.lower() for c in self.feeds_config.values()}
+        adapter = HTTPAdapter(
+            pool_connections=max(len(hosts), 10),   # 每个主机一个连接池，避免被淘汰
+            pool_maxsize=max(self.fetch_concurrency, 1),
+            pool_block=False,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not SYSTEM_CONFIG.get('http_keep_alive', True):
+            session.headers['Connection'] = 'close'
+        return session
+    
+    @staticmethod
+    def _new_run_id() -> str:
+        """生成运行ID（精确到微秒，同一秒内的多次运行不会覆盖彼此的运行记录）"""
+        return datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    
+    def _connection_pool_counts(self) -> Tuple[int, int]:
+        """统计会话中所有连接池的 (请求数, 新建连接数)"""
+        requests_total = connections_total = 0
+        adapters = {id(a): a for a in self.session.adapters.values()}  # http/https 共用同一适配器
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_total += pool.num_requests
+                connections_total += pool.num_connections
+        return requests_total, connections_total
+    
+    def _record_transfer(self, response: requests.Response, bytes_decoded: int) -> None:
+        """累计本次运行的传输字节数（网络上的压缩字节与解压后字节）"""
+        try:
+            wire_bytes = response.raw.tell()
+        except Exception:
+            wire_bytes = int(response.headers.get('Content-Length', 0) or 0)
+        with self._stats_lock:
+            self.last_run_stats['bytes_on_wire'] = self.last_run_stats.get('bytes_on_wire', 0) + wire_bytes
+            self.last_run_stats['bytes_decoded'] = self.last_run_stats.get('bytes_decoded', 0) + bytes_decoded
+            if response.status_code == 304:
+                self.last_run_stats['not_modified'] = self.last_run_stats.get('not_modified', 0) + 1
+    
+    def _load_cache(self) -> ArticleStore:
+        """打开已抓取文章的索引存储（首次运行时导入旧版 JSON 缓存）"""
+        return ArticleStore(
+            os.path.join(self.data_dir, "articles.db"),
+            ttl_days=SYSTEM_CONFIG.get('seen_article_ttl_days', 7),
+            legacy_cache_file=self.cache_file
+        )
     
     def _save_cache(self, new_articles: List[Dict]):
-        """保存文章缓存"""
+        """保存文章缓存（增量写入本次新文章）"""
         try:
-            cache_data = {}
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    cache_data = json.load(f)
-            
-            for article in new_articles:
-                article_id = self._get_article_id(article)
-                cache_data[article_id] = {
-                    'date': datetime.now().isoformat(),
-                    'title': article.get('title', '')[:100]
-                }
-            
-            # 清理旧缓存
-            cutoff = (datetime.now() - timedelta(days=7)).isoformat()
-            cache_data = {k: v for k, v in cache_data.items() if v.get('date', '') > cutoff}
-            
-            os.makedirs(self.data_dir, exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            self.seen_articles.commit(new_articles)
         except Exception as e:
             logger.warning(f"保存缓存失败: {e}")
     
@@ -88,9 +166,9 @@ class RSSFetcher:
         """解析文章发布日期"""
         date_fields = ['published_parsed', 'updated_parsed', 'created_parsed']
         for field in date_fields:
-            if hasattr(entry, field) and getattr(entry, field):
+            if entry.get(field):
                 try:
-                    time_struct = getattr(entry, field)
+                    time_struct = entry.get(field)
                     # 转换为带时区的datetime (UTC)
                     dt = datetime(*time_struct[:6], tzinfo=timezone.utc)
                     return dt
@@ -125,11 +203,39 @@ class RSSFetcher:
         # 这里我们保留原始链接，确保用户可以访问源网页
         return url
 
+    def _build_request_headers(self, feed_id: str) -> Dict[str, str]:
+        """构建请求头，附带上次保存的 ETag / Last-Modified 校验值"""
+        headers = dict(self.headers)
+        if self.conditional_get:
+            validators = self.feed_state.get_validators(feed_id)
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def _request_feed(self, feed_id: str, url: str) -> requests.Response:
+        """
+        发起一次HTTP请求（不含重试）
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败或返回错误状态码
+        """
+        response = self.session.get(url, headers=self._build_request_headers(feed_id),
+                                    timeout=self.request_timeout, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            self._release_response(response, 0)
+            raise
+        return response
+
     def fetch_single_feed(self, feed_id: str, feed_config: Dict, 
                           max_articles: int = 5,
                           hours_back: int = 24,
                           retry_attempts: int = 3,
-                          retry_delay: int = 2) -> List[Dict]:
+                          retry_delay: int = 2,
+                          cancel_event: Optional[threading.Event] = None) -> List[Dict]:
         """
         抓取单个RSS源
         
@@ -138,119 +244,318 @@ class RSSFetcher:
             feed_config: 源配置
             max_articles: 最大文章数
             hours_back: 抓取多少小时内的文章
+            cancel_event: 抓取截止时间到达时被设置，之后不再重试并丢弃结果
             
         Returns:
             文章列表
         """
-        articles = []
         url = feed_config.get('url', '')
         name = feed_config.get('name', feed_id)
+        cancel_event = cancel_event or threading.Event()
         
-        # 获取该源的自定义时间窗口（如果有）
-        source_hours_back = feed_config.get('hours_back_override', hours_back)
+        # 有效期内的缓存响应直接复用，不访问网络
+        cached_articles = self._fetch_from_cache(feed_id, feed_config, max_articles, hours_back)
+        if cached_articles is not None:
+            return cached_articles
+        
+        # 熔断器半开时只试探一次
+        retry_attempts = self.feed_health.attempts_allowed(feed_id, retry_attempts)
         
         # 重试机制
-        last_exception = None
         for attempt in range(retry_attempts):
             try:
                 if attempt > 0:
                     logger.info(f"重试抓取 {name} (第 {attempt + 1}/{retry_attempts} 次)...")
-                    time.sleep(retry_delay * attempt)  # 递增延迟
+                    if cancel_event.wait(retry_delay * attempt):  # 递增延迟，截止时间到达时立即放弃
+                        return []
                 
                 logger.info(f"正在抓取: {name}")
                 
                 # 使用requests获取内容，处理一些特殊情况
-                response = requests.get(url, headers=self.headers, timeout=15)
-                response.raise_for_status()
+                started_at = time.time()
+                response = self._request_feed(feed_id, url)
                 break  # 成功则跳出重试循环
                 
             except requests.exceptions.Timeout:
-                last_exception = f"超时"
                 if attempt == retry_attempts - 1:
                     logger.warning(f"抓取 {name} 超时（已重试 {retry_attempts} 次）")
-                    return articles
+                    self.feed_health.record_failure(feed_id, "超时", time.time() - started_at)
+                    return []
                 continue
             except requests.exceptions.RequestException as e:
-                last_exception = str(e)
                 if attempt == retry_attempts - 1:
                     logger.warning(f"抓取 {name} 失败: {e}（已重试 {retry_attempts} 次）")
-                    return articles
+                    self.feed_health.record_failure(feed_id, str(e), time.time() - started_at)
+                    return []
                 continue
         
+        return self._parse_feed_response(feed_id, feed_config, response, max_articles, hours_back,
+                                         started_at, cancel_event)
+
+    def _parse_feed_response(self, feed_id: str, feed_config: Dict,
+                             response: requests.Response,
+                             max_articles: int, hours_back: int,
+                             started_at: Optional[float] = None,
+                             cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        流式解析RSS响应并过滤出新文章
+        
+        边读取边解析，拿到足够的新文章、连续遇到超出时间窗口的旧文章，
+        或读取量超过 max_feed_bytes 时立即停止，不再下载和解析剩余内容。
+        启用响应缓存时，已读取的原始内容会被保存下来供复用和回放。
+        
+        Args:
+            feed_id: 源ID
+            feed_config: 源配置
+            response: HTTP响应（stream=True）
+            max_articles: 最大文章数
+            hours_back: 抓取多少小时内的文章
+            started_at: 请求开始时间（用于统计延迟）
+            cancel_event: 抓取截止时间到达时被设置，解析随即停止且不记录本次结果
+            
+        Returns:
+            文章列表
+        """
+        articles = []
+        name = feed_config.get('name', feed_id)
+        url = feed_config.get('url', '')
+        started_at = started_at or time.time()
+        
+        # 304 Not Modified：源内容未变化，跳过解析
+        if response.status_code == 304:
+            logger.info(f"{name} 未更新 (304)，跳过解析")
+            self._release_response(response, 0)
+            if self.poll_scheduler:
+                self.poll_scheduler.record_poll(feed_id)
+            self.feed_health.record_success(feed_id, time.time() - started_at)
+            if self.response_cache:
+                self.response_cache.record(self.run_id, feed_id, url, None, 304)
+            return articles
+
+        parser = StreamingFeedParser(max_bytes=self.max_feed_bytes)
+        captured: List[bytes] = []
         try:
+            chunks = response.iter_content(chunk_size=self.stream_chunk_size)
+            if self.response_cache:
+                chunks = self._capture_chunks(chunks, captured)
+            
+            articles, publish_times = self._parse_entries(
+                feed_id, feed_config, parser, chunks, max_articles, hours_back,
+                cancel_event=cancel_event
+            )
             
-            # 解析RSS
-            feed = feedparser.parse(response.content)
+            # 超过截止时间的结果会被丢弃，不能保存校验值，否则下次会被 304 跳过
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"{name} 超过抓取截止时间，丢弃本次结果")
+                return []
             
-            if feed.bozo and not feed.entries:
-                logger.warning(f"解析 {name} 时出现问题: {feed.bozo_exception}")
+            if parser.failed:
+                logger.warning(f"解析 {name} 时出现问题: {parser.error}")
+                self.feed_health.record_failure(feed_id, f"解析失败: {parser.error}", time.time() - started_at)
                 return articles
             
-            # 使用带时区的当前时间，优先使用源的自定义时间窗口
-            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=source_hours_back)
+            # 解析成功后再保存校验值，避免解析失败时被 304 永久跳过
+            if self.conditional_get:
+                self.feed_state.set_validators(
+                    feed_id,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
+            if self.poll_scheduler:
+                self.poll_scheduler.record_poll(feed_id, publish_times)
+            self.feed_health.record_success(feed_id, time.time() - started_at)
+            if self.response_cache:
+                sha = self.response_cache.put(url, b''.join(captured), response.status_code, {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                })
+                self.response_cache.record(self.run_id, feed_id, url, sha, response.status_code,
+                                           article_ids=[a['id'] for a in articles])
             
-            for entry in feed.entries[:max_articles * 2]:  # 多取一些以防过滤后不够
-                try:
-                    # 解析日期
-                    pub_date = self._parse_date(entry)
-                    
-                    # 严格过滤旧文章
-                    if pub_date:
-                        if pub_date < cutoff_time:
-                            continue
+            logger.info(f"从 {name} 获取了 {len(articles)} 篇新文章")
+            
+        except Exception as e:
+            logger.error(f"处理 {name} 时发生错误: {e}")
+            self.feed_health.record_failure(feed_id, str(e), time.time() - started_at)
+        finally:
+            self._release_response(response, parser.bytes_read)
+        
+        return articles
+    
+    @staticmethod
+    def _capture_chunks(chunks: Iterable[bytes], captured: List[bytes]) -> Iterator[bytes]:
+        """在解析的同时保留已读取的原始字节（用于响应缓存）"""
+        for chunk in chunks:
+            captured.append(chunk)
+            yield chunk
+    
+    def _parse_entries(self, feed_id: str, feed_config: Dict,
+                       parser: StreamingFeedParser, chunks: Iterable[bytes],
+                       max_articles: int, hours_back: int,
+                       now: Optional[datetime] = None,
+                       check_seen: bool = True,
+                       cancel_event: Optional[threading.Event] = None,
+                       select_ids: Optional[Set[str]] = None) -> Tuple[List[Dict], List[float]]:
+        """
+        从字节流中解析条目并构建文章对象
+        
+        Args:
+            feed_id: 源ID
+            feed_config: 源配置
+            parser: 流式解析器
+            chunks: 响应体字节块
+            max_articles: 最大文章数
+            hours_back: 抓取多少小时内的文章
+            now: 计算时间窗口使用的当前时间（回放时使用录制时间）
+            check_seen: 是否过滤已抓取过的文章
+            cancel_event: 被设置后停止解析
+            select_ids: 只选取这些ID的文章（回放时使用录制的文章ID，不受 check_seen 影响）
+            
+        Returns:
+            (文章列表, 观察到的发布时间戳列表)
+        """
+        articles = []
+        publish_times = []
+        name = feed_config.get('name', feed_id)
+        now = now or datetime.now(timezone.utc)
+        
+        # 获取该源的自定义时间窗口（如果有）
+        source_hours_back = feed_config.get('hours_back_override', hours_back)
+        
+        # 使用带时区的当前时间，优先使用源的自定义时间窗口
+        cutoff_time = now - timedelta(hours=source_hours_back)
+        
+        scanned = 0
+        consecutive_old = 0
+        entries = parser.iter_entries(chunks)
+        for entry in entries:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            scanned += 1
+            if scanned > max_articles * 2:  # 多取一些以防过滤后不够
+                break
+            try:
+                # 解析日期
+                pub_date = self._parse_date(entry)
+                if pub_date:
+                    publish_times.append(pub_date.timestamp())
+                
+                # 严格过滤旧文章
+                if pub_date:
+                    if pub_date < cutoff_time:
+                        # 源通常按时间倒序排列，连续遇到旧文章即可提前结束
+                        consecutive_old += 1
+                        if consecutive_old >= self.old_entry_tolerance:
+                            break
+                        continue
+                    consecutive_old = 0
+                else:
+                    # 如果没有日期，使用更保守的策略
+                    # 对于没有日期的文章，如果源优先级高，放宽时间限制
+                    source_priority = feed_config.get('priority', 5)
+                    if source_priority <= 2:
+                        # 高优先级源：如果没有日期，假设是最近的文章（但标记为当前时间减去12小时，避免排在最新）
+                        pub_date = now - timedelta(hours=12)
                     else:
-                        # 如果没有日期，使用更保守的策略
-                        # 对于没有日期的文章，如果源优先级高，放宽时间限制
-                        source_priority = feed_config.get('priority', 5)
-                        if source_priority <= 2:
-                            # 高优先级源：如果没有日期，假设是最近的文章（但标记为当前时间减去12小时，避免排在最新）
-                            pub_date = datetime.now(timezone.utc) - timedelta(hours=12)
-                        else:
-                            # 低优先级源：如果没有日期，跳过（避免抓取到很旧的文章）
-                            logger.debug(f"跳过无日期的文章: {entry.get('title', '')[:50]}")
-                            continue
-                    
-                    # 验证和规范化链接
-                    link = entry.get('link', '')
-                    if not self._is_valid_link(link):
-                        logger.debug(f"无效链接，跳过: {link[:50] if link else 'None'}")
+                        # 低优先级源：如果没有日期，跳过（避免抓取到很旧的文章）
+                        logger.debug(f"跳过无日期的文章: {entry.get('title', '')[:50]}")
                         continue
-                    
-                    # 规范化链接，确保可以正确跳转
-                    link = self._normalize_link(link)
+                
+                # 验证和规范化链接
+                link = entry.get('link', '')
+                if not self._is_valid_link(link):
+                    logger.debug(f"无效链接，跳过: {link[:50] if link else 'None'}")
+                    continue
+                
+                # 规范化链接，确保可以正确跳转
+                link = self._normalize_link(link)
 
-                    # 构建文章对象
-                    article = {
-                        'id': self._get_article_id({'title': entry.get('title', ''), 'link': link}),
-                        'title': entry.get('title', '无标题'),
-                        'link': link,  # 确保链接可跳转
-                        'summary': self._clean_summary(entry.get('summary', entry.get('description', ''))),
-                        'published': pub_date.isoformat(),
-                        'source_id': feed_id,
-                        'source_name': name,
-                        'category': feed_config.get('category', 'other'),
-                        'priority': feed_config.get('priority', 5),
-                    }
+                # 构建文章对象
+                article = {
+                    'id': self._get_article_id({'title': entry.get('title', ''), 'link': link}),
+                    'title': entry.get('title', '无标题'),
+                    'link': link,  # 确保链接可跳转
+                    'summary': self._clean_summary(entry.get('summary', entry.get('description', ''))),
+                    'published': pub_date.isoformat(),
+                    'source_id': feed_id,
+                    'source_name': name,
+                    'category': feed_config.get('category', 'other'),
+                    'priority': feed_config.get('priority', 5),
+                }
+                
+                # 检查是否已抓取过（回放时按录制的文章ID选取）
+                if select_ids is not None:
+                    selected = article['id'] in select_ids
+                else:
+                    selected = not check_seen or article['id'] not in self.seen_articles
+                if selected:
+                    articles.append(article)
+                    if check_seen:
+                        self.seen_articles.add(article['id'], article['title'])
                     
-                    # 检查是否已抓取过
-                    if article['id'] not in self.seen_articles:
-                        articles.append(article)
-                        self.seen_articles.add(article['id'])
+                    if len(articles) >= max_articles:
+                        break
                         
-                        if len(articles) >= max_articles:
-                            break
-                            
-                except Exception as e:
-                    logger.warning(f"解析文章时出错: {e}")
-                    continue
-            
-            logger.info(f"从 {name} 获取了 {len(articles)} 篇新文章")
-            
-        except Exception as e:
-            logger.error(f"处理 {name} 时发生错误: {e}")
+            except Exception as e:
+                logger.warning(f"解析文章时出错: {e}")
+                continue
+        entries.close()
         
+        return articles, publish_times
+    
+    def _parse_cached_body(self, feed_id: str, feed_config: Dict, body: bytes,
+                           max_articles: int, hours_back: int,
+                           now: Optional[datetime] = None,
+                           check_seen: bool = True,
+                           select_ids: Optional[Set[str]] = None) -> List[Dict]:
+        """解析缓存/录制的响应体（不访问网络）"""
+        parser = StreamingFeedParser(max_bytes=self.max_feed_bytes)
+        articles, _ = self._parse_entries(
+            feed_id, feed_config, parser, [body], max_articles, hours_back,
+            now=now, check_seen=check_seen, select_ids=select_ids
+        )
+        if parser.failed:
+            logger.warning(f"解析 {feed_config.get('name', feed_id)} 的缓存内容时出现问题: {parser.error}")
+        return articles
+    
+    def _fetch_from_cache(self, feed_id: str, feed_config: Dict,
+                          max_articles: int, hours_back: int) -> Optional[List[Dict]]:
+        """若缓存中有仍在有效期内的响应则直接解析，否则返回 None"""
+        if not self.response_cache:
+            return None
+        url = feed_config.get('url', '')
+        cached = self.response_cache.get_fresh(url)
+        if cached is None:
+            return None
+        body, meta = cached
+        logger.info(f"使用缓存的响应: {feed_config.get('name', feed_id)}")
+        with self._stats_lock:
+            self.last_run_stats['cache_hits'] = self.last_run_stats.get('cache_hits', 0) + 1
+        articles = self._parse_cached_body(feed_id, feed_config, body, max_articles, hours_back)
+        self.response_cache.record(self.run_id, feed_id, url, meta['sha'], meta.get('status', 200),
+                                   fetched_at=meta.get('fetched_at'),
+                                   article_ids=[a['id'] for a in articles])
         return articles
     
+    def _release_response(self, response: requests.Response, bytes_decoded: int) -> None:
+        """
+        结束流式响应并记录传输量
+        
+        提前停止解析时，剩余内容较少则读完以便连接回到连接池复用，否则直接关闭连接。
+        """
+        try:
+            drained = 0
+            if not response.raw.closed:
+                for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                    drained += len(chunk)
+                    if drained > self.drain_limit_bytes:
+                        break
+        except Exception:
+            pass
+        finally:
+            self._record_transfer(response, bytes_decoded)
+            response.close()
+    
     def _clean_summary(self, summary: str, max_length: int = 500) -> str:
         """清理摘要文本"""
         import re
@@ -263,10 +568,182 @@ class RSSFetcher:
             clean = clean[:max_length] + '...'
         return clean
     
+    def _fetch_all_threaded(self, jobs: List[Tuple[str, Dict, int]],
+                            max_articles: int, retry_attempts: int,
+                            retry_delay: int, deadline: Optional[float] = None,
+                            cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        使用线程池抓取所有源（重试等待会占用工作线程）
+        
+        按 jobs 的顺序（优先级从高到低）提交；到达截止时间后只返回已完成源的文章，
+        设置 cancel_event 让仍在进行的抓取尽快放弃，并取消尚未开始的任务。
+        """
+        all_articles = []
+        cancel_event = cancel_event or threading.Event()
+        
+        executor = ThreadPoolExecutor(max_workers=self.fetch_concurrency)
+        futures = {
+            executor.submit(
+                self.fetch_single_feed, 
+                feed_id, 
+                feed_config, 
+                max_articles,
+                feed_hours_back,
+                retry_attempts,
+                retry_delay,
+                cancel_event
+            ): feed_id 
+            for feed_id, feed_config, feed_hours_back in jobs
+        }
+        
+        collected = set()
+        timeout = max(deadline - time.time(), 0) if deadline is not None else None
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                collected.add(future)
+                feed_id = futures[future]
+                try:
+                    articles = future.result()
+                    all_articles.extend(articles)
+                except Exception as e:
+                    logger.error(f"获取 {feed_id} 结果时出错: {e}")
+        except FuturesTimeoutError:
+            cancel_event.set()
+            for future, feed_id in futures.items():
+                # 截止时间到达的同时完成的源仍然计入结果
+                if future in collected or not future.done() or future.cancelled():
+                    continue
+                collected.add(future)
+                if future.exception() is not None:
+                    logger.error(f"获取 {feed_id} 结果时出错: {future.exception()}")
+                else:
+                    all_articles.extend(future.result())
+            self._record_timed_out([feed_id for future, feed_id in futures.items() if future not in collected])
+        finally:
+            executor.shutdown(wait=not cancel_event.is_set(), cancel_futures=True)
+        
+        return all_articles
+
+    async def _fetch_all_async(self, jobs: List[Tuple[str, Dict, int]],
+                               max_articles: int, retry_attempts: int,
+                               retry_delay: int, deadline: Optional[float] = None,
+                               cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        使用 asyncio 抓取所有源
+        
+        全局并发和单个主机的并发分别由信号量限制；重试前的等待在信号量之外进行，
+        不会占用并发名额，也不会阻塞其他源的抓取。信号量按先来先得的顺序分配，
+        因此高优先级的源先开始抓取；到达截止时间后取消未完成的任务。
+        """
+        global_limit = asyncio.Semaphore(self.fetch_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        all_articles = []
+        cancel_event = cancel_event or threading.Event()
+        
+        executor = ThreadPoolExecutor(max_workers=self.fetch_concurrency)
+        try:
+            tasks = []
+            for feed_id, feed_config, feed_hours_back in jobs:
+                host = urlparse(feed_config.get('url', '')).netloc.lower()
+                if host not in host_limits:
+                    host_limits[host] = asyncio.Semaphore(self.fetch_per_host_limit)
+                tasks.append(asyncio.ensure_future(self._fetch_single_feed_async(
+                    executor, global_limit, host_limits[host],
+                    feed_id, feed_config, max_articles, feed_hours_back,
+                    retry_attempts, retry_delay, cancel_event
+                )))
+            
+            if not tasks:
+                return all_articles
+            timeout = max(deadline - time.time(), 0) if deadline is not None else None
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            if pending:
+                cancel_event.set()
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._record_timed_out([job[0] for job, task in zip(jobs, tasks) if task in pending])
+            
+            for (feed_id, _, _), task in zip(jobs, tasks):
+                if task in pending:
+                    continue
+                if task.exception() is not None:
+                    logger.error(f"获取 {feed_id} 结果时出错: {task.exception()}")
+                else:
+                    all_articles.extend(task.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return all_articles
+
+    def _record_timed_out(self, feed_ids: List[str]) -> None:
+        """记录因超过抓取截止时间而放弃的源"""
+        if not feed_ids:
+            return
+        names = [self.feeds_config.get(feed_id, {}).get('name', feed_id) for feed_id in feed_ids]
+        logger.warning(f"抓取超过截止时间，放弃 {len(feed_ids)} 个未完成的源: {', '.join(names)}")
+        with self._stats_lock:
+            self.last_run_stats['timed_out_feeds'] = list(feed_ids)
+
+    async def _fetch_single_feed_async(self, executor: ThreadPoolExecutor,
+                                       global_limit: asyncio.Semaphore,
+                                       host_limit: asyncio.Semaphore,
+                                       feed_id: str, feed_config: Dict,
+                                       max_articles: int, hours_back: int,
+                                       retry_attempts: int, retry_delay: int,
+                                       cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """asyncio 模式下抓取单个RSS源，返回与 fetch_single_feed 相同的文章字典"""
+        loop = asyncio.get_running_loop()
+        url = feed_config.get('url', '')
+        name = feed_config.get('name', feed_id)
+        
+        # 有效期内的缓存响应直接复用，不访问网络
+        cached_articles = await loop.run_in_executor(
+            executor, self._fetch_from_cache, feed_id, feed_config, max_articles, hours_back
+        )
+        if cached_articles is not None:
+            return cached_articles
+        
+        # 熔断器半开时只试探一次
+        retry_attempts = self.feed_health.attempts_allowed(feed_id, retry_attempts)
+        
+        for attempt in range(retry_attempts):
+            if attempt > 0:
+                logger.info(f"重试抓取 {name} (第 {attempt + 1}/{retry_attempts} 次)...")
+                await asyncio.sleep(retry_delay * attempt)  # 递增延迟，不占用并发名额
+            
+            async with global_limit, host_limit:
+                started_at = time.time()
+                try:
+                    logger.info(f"正在抓取: {name}")
+                    response = await loop.run_in_executor(executor, self._request_feed, feed_id, url)
+                except requests.exceptions.Timeout:
+                    if attempt == retry_attempts - 1:
+                        logger.warning(f"抓取 {name} 超时（已重试 {retry_attempts} 次）")
+                        self.feed_health.record_failure(feed_id, "超时", time.time() - started_at)
+                        return []
+                    continue
+                except requests.exceptions.RequestException as e:
+                    if attempt == retry_attempts - 1:
+                        logger.warning(f"抓取 {name} 失败: {e}（已重试 {retry_attempts} 次）")
+                        self.feed_health.record_failure(feed_id, str(e), time.time() - started_at)
+                        return []
+                    continue
+                
+                return await loop.run_in_executor(
+                    executor, self._parse_feed_response,
+                    feed_id, feed_config, response, max_articles, hours_back, started_at, cancel_event
+                )
+        
+        return []
+    
     def fetch_all_feeds(self, max_articles_per_source: int = 5,
                         hours_back: int = 24,
                         retry_attempts: int = 3,
-                        retry_delay: int = 2) -> List[Dict]:
+                        retry_delay: int = 2,
+                        engine: Optional[str] = None,
+                        respect_schedule: bool = True,
+                        deadline_seconds: Optional[float] = None) -> List[Dict]:
         """
         并行抓取所有RSS源
         
@@ -275,44 +752,177 @@ class RSSFetcher:
             hours_back: 默认抓取多少小时内的文章
             retry_attempts: 重试次数
             retry_delay: 重试延迟（秒）
+            engine: 抓取引擎，"thread"（线程池）或 "asyncio"，默认读取 SYSTEM_CONFIG['fetch_engine']
+            respect_schedule: 是否按自适应轮询调度跳过近期不太可能更新的源
+            deadline_seconds: 抓取阶段总时限（秒），默认读取 SYSTEM_CONFIG['fetch_deadline_seconds']；
+                到时只返回已完成源的文章，其余源放弃
             
         Returns:
             所有文章列表
         """
-        all_articles = []
+        engine = engine or SYSTEM_CONFIG.get('fetch_engine', 'thread')
+        if deadline_seconds is None:
+            deadline_seconds = SYSTEM_CONFIG.get('fetch_deadline_seconds')
+        started_at = time.time()
+        deadline = started_at + deadline_seconds if deadline_seconds else None
+        cancel_event = threading.Event()
+        pool_requests_before, pool_connections_before = self._connection_pool_counts()
+        self.run_id = self._new_run_id()
+        self.last_run_stats = {'engine': engine, 'run_id': self.run_id,
+                               'bytes_on_wire': 0, 'bytes_decoded': 0, 'not_modified': 0}
         
-        # 根据类别获取时间窗口
-        hours_back_by_category = SYSTEM_CONFIG.get('hours_back_by_category', {})
+        jobs = self._feed_jobs(hours_back)
+        
+        skipped = []
+        if self.poll_scheduler and respect_schedule:
+            now = time.time()
+            due = [job for job in jobs if self.poll_scheduler.should_poll(job[0], now)]
+            skipped = [job[0] for job in jobs if job not in due]
+            for feed_id in skipped:
+                info = self.poll_scheduler.describe(feed_id, now)
+                logger.info(f"跳过 {feed_id}：预计更新 {info['rate_per_day']} 篇/天，"
+                            f"有新文章的概率 {info['probability']:.0%}")
+            jobs = due
+        self.last_run_stats['skipped_by_schedule'] = len(skipped)
+        
+        if self.circuit_breaker_enabled:
+            now = time.time()
+            open_circuits = [job[0] for job in jobs if not self.feed_health.allow_request(job[0], now)]
+            for feed_id in open_circuits:
+                health = self.feed_health.report({feed_id: self.feeds_config[feed_id]})['feeds'][feed_id]
+                logger.info(f"跳过 {feed_id}：熔断中（至 {health['circuit_open_until']}，"
+                            f"最近错误: {health['last_error']}）")
+            jobs = [job for job in jobs if job[0] not in open_circuits]
+            self.last_run_stats['skipped_by_circuit'] = len(open_circuits)
+        
+        # 丢弃上一轮超时放弃的源可能残留的暂存ID
+        self.seen_articles.discard_pending()
+        # 常驻进程（如定时任务）每轮都清理过期ID，而不只在启动时
+        expired = self.seen_articles.expire()
+        if expired:
+            logger.info(f"已清理 {expired} 条过期的文章ID")
+        if engine == 'asyncio':
+            all_articles = asyncio.run(self._fetch_all_async(
+                jobs, max_articles_per_source, retry_attempts, retry_delay, deadline, cancel_event
+            ))
+        else:
+            all_articles = self._fetch_all_threaded(
+                jobs, max_articles_per_source, retry_attempts, retry_delay, deadline, cancel_event
+            )
+        
+        self.rank_articles(all_articles)
+        
+        # 保存缓存：只把本次实际返回的文章标记为已见，超时放弃的源下次仍会抓取
+        self.seen_articles.discard_pending()
+        self._save_cache(all_articles)
+        self.feed_state.save()
+        self.feed_health.write_report(self.health_report_file, self.feeds_config)
+        if self.response_cache:
+            self.response_cache.save_run(self.run_id)
+        
+        # 汇总本次运行的传输统计
+        pool_requests, pool_connections = self._connection_pool_counts()
+        http_requests = pool_requests - pool_requests_before
+        new_connections = pool_connections - pool_connections_before
+        self.last_run_stats.update({
+            'feeds': len(jobs),
+            'articles': len(all_articles),
+            'http_requests': http_requests,
+            'new_connections': new_connections,
+            'reused_connections': max(http_requests - new_connections, 0),
+            'elapsed_seconds': round(time.time() - started_at, 2),
+        })
+        
+        logger.info(f"总共获取了 {len(all_articles)} 篇新文章")
+        logger.info(
+            f"抓取统计: 请求 {http_requests} 次，新建连接 {new_connections} 个，"
+            f"复用连接 {self.last_run_stats['reused_connections']} 次，"
+            f"传输 {self.last_run_stats['bytes_on_wire'] / 1024:.1f} KB"
+            f"（解压后 {self.last_run_stats['bytes_decoded'] / 1024:.1f} KB），"
+            f"304 未更新 {self.last_run_stats['not_modified']} 个，"
+            f"缓存命中 {self.last_run_stats.get('cache_hits', 0)} 个（运行ID: {self.run_id}）"
+        )
+        return all_articles
+
+    def replay(self, run_id: str, max_articles_per_source: int = 5,
+               hours_back: int = 24) -> List[Dict]:
+        """
+        离线回放某次运行录制的RSS响应（不访问网络，不读写已抓取缓存和源状态）
+        
+        时间窗口和排序以录制时间为准；每个源只选取录制时实际产出的文章（运行记录中的 article_ids），
+        因此跳过已抓取文章后取到的较新条目也能还原，回放结果与该次运行抓取到的文章一致。
+        早期没有记录文章ID的运行只能还原输入：按录制的响应重新选取每个源的前几篇文章。
         
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {
-                executor.submit(
-                    self.fetch_single_feed, 
-                    feed_id, 
-                    feed_config, 
-                    max_articles_per_source,
-                    hours_back_by_category.get(feed_config.get('category', 'other'), hours_back),
-                    retry_attempts,
-                    retry_delay
-                ): feed_id 
-                for feed_id, feed_config in self.feeds_config.items()
-            }
+        Args:
+            run_id: 运行ID（见 data/http_cache/runs/）
+            max_articles_per_source: 每个源最大文章数
+            hours_back: 默认抓取多少小时内的文章
             
-            for future in as_completed(futures):
-                feed_id = futures[future]
-                try:
-                    articles = future.result()
-                    all_articles.extend(articles)
-                except Exception as e:
-                    logger.error(f"获取 {feed_id} 结果时出错: {e}")
+        Returns:
+            所有文章列表
+        
+        Raises:
+            RuntimeError: 未启用响应缓存
+            FileNotFoundError: 运行记录不存在
+        """
+        if not self.response_cache:
+            raise RuntimeError("未启用响应缓存（SYSTEM_CONFIG['response_cache']），无法回放")
+        manifest = self.response_cache.load_run(run_id)
+        self.run_id = run_id
+        self.last_run_stats = {'engine': 'replay', 'run_id': run_id}
+        
+        all_articles = []
+        recorded_at = None
+        for feed_id, feed_config, feed_hours_back in self._feed_jobs(hours_back):
+            entry = manifest.get(feed_id)
+            if not entry or not entry.get('sha'):
+                continue
+            body = self.response_cache.get_body(entry['sha'])
+            if body is None:
+                logger.warning(f"回放 {feed_id} 失败：响应体已被清理")
+                continue
+            fetched_at = datetime.fromtimestamp(entry['fetched_at'], timezone.utc)
+            recorded_at = max(recorded_at or fetched_at, fetched_at)
+            select_ids = set(entry['article_ids']) if 'article_ids' in entry else None
+            all_articles.extend(self._parse_cached_body(
+                feed_id, feed_config, body, max_articles_per_source, feed_hours_back,
+                now=fetched_at, check_seen=False, select_ids=select_ids
+            ))
+        
+        # 同一次运行内去重（与在线抓取时 seen_articles 的效果一致）
+        unique = {}
+        for article in all_articles:
+            unique.setdefault(article['id'], article)
+        all_articles = list(unique.values())
         
+        self.rank_articles(all_articles, now=recorded_at)
+        self.last_run_stats.update({'feeds': len(manifest), 'articles': len(all_articles)})
+        logger.info(f"回放运行 {run_id}：共 {len(all_articles)} 篇文章")
+        return all_articles
+
+    def _feed_jobs(self, hours_back: int) -> List[Tuple[str, Dict, int]]:
+        """
+        生成 (源ID, 源配置, 时间窗口) 列表，时间窗口根据类别确定
+        
+        按优先级排序（数字越小越靠前），在有截止时间时保证高优先级的源先抓取。
+        """
+        hours_back_by_category = SYSTEM_CONFIG.get('hours_back_by_category', {})
+        feeds = sorted(self.feeds_config.items(), key=lambda item: item[1].get('priority', 5))
+        return [
+            (feed_id, feed_config,
+             hours_back_by_category.get(feed_config.get('category', 'other'), hours_back))
+            for feed_id, feed_config in feeds
+        ]
+
+    def rank_articles(self, all_articles: List[Dict], now: Optional[datetime] = None) -> None:
+        """按发布时间和源优先级的综合分数原地排序"""
         # 优化排序算法：综合考虑优先级、时间和相关性
-        # 1. 先按发布时间排序（最新的在前）
-        all_articles.sort(key=lambda x: x['published'], reverse=True)
+        # 1. 先按发布时间排序（最新的在前；时间相同时按ID，使结果与各源完成抓取的先后无关，回放可复现）
+        all_articles.sort(key=lambda x: (x['published'], x.get('id', '')), reverse=True)
         
         # 2. 然后按优先级调整（高优先级文章提升位置）
         # 计算每个文章的"分数"：时间分数 + 优先级分数
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         for article in all_articles:
             try:
                 pub_time = datetime.fromisoformat(article['published'].replace('Z', '+00:00'))
@@ -331,12 +941,6 @@ class RSSFetcher:
         # 移除临时排序分数
         for article in all_articles:
             article.pop('_sort_score', None)
-        
-        # 保存缓存
-        self._save_cache(all_articles)
-        
-        logger.info(f"总共获取了 {len(all_articles)} 篇新文章")
-        return all_articles
 
 
 def test_fetcher():
@@ -0,0 +1,136 @@
+"""
+新闻聚类模块
+使用 TF-IDF 向量和余弦相似度（NumPy 向量化）将报道同一事件的文章聚为一个故事，
+只把每个故事的代表文章交给 LLM，摘要再回填到故事内的所有文章
+"""
+
+import logging
+import math
+from collections import Counter
+from typing import Dict, List
+
+from src.dedup import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时不做聚类
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class StoryClusterer:
+    """基于 TF-IDF 余弦相似度的故事聚类器"""
+
+    # 每次计算相似度的行数
+    BLOCK_ROWS = 512
+
+    def __init__(self, threshold: float = 0.3, max_features: int = 4096,
+                 summary_chars: int = 300, title_weight: int = 2):
+        """
+        初始化聚类器
+
+        Args:
+            threshold: 与故事代表文章的余弦相似度达到该值即归入同一故事
+            max_features: 参与相似度计算的最大词数（按文档频率取最高的词）
+            summary_chars: 参与计算的摘要长度
+            title_weight: 标题词的重复次数（标题比摘要更能代表报道的事件）
+        """
+        self.threshold = threshold
+        self.max_features = max_features
+        self.summary_chars = summary_chars
+        self.title_weight = title_weight
+        self.last_stats: Dict = {}
+
+    def _documents(self, articles: List[Dict]) -> List[Counter]:
+        """将文章转换为词频统计"""
+        return [
+            Counter(tokenize(article.get('title', '')) * self.title_weight
+                    + tokenize(article.get('summary', '')[:self.summary_chars]))
+            for article in articles
+        ]
+
+    def vectorize(self, articles: List[Dict]):
+        """
+        计算文章的 TF-IDF 向量（L2 归一化）
+
+        只在至少两篇文章中出现的词才可能贡献相似度，矩阵只保留这些列；
+        归一化的模长仍按全部词计算，因此结果与完整矩阵的余弦相似度相同。
+
+        Returns:
+            (文章数 × 词数) 的 float32 矩阵
+        """
+        documents = self._documents(articles)
+        count = len(documents)
+        df = Counter(term for doc in documents for term in doc)
+        idf = {term: math.log((1 + count) / (1 + freq)) + 1 for term, freq in df.items()}
+
+        shared = sorted((term for term, freq in df.items() if freq > 1), key=lambda t: (-df[t], t))
+        columns = {term: index for index, term in enumerate(shared[:self.max_features])}
+
+        matrix = np.zeros((count, len(columns)), dtype=np.float32)
+        norms = np.ones(count, dtype=np.float32)
+        for row, doc in enumerate(documents):
+            squared = 0.0
+            for term, freq in doc.items():
+                weight = (1 + math.log(freq)) * idf[term]
+                squared += weight * weight
+                column = columns.get(term)
+                if column is not None:
+                    matrix[row, column] = weight
+            if squared:
+                norms[row] = math.sqrt(squared)
+        matrix /= norms[:, None]
+        return matrix
+
+    def cluster(self, articles: List[Dict]) -> List[List[Dict]]:
+        """
+        将文章聚类为故事
+
+        按输入顺序（排序靠前者优先）依次选取尚未归类的文章作为故事代表，
+        与其相似度达到阈值的其余未归类文章归入该故事。每篇文章会写入
+        story_id（代表文章的 id）和 story_size（故事内文章数）字段。
+
+        Args:
+            articles: 已排序的文章列表
+
+        Returns:
+            故事列表，每个故事的第一篇为代表文章，按代表文章的顺序排列
+        """
+        if np is None:
+            logger.warning("未安装 numpy，跳过新闻聚类")
+            stories = [[article] for article in articles]
+        elif len(articles) < 2:
+            stories = [[article] for article in articles]
+        else:
+            matrix = self.vectorize(articles)
+            labels = np.full(len(articles), -1, dtype=np.int64)
+            stories = []
+            block = None
+            for leader in range(len(articles)):
+                if labels[leader] >= 0:
+                    continue
+                # 按行分块计算相似度矩阵，避免一次性占用 n × n 内存
+                if block is None or leader >= block_start + len(block):
+                    block_start = leader
+                    block = matrix[leader:leader + self.BLOCK_ROWS] @ matrix.T
+                similar = (block[leader - block_start] >= self.threshold) & (labels < 0)
+                # 代表文章本身的向量可能为空（没有可用词），始终归入自己的故事
+                similar[leader] = True
+                members = np.flatnonzero(similar)
+                labels[members] = len(stories)
+                stories.append([articles[index] for index in members])
+
+        for story in stories:
+            for article in story:
+                article['story_id'] = story[0].get('id')
+                article['story_size'] = len(story)
+
+        self.last_stats = {
+            'articles': len(articles),
+            'stories': len(stories),
+            'clustered_articles': len(articles) - len(stories),
+        }
+        if self.last_stats['clustered_articles']:
+            logger.info(f"新闻聚类: {len(articles)} 篇文章归为 {len(stories)} 个故事")
+        return stories
@@ -0,0 +1,194 @@
+"""
+流式 RSS/Atom 解析模块
+边下载边解析条目，调用方拿到足够的文章后即可停止读取剩余内容
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+# 条目元素（RSS 2.0 / RSS 1.0 使用 item，Atom 使用 entry）
+ENTRY_TAGS = {'item', 'entry'}
+
+# 日期元素 -> 与 feedparser 一致的字段名
+DATE_FIELDS = {
+    'pubDate': 'published_parsed',
+    'published': 'published_parsed',
+    'issued': 'published_parsed',
+    'updated': 'updated_parsed',
+    'modified': 'updated_parsed',
+    'date': 'updated_parsed',       # dc:date
+    'created': 'created_parsed',
+}
+
+# 摘要元素，按优先级排列
+SUMMARY_TAGS = ('description', 'summary', 'encoded', 'content')
+
+
+def _local_name(tag: str) -> str:
+    """去掉命名空间前缀，例如 {http://www.w3.org/2005/Atom}entry -> entry"""
+    return tag.rsplit('}', 1)[-1] if '}' in tag else tag
+
+
+def _parse_date_text(text: str):
+    """解析 RFC 822 / ISO 8601 日期，返回 UTC 的 time.struct_time"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    dt = None
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).timetuple()
+
+
+class FeedTooLargeError(Exception):
+    """响应体超过允许的最大字节数"""
+
+
+class StreamingFeedParser:
+    """增量式 RSS/Atom 解析器，逐个产出与 feedparser 字段兼容的条目字典"""
+
+    def __init__(self, max_bytes: int = 5 * 1024 * 1024):
+        """
+        初始化解析器
+
+        Args:
+            max_bytes: 单个源允许读取的最大字节数，超过后停止读取
+        """
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.truncated = False
+        self.used_fallback = False
+        self.failed = False
+        self.error = None
+
+    def iter_entries(self, chunks: Iterable[bytes]) -> Iterator[Dict]:
+        """
+        从字节块流中逐个解析条目
+
+        XML 不合法（例如包含 HTML 实体）时，改用 feedparser 解析已读取的内容作为兜底。
+
+        Args:
+            chunks: 响应体字节块迭代器
+
+        Yields:
+            条目字典（title / link / summary / *_parsed 日期）
+        """
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        buffer = bytearray()
+        stack = []
+        yielded = 0
+        chunk_iter = iter(chunks)
+
+        try:
+            for chunk in chunk_iter:
+                if not chunk:
+                    continue
+                self._consume(chunk, buffer)
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if event == 'start':
+                        stack.append(elem)
+                        continue
+                    stack.pop()
+                    if _local_name(elem.tag) in ENTRY_TAGS:
+                        entry = self._entry_from_element(elem)
+                        # 释放已处理的条目，保持内存占用与保留条目数相关
+                        elem.clear()
+                        if stack:
+                            stack[-1].remove(elem)
+                        yielded += 1
+                        yield entry
+        except FeedTooLargeError:
+            self.truncated = True
+            logger.warning(f"RSS 内容超过 {self.max_bytes} 字节，已停止读取")
+        except ET.ParseError as e:
+            logger.debug(f"流式解析失败，改用 feedparser: {e}")
+            yield from self._fallback(chunk_iter, buffer, skip=yielded)
+
+    def _consume(self, chunk: bytes, buffer: bytearray) -> None:
+        """记录已读取的字节，并保留一份副本供兜底解析使用"""
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            raise FeedTooLargeError()
+        buffer.extend(chunk)
+
+    def _fallback(self, chunk_iter: Iterator[bytes], buffer: bytearray, skip: int) -> Iterator[Dict]:
+        """读取剩余内容（仍受最大字节数限制）后交给 feedparser 解析"""
+        self.used_fallback = True
+        try:
+            for chunk in chunk_iter:
+                self._consume(chunk, buffer)
+        except FeedTooLargeError:
+            self.truncated = True
+            logger.warning(f"RSS 内容超过 {self.max_bytes} 字节，已停止读取")
+
+        feed = feedparser.parse(bytes(buffer))
+        if feed.bozo and not feed.entries:
+            self.failed = True
+            self.error = feed.bozo_exception
+            return
+        # 跳过流式解析阶段已经产出的条目
+        yield from feed.entries[skip:]
+
+    def _entry_from_element(self, elem: ET.Element) -> Dict:
+        """将 item/entry 元素转换为条目字典"""
+        entry: Dict = {}
+        summaries: Dict[str, str] = {}
+        guid_link = None
+
+        for child in elem:
+            name = _local_name(child.tag)
+            if name == 'title':
+                entry['title'] = ''.join(child.itertext()).strip()
+            elif name == 'link':
+                href = child.get('href')
+                if href is not None:
+                    # Atom：优先 rel="alternate"（或未声明 rel）的链接
+                    if child.get('rel', 'alternate') == 'alternate' or 'link' not in entry:
+                        entry['link'] = href.strip()
+                elif child.text:
+                    entry['link'] = child.text.strip()
+            elif name == 'guid':
+                # 与 feedparser 一致：未声明 isPermaLink="false" 的 guid 可作为链接
+                if child.text and child.get('isPermaLink', 'true').lower() != 'false':
+                    guid_link = child.text.strip()
+            elif name in DATE_FIELDS:
+                field = DATE_FIELDS[name]
+                if field not in entry:
+                    parsed = _parse_date_text(child.text)
+                    if parsed:
+                        entry[field] = parsed
+            elif name in SUMMARY_TAGS and name not in summaries:
+                summaries[name] = ''.join(child.itertext())
+
+        # RSS 2.0 的条目可能只在 guid 中给出链接
+        if 'link' not in entry and guid_link:
+            entry['link'] = guid_link
+
+        # RSS 1.0 的条目可能只在 rdf:about 中给出链接
+        if 'link' not in entry:
+            about = next((v for k, v in elem.attrib.items() if _local_name(k) == 'about'), None)
+            if about:
+                entry['link'] = about.strip()
+
+        summary = next((summaries[tag] for tag in SUMMARY_TAGS if summaries.get(tag)), None)
+        if summary is not None:
+            entry['summary'] = summary
+        return entry
+
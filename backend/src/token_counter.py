@@ -0,0 +1,54 @@
+"""
+Token 估算模块
+在本地近似估算文本的 token 数，用于限流和提示词预算（无需调用模型的计数接口）
+"""
+
+import math
+import re
+
+# 中日韩字符（含全角标点）通常每个字符约 1 个 token
+_CJK_RE = re.compile(r'[　-〿぀-ヿ㐀-䶿一-鿿가-힯＀-￯]')
+# 其余文本（英文、数字、代码）按约 4 个字符 1 个 token 估算
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数（非空文本至少为 1）
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk
+    return max(1, cjk + math.ceil(other / _CHARS_PER_TOKEN))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = '…') -> str:
+    """
+    将文本截断到约 max_tokens 个 token 以内（超出时追加省略号）
+
+    Args:
+        text: 文本
+        max_tokens: token 上限
+        suffix: 截断后追加的后缀
+
+    Returns:
+        截断后的文本
+    """
+    if max_tokens <= 0 or not text:
+        return ''
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens - estimate_tokens(suffix)
+    cost = 0.0
+    for i, char in enumerate(text):
+        cost += 1 if _CJK_RE.match(char) else 1 / _CHARS_PER_TOKEN
+        if cost > limit:
+            return text[:i].rstrip() + suffix
+    return text
@@ -0,0 +1,58 @@
+"""
+测试公共夹具
+使用 benchmarks/feed_server.py 的合成RSS源服务器作为本地 HTTP 替身，不访问外部网络
+"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+import config  # noqa: E402
+from feed_server import start_server  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def feed_server():
+    """本地合成源服务器（整个测试会话共用）"""
+    server = start_server()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def system_config(monkeypatch):
+    """隔离的 SYSTEM_CONFIG：关闭自适应轮询和响应缓存，测试按需开启"""
+    monkeypatch.setitem(config.SYSTEM_CONFIG, 'adaptive_polling', {'enabled': False})
+    monkeypatch.setitem(config.SYSTEM_CONFIG, 'response_cache', {'enabled': False})
+    monkeypatch.setitem(config.SYSTEM_CONFIG, 'hours_back_by_category', {})
+    monkeypatch.setitem(config.SYSTEM_CONFIG, 'fetch_deadline_seconds', None)
+    return config.SYSTEM_CONFIG
+
+
+@pytest.fixture
+def make_fetcher(tmp_path, feed_server, system_config):
+    """
+    按源参数创建抓取器，例如 make_fetcher({'a': 'entries=10&stable=1'})
+
+    每个源指向本地服务器上的 /feeds/<源ID>.xml，默认无延迟；同一测试中多次调用共用数据目录
+    """
+    from src.rss_fetcher import RSSFetcher
+
+    def factory(feeds, data_dir=None):
+        feeds_config = {
+            feed_id: {
+                'name': feed_id,
+                'url': f"{feed_server}/feeds/{feed_id}.xml?latency_ms=0&jitter_ms=0&{query}",
+                'category': 'research',
+                'priority': 1,
+            }
+            for feed_id, query in feeds.items()
+        }
+        return RSSFetcher(feeds_config, data_dir=str(data_dir or tmp_path / "data"))
+
+    return factory
@@ -0,0 +1,33 @@
+"""已见文章ID存储的过期清理测试"""
+
+import time
+
+from src.article_store import ArticleStore
+
+
+def _backdate(store, article_id, days):
+    store._conn.execute("UPDATE seen_articles SET first_seen = ? WHERE id = ?",
+                        (time.time() - days * 86400, article_id))
+
+
+def test_expire_removes_old_ids_and_rebuilds_bloom(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"), ttl_days=7)
+    store.commit([{'id': 'old', 'title': 'Old'}, {'id': 'new', 'title': 'New'}])
+    _backdate(store, 'old', 8)
+
+    assert store.expire() == 1
+    assert 'old' not in store and 'old' not in store._bloom
+    assert 'new' in store and len(store) == 1
+    # 没有过期ID时不重建过滤器
+    bloom = store._bloom
+    assert store.expire() == 0
+    assert store._bloom is bloom
+
+
+def test_each_fetch_run_expires_old_ids(make_fetcher):
+    fetcher = make_fetcher({'a': 'entries=5&stable=1'})
+    fetcher.seen_articles.commit([{'id': 'old', 'title': 'Old'}])
+    _backdate(fetcher.seen_articles, 'old', fetcher.seen_articles.ttl_seconds / 86400 + 1)
+
+    fetcher.fetch_all_feeds(max_articles_per_source=5, hours_back=48, retry_attempts=1, retry_delay=0)
+    assert 'old' not in fetcher.seen_articles
@@ -0,0 +1,31 @@
+"""近似重复检测器的索引过期测试"""
+
+import time
+
+from src.dedup import NearDuplicateDetector
+
+STORY = {'id': 'a1', 'title': 'OpenAI releases a new reasoning model for developers',
+         'summary': 'The model improves math and coding benchmarks and ships today in the API.',
+         'source_name': 'A', 'link': 'https://a.com/1'}
+
+
+def _count(detector, table):
+    return detector._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_collapse_expires_old_index_entries(tmp_path):
+    detector = NearDuplicateDetector(str(tmp_path / "dedup.db"), ttl_days=7)
+    detector.collapse([STORY])
+    assert _count(detector, 'story_docs') == 1
+
+    # 同一篇报道的转载在保留期内会被丢弃
+    repost = dict(STORY, id='b1', source_name='B', link='https://b.com/1')
+    assert detector.collapse([repost]) == []
+
+    # 超过保留期后，下一轮 collapse 先清理索引，转载不再被视为往期重复
+    old = time.time() - 8 * 86400
+    for table in ('story_docs', 'story_buckets'):
+        detector._conn.execute(f"UPDATE {table} SET first_seen = ?", (old,))
+    assert detector.collapse([repost]) == [repost]
+    assert _count(detector, 'story_docs') == 1
+    assert _count(detector, 'story_buckets') == detector.bands
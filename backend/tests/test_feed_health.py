@@ -0,0 +1,107 @@
+"""源熔断器测试（本地合成源服务器）"""
+
+import time
+
+import pytest
+
+FAILING = 'entries=5&error_rate=1'
+HEALTHY = 'entries=5&stable=0'
+
+
+@pytest.fixture
+def breaker_config(system_config, monkeypatch):
+    monkeypatch.setitem(system_config, 'circuit_breaker', {
+        'enabled': True, 'failure_threshold': 2, 'cooldown_hours': 1, 'max_cooldown_hours': 3,
+    })
+
+
+def _fetch(fetcher, feed_id, retry_attempts=3):
+    return fetcher.fetch_single_feed(feed_id, fetcher.feeds_config[feed_id], max_articles=5,
+                                     hours_back=48, retry_attempts=retry_attempts, retry_delay=0)
+
+
+def _requests_sent(fetcher, action):
+    before, _ = fetcher._connection_pool_counts()
+    action()
+    after, _ = fetcher._connection_pool_counts()
+    return after - before
+
+
+def _expire_cooldown(fetcher, feed_id):
+    health = dict(fetcher.feed_state.get(feed_id)['health'])
+    health['circuit_open_until'] = time.time() - 1
+    fetcher.feed_state.update(feed_id, health=health)
+
+
+def _open_circuit(fetcher, feed_id):
+    for _ in range(2):
+        _fetch(fetcher, feed_id, retry_attempts=1)
+    assert fetcher.feed_health.circuit_state(feed_id) == 'open'
+
+
+def test_circuit_opens_after_consecutive_failures(make_fetcher, breaker_config):
+    fetcher = make_fetcher({'down': FAILING})
+    _fetch(fetcher, 'down', retry_attempts=1)
+    assert fetcher.feed_health.circuit_state('down') == 'closed'
+    _fetch(fetcher, 'down', retry_attempts=1)
+    assert fetcher.feed_health.circuit_state('down') == 'open'
+    assert not fetcher.feed_health.allow_request('down')
+
+    articles = fetcher.fetch_all_feeds(max_articles_per_source=5, hours_back=48, retry_attempts=1, retry_delay=0)
+    assert articles == []
+    assert fetcher.last_run_stats['skipped_by_circuit'] == 1
+    assert fetcher.last_run_stats['http_requests'] == 0
+
+
+def test_half_open_probes_once_and_doubles_cooldown_on_failure(make_fetcher, breaker_config):
+    fetcher = make_fetcher({'down': FAILING})
+    _open_circuit(fetcher, 'down')
+    first_cooldown = fetcher.feed_state.get('down')['health']['circuit_cooldown']
+
+    _expire_cooldown(fetcher, 'down')
+    assert fetcher.feed_health.circuit_state('down') == 'half_open'
+    assert fetcher.feed_health.attempts_allowed('down', 3) == 1
+
+    # 半开状态只试探一次，不按 retry_attempts 重试
+    assert _requests_sent(fetcher, lambda: _fetch(fetcher, 'down', retry_attempts=3)) == 1
+    health = fetcher.feed_state.get('down')['health']
+    assert fetcher.feed_health.circuit_state('down') == 'open'
+    assert health['circuit_cooldown'] == first_cooldown * 2
+
+    # 冷却时长翻倍不超过上限
+    for _ in range(3):
+        _expire_cooldown(fetcher, 'down')
+        _fetch(fetcher, 'down')
+    assert fetcher.feed_state.get('down')['health']['circuit_cooldown'] == 3 * 3600
+
+
+def test_half_open_success_closes_circuit(make_fetcher, breaker_config):
+    fetcher = make_fetcher({'flaky': FAILING})
+    _open_circuit(fetcher, 'flaky')
+    _expire_cooldown(fetcher, 'flaky')
+
+    # 源恢复后半开试探成功，熔断器关闭
+    fetcher.feeds_config['flaky']['url'] = fetcher.feeds_config['flaky']['url'].replace(FAILING, HEALTHY)
+    assert len(_fetch(fetcher, 'flaky')) > 0
+    health = fetcher.feed_state.get('flaky')['health']
+    assert fetcher.feed_health.circuit_state('flaky') == 'closed'
+    assert health['consecutive_failures'] == 0
+    assert 'circuit_cooldown' not in health
+
+
+def test_breaker_disabled_still_fetches(make_fetcher, breaker_config, system_config, monkeypatch):
+    monkeypatch.setitem(system_config, 'circuit_breaker', dict(system_config['circuit_breaker'], enabled=False))
+    fetcher = make_fetcher({'down': FAILING})
+    _open_circuit(fetcher, 'down')
+    fetcher.fetch_all_feeds(max_articles_per_source=5, hours_back=48, retry_attempts=1, retry_delay=0)
+    assert fetcher.last_run_stats['http_requests'] == 1
+
+
+@pytest.mark.parametrize('engine', ['thread', 'asyncio'])
+def test_zero_retry_attempts_still_fetches_once(make_fetcher, engine):
+    fetcher = make_fetcher({'feed': HEALTHY})
+    assert fetcher.feed_health.attempts_allowed('feed', 0) == 1
+    articles = fetcher.fetch_all_feeds(max_articles_per_source=5, hours_back=48, retry_attempts=0,
+                                       retry_delay=0, engine=engine)
+    assert len(articles) > 0
+    assert fetcher.last_run_stats['http_requests'] == 1
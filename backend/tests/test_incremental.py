@@ -0,0 +1,74 @@
+"""日内增量模式端到端测试（本地合成源服务器 + 离线模拟 LLM 后端）"""
+
+import json
+
+import pytest
+
+import config
+
+FEEDS = {'a': 'entries=20&stable=0', 'b': 'entries=20&stable=0&format=atom'}
+
+
+@pytest.fixture
+def digest_app(tmp_path, feed_server, system_config, monkeypatch):
+    """使用临时数据目录和本地后端的 AIDailyDigest"""
+    import main
+
+    feeds = {
+        feed_id: {'name': feed_id, 'url': f"{feed_server}/feeds/{feed_id}.xml?latency_ms=0&jitter_ms=0&{query}",
+                  'category': 'research', 'priority': 1}
+        for feed_id, query in FEEDS.items()
+    }
+    monkeypatch.setattr(main, 'RSS_FEEDS', feeds)
+    monkeypatch.setitem(system_config, 'data_dir', str(tmp_path / "data"))
+    monkeypatch.setitem(system_config, 'output_dir', str(tmp_path / "output"))
+    monkeypatch.setitem(system_config, 'max_articles_per_source', 3)
+    monkeypatch.setitem(system_config, 'retry_attempts', 1)
+    # 合成源的标题和摘要取自同一小词表，近似重复检测和故事聚类会把它们合并，这里只测增量合并
+    monkeypatch.setitem(system_config, 'near_duplicate', {'enabled': False})
+    monkeypatch.setitem(system_config, 'story_clustering', {'enabled': False})
+    monkeypatch.setitem(config.LLM_CONFIG, 'enabled', True)
+    monkeypatch.setitem(config.LLM_CONFIG, 'backend', {
+        'type': 'local', 'local': {'latency_ms': 0, 'tokens_per_second': 1e6, 'seed': 0},
+    })
+    monkeypatch.setitem(config.LLM_CONFIG, 'rate_limit', {'requests_per_minute': None, 'tokens_per_minute': None})
+    return main.AIDailyDigest()
+
+
+def _run(app, tmp_path):
+    web_data = tmp_path / "data.json"
+    result = app.run(send_email=False, save_file=False, update_web=True, web_data_path=str(web_data),
+                     incremental=True)
+    assert result['success'], result['error']
+    with open(web_data, encoding='utf-8') as f:
+        return result, json.load(f)
+
+
+def test_second_run_summarizes_only_new_articles_and_keeps_earlier_ones(digest_app, tmp_path, monkeypatch):
+    summarized = []
+    summarize_articles = digest_app.analyzer.summarize_articles
+
+    def record(articles, *args, **kwargs):
+        summarized.append({article['id'] for article in articles})
+        return summarize_articles(articles, *args, **kwargs)
+
+    monkeypatch.setattr(digest_app.analyzer, 'summarize_articles', record)
+
+    first, first_data = _run(digest_app, tmp_path)
+    first_ids = {article['id'] for article in first_data['articles']}
+    assert first['new_articles_count'] == first['articles_count'] == len(first_ids) > 0
+
+    second, second_data = _run(digest_app, tmp_path)
+    second_ids = {article['id'] for article in second_data['articles']}
+    assert second['new_articles_count'] > 0
+    assert second['articles_count'] == first['articles_count'] + second['new_articles_count']
+
+    # 第二次运行只为新文章生成摘要，合并后的简报保留之前的文章及其摘要
+    assert summarized[1] and not summarized[1] & first_ids
+    assert first_ids < second_ids
+    assert all(article.get('chinese_summary') for article in second_data['articles'])
+    assert digest_app.daily_states.load().cycles == 2
+
+
+def test_state_store_is_created_only_for_incremental_runs(digest_app):
+    assert digest_app.daily_states is None
@@ -0,0 +1,66 @@
+"""关键词分类器回归测试：默认规则与原先 if/elif 实现的分类结果一致"""
+
+import random
+from typing import Dict, List
+
+import pytest
+
+from bench_classifier import linear_categorize, make_articles, make_taxonomy
+from config import CATEGORY_TAXONOMY
+from src.keyword_classifier import KeywordClassifier
+
+# 覆盖原实现中各分支的关键词，随机混入合成文章
+LEGACY_KEYWORDS = [{'name': 'x', 'keywords': {'title': [
+    'launch', 'release', 'product', 'app', 'tool', 'api', 'openai', 'google', 'microsoft', 'anthropic', 'meta',
+]}}]
+
+
+def legacy_categorize(articles: List[Dict]) -> Dict[str, List[Dict]]:
+    """原先 LLMAnalyzer.categorize_articles 的实现"""
+    categories = {"商业前沿": [], "技术硬核": [], "AI应用与产品": [], "行业动态": [], "其他": []}
+    for article in articles:
+        title_lower = article.get('title', '').lower()
+        summary_lower = article.get('summary', '').lower()
+        source_category = article.get('category', '')
+        source_name = article.get('source_name', '').lower()
+        if source_category == 'business' or any(kw in source_name for kw in ['techcrunch', 'venturebeat', 'information']):
+            categories["商业前沿"].append(article)
+        elif source_category == 'research' or 'arxiv' in article.get('source_id', '') or 'hugging face' in source_name:
+            categories["技术硬核"].append(article)
+        elif any(kw in title_lower or kw in summary_lower
+                 for kw in ['launch', 'release', 'product', 'app', 'tool', 'api']):
+            categories["AI应用与产品"].append(article)
+        elif source_category == 'company' or any(kw in title_lower
+                 for kw in ['openai', 'google', 'microsoft', 'anthropic', 'meta']):
+            categories["行业动态"].append(article)
+        else:
+            categories["其他"].append(article)
+    return {k: v for k, v in categories.items() if v}
+
+
+def _by_id(groups: Dict[str, List[Dict]]) -> Dict[str, str]:
+    return {article['id']: name for name, items in groups.items() for article in items}
+
+
+@pytest.mark.parametrize('seed', [0, 42])
+def test_default_taxonomy_matches_legacy_categorizer(seed):
+    articles = make_articles(2000, LEGACY_KEYWORDS, random.Random(seed))
+    # 合成源之外再加入只靠关键词区分的源类别
+    articles += [dict(article, id=f"{article['id']}-other", category='other', source_id='feed',
+                      source_name='Some Blog') for article in articles[:500]]
+
+    legacy = legacy_categorize(articles)
+    current = KeywordClassifier(CATEGORY_TAXONOMY).categorize(articles)
+    assert _by_id(current) == _by_id(legacy)
+    assert list(current) == list(legacy)
+    assert set(legacy) == {'商业前沿', '技术硬核', 'AI应用与产品', '行业动态', '其他'}
+
+
+def test_compiled_matcher_matches_linear_scan():
+    rng = random.Random(7)
+    taxonomy = make_taxonomy(200, 8, rng)
+    articles = make_articles(1000, taxonomy, rng)
+
+    classifier = KeywordClassifier(taxonomy)
+    assert [classifier.classify(article)[0] for article in articles] == linear_categorize(articles, taxonomy)
+
@@ -0,0 +1,142 @@
+"""LLMAnalyzer 批量摘要重试和备用模型测试（使用脚本化的后端，不访问网络）"""
+
+import json
+import re
+import threading
+
+from src.llm_analyzer import SUMMARY_PROMPT_VERSION, LLMAnalyzer
+from src.llm_backends import GenerationResult, LLMBackend, LLMBackendError
+from src.llm_cache import LLMResponseCache
+
+
+class ScriptedBackend(LLMBackend):
+    """按脚本返回结果的后端，记录收到的提示词"""
+
+    name = "scripted"
+
+    def __init__(self, model, reply):
+        super().__init__(model)
+        self.reply = reply
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, max_output_tokens, temperature=0.3):
+        with self._lock:
+            self.prompts.append(prompt)
+        result = self.reply(prompt)
+        if isinstance(result, Exception):
+            raise result
+        return GenerationResult(result, prompt_tokens=10, output_tokens=10)
+
+    generate_json = generate
+
+
+def batch_ids(prompt):
+    """批量摘要提示词中的文章ID（单篇摘要提示词返回空列表）"""
+    return re.findall(r'"id": "([^"]+)"', prompt)
+
+
+def make_articles(count):
+    return [{'id': f"a{i}", 'title': f"Article {i}", 'source_name': 'S', 'summary': f"summary {i}"}
+            for i in range(count)]
+
+
+def make_analyzer(backend):
+    return LLMAnalyzer(backend=backend, fallback_backends=[], batch_size=8, summary_workers=1)
+
+
+def test_retries_only_missing_and_malformed_items():
+    calls = []
+
+    def reply(prompt):
+        ids = batch_ids(prompt)
+        calls.append(ids)
+        if len(calls) == 1:
+            # a2 格式错误（不是字符串），a3 为空，a4 缺失
+            return json.dumps({'a0': '摘要0', 'a1': '摘要1', 'a2': 123, 'a3': ' '})
+        return json.dumps({i: f"重试{i}" for i in ids})
+
+    analyzer = make_analyzer(ScriptedBackend("primary", reply))
+    summaries = analyzer.summarize_batch(make_articles(5))
+
+    assert calls == [['a0', 'a1', 'a2', 'a3', 'a4'], ['a2', 'a3', 'a4']]
+    assert summaries == {'a0': '摘要0', 'a1': '摘要1', 'a2': '重试a2', 'a3': '重试a3', 'a4': '重试a4'}
+    fallbacks = analyzer.metrics.to_dict()['methods']['summarize_batch']['fallbacks']
+    assert fallbacks == {'retry_missing': 3}
+
+
+def test_items_still_missing_after_retry_are_summarized_one_by_one():
+    def reply(prompt):
+        ids = batch_ids(prompt)
+        if not ids:
+            return "单篇摘要"
+        return json.dumps({i: f"批量{i}" for i in ids if i != 'a1'})
+
+    backend = ScriptedBackend("primary", reply)
+    summaries = make_analyzer(backend).summarize_batch(make_articles(3))
+
+    single_prompts = [p for p in backend.prompts if not batch_ids(p)]
+    assert len(single_prompts) == 1 and "Article 1" in single_prompts[0]
+    assert summaries == {'a0': '批量a0', 'a1': '单篇摘要', 'a2': '批量a2'}
+
+
+def test_unparseable_batch_is_retried_as_a_whole():
+    outputs = iter(["not json", None])
+
+    def reply(prompt):
+        text = next(outputs)
+        return text if text is not None else json.dumps({i: f"ok{i}" for i in batch_ids(prompt)})
+
+    backend = ScriptedBackend("primary", reply)
+    summaries = make_analyzer(backend).summarize_batch(make_articles(2))
+
+    assert [batch_ids(p) for p in backend.prompts] == [['a0', 'a1'], ['a0', 'a1']]
+    assert summaries == {'a0': 'oka0', 'a1': 'oka1'}
+
+
+def test_fallback_results_are_cached_and_found_across_the_chain(tmp_path):
+    primary = ScriptedBackend("primary", lambda prompt: LLMBackendError("model not found"))
+    fallback = ScriptedBackend("fallback", lambda prompt: "备用摘要")
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"))
+    analyzer = LLMAnalyzer(backend=primary, fallback_backends=[fallback], cache=cache, model="primary",
+                           model_skip_after=None)
+    article = make_articles(1)[0]
+
+    assert analyzer.summarize_article(article) == "备用摘要"
+    assert cache.get("fallback", SUMMARY_PROMPT_VERSION, analyzer._summary_content(article)) == "备用摘要"
+
+    # 下次运行直接命中备用模型的缓存，不再调用任何模型
+    rerun = LLMAnalyzer(backend=primary, fallback_backends=[fallback], cache=cache, model="primary")
+    assert rerun.summarize_article(article) == "备用摘要"
+    assert len(primary.prompts) == 1 and len(fallback.prompts) == 1
+    assert rerun.metrics.to_dict()['methods']['summarize_article']['cache_hits'] == 1
+
+
+def test_failing_primary_is_skipped_for_the_rest_of_the_run():
+    primary = ScriptedBackend("primary", lambda prompt: LLMBackendError("model not found"))
+    fallback = ScriptedBackend("fallback", lambda prompt: "备用摘要")
+    analyzer = LLMAnalyzer(backend=primary, fallback_backends=[fallback], model="primary", model_skip_after=2)
+
+    for article in make_articles(5):
+        assert analyzer.summarize_article(article) == "备用摘要"
+    assert len(primary.prompts) == 2
+    assert len(fallback.prompts) == 5
+    assert analyzer.unavailable_models == {"primary"}
+    method = analyzer.metrics.to_dict()['methods']['summarize_article']
+    assert method['model_fallbacks'] == 5
+
+    # 新的运行重新尝试主模型
+    analyzer.reset_unavailable_models()
+    analyzer.summarize_article(make_articles(6)[5])
+    assert len(primary.prompts) == 3
+
+
+def test_primary_success_resets_failure_count():
+    outcomes = iter([LLMBackendError("flaky"), "ok", LLMBackendError("flaky"), "ok"])
+    primary = ScriptedBackend("primary", lambda prompt: next(outcomes))
+    fallback = ScriptedBackend("fallback", lambda prompt: "备用摘要")
+    analyzer = LLMAnalyzer(backend=primary, fallback_backends=[fallback], model="primary", model_skip_after=2)
+
+    results = [analyzer.summarize_article(article) for article in make_articles(4)]
+    assert results == ["备用摘要", "ok", "备用摘要", "ok"]
+    assert not analyzer.unavailable_models
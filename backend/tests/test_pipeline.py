@@ -0,0 +1,76 @@
+"""StagePipeline 依赖调度和失败处理测试（使用简单的函数作为步骤）"""
+
+import threading
+
+import pytest
+
+from src.pipeline import PipelineError, StagePipeline
+
+
+def _fail(**kwargs):
+    raise ValueError("boom")
+
+
+def test_independent_stages_run_concurrently_and_dependents_get_outputs():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(value):
+        barrier.wait()  # 两个分支必须同时在执行才能通过
+        return value
+
+    outputs = (
+        StagePipeline(max_workers=2)
+        .add('left', lambda x: branch(x + 1), requires=['x'])
+        .add('right', lambda x: branch(x * 10), requires=['x'])
+        .add('total', lambda left, right: left + right, requires=['left', 'right'])
+        .run({'x': 2})
+    )
+    assert outputs == {'x': 2, 'left': 3, 'right': 20, 'total': 23}
+
+
+def test_required_stage_failure_raises_and_skips_dependents():
+    called = []
+    pipeline = (
+        StagePipeline()
+        .add('broken', _fail)
+        .add('dependent', lambda broken: called.append('dependent'), requires=['broken'])
+    )
+
+    with pytest.raises(PipelineError, match="broken") as excinfo:
+        pipeline.run()
+    assert isinstance(excinfo.value.__cause__, ValueError)
+    assert called == []
+    assert pipeline.last_timings['broken']['status'] == 'failed'
+    assert 'dependent' not in pipeline.last_timings
+
+
+def test_optional_stage_failure_yields_none_and_others_complete():
+    pipeline = (
+        StagePipeline()
+        .add('broken', _fail, optional=True)
+        .add('dependent', lambda broken: broken is None, requires=['broken'])
+        .add('independent', lambda x: x * 2, requires=['x'])
+    )
+
+    outputs = pipeline.run({'x': 4})
+    assert outputs['broken'] is None
+    assert outputs['dependent'] is True
+    assert outputs['independent'] == 8
+    statuses = {name: timing['status'] for name, timing in pipeline.last_timings.items()}
+    assert statuses == {'broken': 'failed', 'dependent': 'ok', 'independent': 'ok'}
+    assert all(timing['seconds'] >= 0 for timing in pipeline.last_timings.values())
+
+
+@pytest.mark.parametrize('build, message', [
+    (lambda p: p.add('a', lambda b: b, requires=['b']).add('b', lambda a: a, requires=['a']), "循环依赖"),
+    (lambda p: p.add('a', lambda missing: missing, requires=['missing']), "依赖不存在"),
+    (lambda p: p.add('x', lambda: 1), "重名"),
+])
+def test_invalid_definitions_are_rejected_before_running(build, message):
+    with pytest.raises(PipelineError, match=message):
+        build(StagePipeline()).run({'x': 1})
+
+
+def test_duplicate_stage_name_is_rejected():
+    with pytest.raises(PipelineError, match="重复"):
+        StagePipeline().add('a', lambda: 1).add('a', lambda: 2)
@@ -0,0 +1,117 @@
+"""RSSFetcher 条件请求和离线回放测试（本地合成源服务器）"""
+
+import json
+import os
+
+import pytest
+
+
+def _fetch(fetcher, feed_id, **kwargs):
+    options = {'max_articles': 5, 'hours_back': 48, 'retry_attempts': 1, 'retry_delay': 0}
+    options.update(kwargs)
+    return fetcher.fetch_single_feed(feed_id, fetcher.feeds_config[feed_id], **options)
+
+
+def test_conditional_get_returns_304_for_unchanged_feed(make_fetcher):
+    fetcher = make_fetcher({'stable': 'entries=10&stable=1'})
+
+    first = _fetch(fetcher, 'stable')
+    assert len(first) == 5
+    validators = fetcher.feed_state.get_validators('stable')
+    assert validators.get('etag') and validators.get('last_modified')
+
+    fetcher.last_run_stats = {}
+    second = _fetch(fetcher, 'stable')
+    assert second == []
+    assert fetcher.last_run_stats.get('not_modified') == 1
+    assert fetcher.feed_state.get('stable')['health']['successes'] == 2
+
+
+def test_validators_persist_across_fetcher_instances(make_fetcher, tmp_path):
+    fetcher = make_fetcher({'stable': 'entries=10&stable=1'})
+    _fetch(fetcher, 'stable')
+    fetcher.feed_state.save()
+    etag = fetcher.feed_state.get_validators('stable')['etag']
+
+    restarted = make_fetcher({'stable': 'entries=10&stable=1'})
+    assert restarted.feed_state.get_validators('stable')['etag'] == etag
+    headers = restarted._build_request_headers('stable')
+    assert headers['If-None-Match'] == etag
+
+    restarted.last_run_stats = {}
+    assert _fetch(restarted, 'stable') == []
+    assert restarted.last_run_stats.get('not_modified') == 1
+
+
+def test_changed_feed_is_fetched_again(make_fetcher):
+    fetcher = make_fetcher({'live': 'entries=10&stable=0'})
+    _fetch(fetcher, 'live')
+    fetcher.last_run_stats = {}
+    assert len(_fetch(fetcher, 'live')) > 0
+    assert fetcher.last_run_stats.get('not_modified', 0) == 0
+
+
+def test_conditional_get_disabled_sends_no_validators(make_fetcher, system_config, monkeypatch):
+    monkeypatch.setitem(system_config, 'conditional_get', False)
+    fetcher = make_fetcher({'stable': 'entries=10&stable=1'})
+    _fetch(fetcher, 'stable')
+    assert fetcher.feed_state.get_validators('stable') == {}
+    assert 'If-None-Match' not in fetcher._build_request_headers('stable')
+
+
+@pytest.mark.parametrize('query', ['entries=10&stable=1&format=atom', 'entries=10&stable=1&format=rss'])
+def test_failed_parse_does_not_store_validators(make_fetcher, monkeypatch, query):
+    fetcher = make_fetcher({'feed': query})
+    monkeypatch.setattr('src.rss_fetcher.StreamingFeedParser.iter_entries',
+                        lambda self, chunks: _failing_entries(self, chunks))
+    assert _fetch(fetcher, 'feed') == []
+    assert fetcher.feed_state.get_validators('feed') == {}
+
+
+def _failing_entries(parser, chunks):
+    for _ in chunks:
+        pass
+    parser.failed = True
+    parser.error = ValueError("broken feed")
+    return
+    yield
+
+
+def _run(fetcher):
+    return fetcher.fetch_all_feeds(max_articles_per_source=3, hours_back=48, retry_attempts=1, retry_delay=0)
+
+
+def test_replay_returns_the_articles_the_run_produced(make_fetcher, system_config, monkeypatch):
+    monkeypatch.setitem(system_config, 'response_cache', {'enabled': True, 'ttl_minutes': 0, 'retention_days': 1})
+    monkeypatch.setitem(system_config, 'conditional_get', False)
+    fetcher = make_fetcher({'a': 'entries=20&stable=1', 'b': 'entries=20&stable=1&format=atom'})
+
+    first = _run(fetcher)
+    first_run_id = fetcher.run_id
+    # 第二次运行跳过已抓取的文章，取到的是源中更靠后的条目
+    second = _run(fetcher)
+    assert fetcher.run_id != first_run_id
+    assert len(second) == 6
+    assert not {a['id'] for a in first} & {a['id'] for a in second}
+
+    replayed = make_fetcher({'a': 'entries=20&stable=1', 'b': 'entries=20&stable=1&format=atom'})
+    result = replayed.replay(fetcher.run_id, max_articles_per_source=3, hours_back=48)
+    assert [a['id'] for a in result] == [a['id'] for a in second]
+
+
+def test_replay_without_recorded_ids_reproduces_inputs(make_fetcher, system_config, monkeypatch):
+    monkeypatch.setitem(system_config, 'response_cache', {'enabled': True, 'ttl_minutes': 0, 'retention_days': 1})
+    fetcher = make_fetcher({'a': 'entries=20&stable=1'})
+    articles = _run(fetcher)
+
+    # 早期的运行记录没有 article_ids：按录制的响应重新选取每个源的前几篇
+    manifest_path = os.path.join(fetcher.response_cache.runs_dir, f"{fetcher.run_id}.json")
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    for entry in manifest['feeds'].values():
+        entry.pop('article_ids')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    result = fetcher.replay(fetcher.run_id, max_articles_per_source=3, hours_back=48)
+    assert [a['id'] for a in result] == [a['id'] for a in articles]